@@ -4,16 +4,24 @@
 
 from pathlib import PurePath
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
-from typing import List, Dict
-import io
-import zipfile
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Dict, Optional
 import logging
 
-from app.models.simulation import SimulationProject
+from app.models.simulation import ProjectBatchRequest, SimplifiedProject, SimulationProject
+from app.services.batch_generator import (
+    BatchGeneratorService,
+    batch_folder_names,
+    batch_max_projects,
+    iter_batch_entries,
+)
+from app.services.boundary_simplifier import DEFAULT_TOLERANCE_CELLS, BoundarySimplifier
 from app.services.xml_parser import XMLParserService
 from app.services.xml_generator import XMLGeneratorService
+from app.services.xml_cache import xml_bundle_cache, xml_section_cache
+from app.utils.zip_stream import iter_spooled, iter_zip_stream, spool_stream
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -23,13 +31,16 @@ router = APIRouter()
 
 @router.post("/parse", response_model=SimulationProject, response_model_by_alias=False)
 async def parse_project(
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    compact_geometry: bool = Query(False, description="边界节点以紧凑的coords扁平数组返回，而不是nodes对象列表"),
 ):
     """
     解析上传的XML文件集，返回结构化的项目JSON
 
     Args:
         files: 上传的XML文件列表，必须包含starfish.xml
+        compact_geometry: 为True时边界节点以coords [x0, y0, x1, y1, ...] 返回，
+            节点很多的边界解析更快、响应更小
 
     Returns:
         SimulationProject: 解析后的项目对象
@@ -58,11 +69,14 @@ async def parse_project(
             )
 
         # 解析XML文件
-        parser_service = XMLParserService()
+        parser_service = XMLParserService(compact_geometry=compact_geometry)
         project = await parser_service.parse_files(file_dict)
 
         logger.info("Successfully parsed project files")
-        return project
+
+        # 大项目的JSON序列化同样耗CPU，放到线程池中执行，避免阻塞事件循环
+        content = await run_in_threadpool(project.model_dump_json, exclude=project.unused_coords_exclude())
+        return Response(content=content, media_type="application/json")
 
     except HTTPException:
         raise
@@ -73,13 +87,49 @@ async def parse_project(
             detail=f"XML parsing error: {str(e)}"
         )
 
+@router.post("/simplify", response_model=SimplifiedProject, response_model_by_alias=False)
+async def simplify_project(
+    project: SimulationProject,
+    tolerance: float = Query(DEFAULT_TOLERANCE_CELLS, gt=0, description="简化容差（网格间距的倍数）"),
+):
+    """
+    按网格间距简化边界折线，返回简化后的项目和各边界的顶点缩减情况
+
+    偏离不超过容差的顶点被删除（Douglas-Peucker），端点始终保留。
+
+    Args:
+        project: 项目配置对象
+        tolerance: 容差，以domain.spacing中最小间距的倍数表示
+
+    Returns:
+        SimplifiedProject: 简化后的项目及各边界简化前后的顶点数
+
+    Raises:
+        HTTPException: 网格间距无效时返回400
+    """
+    try:
+        simplified = await run_in_threadpool(BoundarySimplifier(tolerance).simplify_project, project)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    content = await run_in_threadpool(
+        simplified.model_dump_json, exclude={"project": simplified.project.unused_coords_exclude()}
+    )
+    return Response(content=content, media_type="application/json")
+
 @router.post("/generate")
-async def generate_project(project: SimulationProject):
+async def generate_project(
+    project: SimulationProject,
+    simplify_tolerance: Optional[float] = Query(
+        None, gt=0, description="导出前按此容差（网格间距的倍数）简化边界折线，默认不简化"
+    ),
+):
     """
     根据提供的项目JSON，生成并返回包含所有XML文件的ZIP压缩包
 
     Args:
         project: 项目配置对象
+        simplify_tolerance: 指定时先简化边界（见/simplify），响应头X-Boundary-Vertices
+            给出简化前后的顶点总数
 
     Returns:
         StreamingResponse: ZIP文件流
@@ -89,36 +139,97 @@ async def generate_project(project: SimulationProject):
     """
     try:
         logger.info("Starting project generation")
+        headers = {"Content-Disposition": "attachment; filename=starfish_project.zip"}
+
+        if simplify_tolerance is not None:
+            simplified = await run_in_threadpool(BoundarySimplifier(simplify_tolerance).simplify_project, project)
+            project = simplified.project
+            headers["X-Boundary-Vertices"] = f"{simplified.original_vertices}/{simplified.simplified_vertices}"
+
+        # 按项目内容哈希查找缓存，未修改的项目直接返回之前生成的ZIP
+        key, bundle = await run_in_threadpool(xml_bundle_cache.lookup, project)
+        if bundle is not None:
+            logger.info(f"Serving cached XML bundle {key[:12]}")
+            return Response(content=bundle.zip_bytes, media_type="application/zip", headers=headers)
+
+        # 在线程池中完成项目修正（不修改请求中的project）和全部XML生成，逐块压缩写入临时文件，完成后写入缓存；
+        # 依赖部分未变化的单个文件直接复用之前的输出。生成错误因此在发送响应前抛出，返回422而不是截断的ZIP
+        generator_service = XMLGeneratorService(section_cache=xml_section_cache)
+        spooled = await run_in_threadpool(
+            lambda: spool_stream(xml_bundle_cache.stream_zip(key, generator_service.iter_xml_files(project)))
+        )
 
-        # 生成XML文件
-        generator_service = XMLGeneratorService()
-        xml_files = generator_service.generate_xml_files(project)
+        # 返回ZIP文件流
+        return StreamingResponse(
+            iter_spooled(spooled),
+            media_type="application/zip",
+            headers=headers
+        )
 
-        logger.info(f"Generated {len(xml_files)} XML files")
+    except Exception as e:
+        logger.error(f"Project generation error: {str(e)}")
+        raise HTTPException(
+            status_code=422,
+            detail=f"Project generation error: {str(e)}"
+        )
 
-        # 创建ZIP文件
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for filename, content in xml_files.items():
-                zip_file.writestr(filename, content)
-                logger.info(f"Added {filename} to ZIP")
+@router.post("/generate-batch")
+async def generate_project_batch(request: ProjectBatchRequest):
+    """
+    批量生成多个项目，返回一个ZIP压缩包，每个项目一个文件夹
 
-        zip_buffer.seek(0)
+    Args:
+        request: 项目列表，每个项目可指定文件夹名称
+
+    Returns:
+        StreamingResponse: ZIP文件流
+
+    Raises:
+        HTTPException: 项目数量为0或超过上限时返回400，生成失败时返回422
+    """
+    if not request.projects:
+        raise HTTPException(status_code=400, detail="No projects to generate")
+    max_projects = batch_max_projects()
+    if len(request.projects) > max_projects:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many projects: {len(request.projects)} (limit {max_projects})"
+        )
+
+    try:
+        logger.info(f"Starting batch generation of {len(request.projects)} projects")
+
+        # 多个项目在进程池中并行生成，已缓存的项目直接复用
+        service = BatchGeneratorService(cache=xml_bundle_cache)
+        results = await service.generate([item.project for item in request.projects])
+        folders = batch_folder_names([item.name for item in request.projects])
 
-        # 返回ZIP文件流
         return StreamingResponse(
-            io.BytesIO(zip_buffer.read()),
+            iter_zip_stream(iter_batch_entries(folders, results)),
             media_type="application/zip",
-            headers={"Content-Disposition": "attachment; filename=starfish_project.zip"}
+            headers={"Content-Disposition": "attachment; filename=starfish_projects.zip"}
         )
 
     except Exception as e:
-        logger.error(f"Project generation error: {str(e)}")
+        logger.error(f"Batch generation error: {str(e)}")
         raise HTTPException(
             status_code=422,
-            detail=f"Project generation error: {str(e)}"
+            detail=f"Batch generation error: {str(e)}"
         )
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    获取XML生成缓存的命中、未命中和淘汰计数
+
+    Returns:
+        Dict: 整包缓存（bundles）和单文件缓存（sections）的统计信息
+    """
+    return {
+        "bundles": xml_bundle_cache.stats(),
+        "sections": xml_section_cache.stats(),
+    }
+
 @router.get("/template", response_model=SimulationProject, response_model_by_alias=False)
 async def get_project_template():
     """
@@ -131,7 +242,10 @@ async def get_project_template():
         # 创建默认项目模板
         template = SimulationProject()
         logger.info("Generated project template")
-        return template
+        return Response(
+            content=template.model_dump_json(exclude=template.unused_coords_exclude()),
+            media_type="application/json"
+        )
 
     except Exception as e:
         logger.error(f"Template generation error: {str(e)}")
@@ -0,0 +1,96 @@
+"""
+仿真运行相关API端点
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pathlib import Path
+from typing import Optional
+import logging
+
+from app.models.runs import RunStatus
+from app.models.simulation import SimulationProject
+from app.services.run_events import stream_run_events
+from app.services.run_queue import RunQueueFull, run_queue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("", response_model=RunStatus, status_code=202)
+async def submit_run(
+    project: SimulationProject,
+    timeout: Optional[int] = Query(None, gt=0, description="运行超时时间（秒），默认使用RUN_TIMEOUT_SECONDS")
+):
+    """
+    提交项目运行Starfish仿真，任务进入队列后立即返回
+
+    Args:
+        project: 项目配置对象
+        timeout: 运行超时时间（秒）
+
+    Returns:
+        RunStatus: 任务状态（queued），通过GET /runs/{id}查询进度
+
+    Raises:
+        HTTPException: 超时时间超过上限时返回400，队列已满或Starfish不可用时返回503
+    """
+    try:
+        return await run_queue.submit(project, timeout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except (RuntimeError, FileNotFoundError) as e:
+        logger.error(f"Starfish is not available: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Starfish is not available: {str(e)}")
+
+@router.get("/{run_id}", response_model=RunStatus)
+async def get_run(run_id: str):
+    """
+    查询仿真运行任务状态
+
+    Args:
+        run_id: 任务ID
+
+    Returns:
+        RunStatus: 任务状态
+
+    Raises:
+        HTTPException: 任务不存在时返回404
+    """
+    status = run_queue.get(run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
+    return status
+
+@router.get("/{run_id}/events")
+async def get_run_events(
+    run_id: str,
+    poll_interval: float = Query(0.5, ge=0.1, le=10, description="检查输出文件的间隔（秒）")
+):
+    """
+    以Server-Sent Events推送运行进度，直到任务结束
+
+    事件类型：status（任务状态变化）、stats（starfish_stats.csv新增行的it、time、mp.*、source.*列）、
+    log（starfish.log新增的重要日志行）。文件从上次读取的位置增量读取，不会重复读取整个文件。
+
+    Args:
+        run_id: 任务ID
+        poll_interval: 检查输出文件的间隔（秒）
+
+    Returns:
+        StreamingResponse: text/event-stream事件流
+
+    Raises:
+        HTTPException: 任务不存在时返回404
+    """
+    status = run_queue.get(run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
+
+    return StreamingResponse(
+        stream_run_events(Path(status.run_dir), lambda: run_queue.get(run_id), poll_interval=poll_interval),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
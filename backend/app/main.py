@@ -3,12 +3,28 @@ Starfish-ezxml Backend API
 FastAPI应用主入口
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+import math
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 
 from app.api.routes import router as api_router
+from app.services.batch_generator import shutdown_pool
+from app.services.run_queue import run_queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时将上次异常退出遗留的排队/运行中任务标记为失败，停止时结束仍在运行的仿真和批量生成进程池"""
+    await asyncio.to_thread(run_queue.recover_interrupted)
+    yield
+    await run_queue.shutdown()
+    shutdown_pool()
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -16,7 +32,8 @@ app = FastAPI(
     description="为Starfish仿真软件提供可视化XML配置工具的后端API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # 配置CORS中间件
@@ -50,6 +67,24 @@ app.add_middleware(
 # 注册API路由
 app.include_router(api_router, prefix="/api/v1")
 
+def replace_non_finite(value):
+    """将NaN和无穷大替换为字符串，标准JSON无法表示这些值"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [replace_non_finite(item) for item in value]
+    return value
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """请求校验失败返回422；错误信息回显的输入可能含有NaN或无穷大（如coords中的1e999），需先替换"""
+    return JSONResponse(
+        status_code=422,
+        content={"detail": replace_non_finite(jsonable_encoder(exc.errors()))},
+    )
+
 @app.get("/")
 async def root():
     """根路径健康检查"""
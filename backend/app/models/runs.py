@@ -0,0 +1,25 @@
+"""
+仿真运行任务数据模型
+"""
+
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+# queued -> running -> succeeded / failed / timed_out；排队或运行中的任务在服务停止时变为cancelled，
+# 服务异常退出时遗留的排队或运行中任务在下次启动时变为failed
+RunState = Literal["queued", "running", "succeeded", "failed", "timed_out", "cancelled"]
+
+class RunStatus(BaseModel):
+    """仿真运行任务状态"""
+    id: str = Field(..., description="任务ID")
+    state: RunState = Field(..., description="任务状态")
+    timeout: int = Field(..., description="运行超时时间（秒）")
+    run_dir: str = Field(..., description="XML文件和仿真结果所在目录")
+    submitted_at: datetime = Field(..., description="提交时间")
+    started_at: Optional[datetime] = Field(None, description="开始运行时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+    returncode: Optional[int] = Field(None, description="Starfish退出码")
+    elapsed_seconds: Optional[float] = Field(None, description="运行耗时（秒）")
+    last_output_line: Optional[str] = Field(None, description="最后一行输出")
+    error: Optional[str] = Field(None, description="错误信息")
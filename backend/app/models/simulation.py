@@ -3,15 +3,64 @@
 使用Pydantic定义核心数据结构
 """
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import List, Optional, Literal, Union
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PlainSerializer,
+    PlainValidator,
+    WithJsonSchema,
+    field_validator,
+    model_validator,
+)
+from array import array
+from typing import Annotated, Dict, Iterator, List, Optional, Literal, Tuple, Union
 from uuid import uuid4
+import hashlib
+import math
 
 class GeometryNode(BaseModel):
     """几何节点"""
     x: float = Field(..., description="X坐标")
     y: float = Field(..., description="Y坐标")
 
+def pack_coordinates(value) -> array:
+    """
+    将扁平坐标序列 [x0, y0, x1, y1, ...] 转换为float64数组
+
+    已经是array('d')的输入直接使用，不复制。
+
+    Raises:
+        ValueError: 含非数值元素（包括布尔值）、NaN/无穷大或元素个数为奇数时
+    """
+    if isinstance(value, array) and value.typecode == "d":
+        coords = value
+    elif isinstance(value, (str, bytes, dict)):
+        raise ValueError("coords必须是扁平的数值列表 [x0, y0, x1, y1, ...]")
+    else:
+        try:
+            values = value if isinstance(value, (list, tuple)) else list(value)
+            # array('d')会把True/False当作1.0/0.0接受
+            if bool in map(type, values):
+                raise TypeError
+            coords = array("d", values)
+        except TypeError:
+            raise ValueError("coords必须是扁平的数值列表 [x0, y0, x1, y1, ...]") from None
+    if len(coords) % 2:
+        raise ValueError("coords的元素个数必须为偶数（x、y成对出现）")
+    # NaN或无穷大会使总和非有限；有限值之和溢出时再逐个检查
+    if not math.isfinite(sum(coords)) and not all(map(math.isfinite, coords)):
+        raise ValueError("coords不能包含NaN或无穷大")
+    return coords
+
+# 紧凑的边界坐标：内存中是array('d')（每个数值8字节），JSON中是扁平数值列表
+PackedCoordinates = Annotated[
+    array,
+    PlainValidator(pack_coordinates),
+    PlainSerializer(lambda coords: coords.tolist(), return_type=List[float]),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
+
 class Boundary(BaseModel):
     """边界定义 - 符合Starfish XML规范"""
     id: str = Field(default_factory=lambda: str(uuid4()), description="唯一ID")
@@ -20,6 +69,9 @@ class Boundary(BaseModel):
     value: Optional[Union[str, int, float]] = Field(None, description="边界值")
     reverse: Optional[bool] = Field(None, description="是否反转边界")
     nodes: List[GeometryNode] = Field(default_factory=list, description="边界节点")
+    coords: Optional[PackedCoordinates] = Field(
+        None, description="紧凑的边界节点坐标 [x0, y0, x1, y1, ...]，与nodes二选一，适合节点很多的边界"
+    )
 
     # Starfish边界属性
     material: Optional[str] = Field(None, description="边界材料")
@@ -37,6 +89,26 @@ class Boundary(BaseModel):
             return str(v)
         return v
 
+    @model_validator(mode="after")
+    def check_single_geometry(self):
+        """nodes和coords不能同时指定"""
+        if self.coords is not None and self.nodes:
+            raise ValueError("nodes和coords不能同时指定")
+        return self
+
+    def node_count(self) -> int:
+        """边界节点数（不论使用哪种表示）"""
+        if self.coords is not None:
+            return len(self.coords) // 2
+        return len(self.nodes)
+
+    def iter_points(self) -> Iterator[Tuple[float, float]]:
+        """按顺序返回边界节点坐标 (x, y)（不论使用哪种表示）"""
+        if self.coords is not None:
+            values = iter(self.coords)
+            return zip(values, values)
+        return ((node.x, node.y) for node in self.nodes)
+
 class Material(BaseModel):
     """材料定义 - 符合Starfish XML规范"""
     id: str = Field(default_factory=lambda: str(uuid4()), description="唯一ID")
@@ -223,6 +295,9 @@ class DomainSettings(BaseModel):
     # 边界变换（用于boundaries.xml）
     boundary_transform: Optional[BoundaryTransform] = Field(None, description="边界变换设置")
 
+# 项目的各个部分（用于计算内容指纹）
+PROJECT_SECTIONS = ("settings", "domain", "boundaries", "materials", "sources", "interactions")
+
 class SimulationProject(BaseModel):
     """仿真项目主模型"""
     settings: GlobalSettings = Field(default_factory=GlobalSettings, description="全局设置")
@@ -233,3 +308,67 @@ class SimulationProject(BaseModel):
     interactions: List[Interaction] = Field(default_factory=list, description="相互作用列表")
     
     model_config = ConfigDict(populate_by_name=True, use_enum_values=True)
+
+    def unused_coords_exclude(self) -> Dict[str, Dict[int, set]]:
+        """
+        未使用coords的边界在序列化时排除该字段
+
+        用作model_dump/model_dump_json的exclude参数，使只用nodes的项目的API响应与引入coords之前相同。
+        （模型级的序列化器会让所有边界的序列化慢一倍，因此在API层排除。）
+
+        Returns:
+            Dict: 形如 {"boundaries": {0: {"coords"}, ...}}，没有需要排除的边界时为空
+        """
+        unused = {index: {"coords"} for index, boundary in enumerate(self.boundaries) if boundary.coords is None}
+        return {"boundaries": unused} if unused else {}
+
+    def section_fingerprints(self) -> Dict[str, str]:
+        """
+        计算各部分的内容指纹
+
+        指纹是各部分JSON序列化结果的SHA-256，不包含实体id（id随机生成且不会写入XML），
+        因此内容相同的部分总是得到相同的指纹。字段按模型定义顺序序列化，结果是确定的。
+
+        Returns:
+            Dict[str, str]: 部分名称到指纹的映射
+        """
+        exclude_ids = {name: {"__all__": {"id"}} for name in ("boundaries", "materials", "sources", "interactions")}
+        return {
+            name: hashlib.sha256(
+                self.model_dump_json(include={name}, exclude=exclude_ids).encode("utf-8")
+            ).hexdigest()
+            for name in PROJECT_SECTIONS
+        }
+
+class ResolvedProject(SimulationProject):
+    """
+    生成XML用的已修正项目（由XMLGeneratorService.resolve_project创建）
+
+    缺失的材料、默认边界、电离能和源边界均已补全，XML生成只读取此对象。
+    实例不可重新赋值字段；未被修正的部分与原项目共享对象，约定为只读，不应原地修改。
+    """
+    model_config = ConfigDict(populate_by_name=True, use_enum_values=True, frozen=True)
+
+class ProjectBatchItem(BaseModel):
+    """批量生成中的单个项目"""
+    name: Optional[str] = Field(None, description="ZIP中的文件夹名称，默认为project_序号")
+    project: SimulationProject = Field(..., description="项目配置")
+
+class ProjectBatchRequest(BaseModel):
+    """批量生成请求"""
+    projects: List[ProjectBatchItem] = Field(..., description="要生成的项目列表")
+
+class BoundarySimplificationReport(BaseModel):
+    """单个边界的简化结果"""
+    name: str = Field(..., description="边界名称")
+    original_vertices: int = Field(..., description="简化前的顶点数")
+    simplified_vertices: int = Field(..., description="简化后的顶点数")
+    skipped: bool = Field(False, description="路径不是简单折线（M/L/Z以外的命令），未简化")
+
+class SimplifiedProject(BaseModel):
+    """边界简化结果"""
+    tolerance: float = Field(..., description="使用的容差（边界坐标单位）")
+    original_vertices: int = Field(..., description="所有边界简化前的顶点总数")
+    simplified_vertices: int = Field(..., description="所有边界简化后的顶点总数")
+    boundaries: List[BoundarySimplificationReport] = Field(default_factory=list, description="各边界的简化结果")
+    project: SimulationProject = Field(..., description="简化后的项目")
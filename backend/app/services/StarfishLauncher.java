@@ -0,0 +1,91 @@
+import java.io.BufferedReader;
+import java.io.InputStreamReader;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.Enumeration;
+import java.util.jar.JarEntry;
+import java.util.jar.JarFile;
+
+/**
+ * Pre-started JVM for one Starfish run, managed by app/services/jvm_pool.py.
+ *
+ * Run in source-file mode with the Starfish jar on the class path:
+ *
+ *     java -cp StarfishCLI.jar StarfishLauncher.java StarfishCLI.jar
+ *
+ * Loads every class of the jar, prints the ready line and waits for a request
+ * line "run <absolute run directory>" on stdin. The pool has already renamed
+ * this JVM's working directory to that path, so relative file access by
+ * Starfish lands in the run directory. The launcher checks that the path
+ * really is its working directory and sets user.dir to it, so code that builds
+ * absolute paths from user.dir sees the run directory rather than the old
+ * staging path. It then calls the jar's Main-Class with no arguments, as
+ * "java -jar StarfishCLI.jar" would.
+ *
+ * A request the launcher cannot serve is rejected before Starfish starts: it
+ * prints the rejected line on stderr and exits with REJECTED_EXIT, and the
+ * pool runs the simulation with a cold "java -jar" instead. End of input
+ * before a request exits without running anything.
+ */
+public final class StarfishLauncher {
+    private static final String READY_LINE = "STARFISH_LAUNCHER_READY";
+    private static final String REJECTED_LINE = "STARFISH_LAUNCHER_REJECTED";
+    private static final String RUN_PREFIX = "run ";
+    private static final int REJECTED_EXIT = 75;
+
+    public static void main(String[] args) throws Throwable {
+        ClassLoader loader = ClassLoader.getSystemClassLoader();
+        String mainClass;
+        try (JarFile jar = new JarFile(args[0])) {
+            mainClass = jar.getManifest().getMainAttributes().getValue("Main-Class");
+            Enumeration<JarEntry> entries = jar.entries();
+            while (entries.hasMoreElements()) {
+                String name = entries.nextElement().getName();
+                if (!name.endsWith(".class") || name.startsWith("META-INF/") || name.endsWith("module-info.class")) {
+                    continue;
+                }
+                try {
+                    // Load and link without running static initializers; those stay part of the run.
+                    Class.forName(name.substring(0, name.length() - 6).replace('/', '.'), false, loader);
+                } catch (Throwable ignored) {
+                    // Classes with missing optional dependencies fail the same way in a cold run.
+                }
+            }
+        }
+        Method main = Class.forName(mainClass, false, loader).getMethod("main", String[].class);
+
+        System.out.println(READY_LINE);
+        System.out.flush();
+        BufferedReader stdin = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String request = stdin.readLine();
+        if (request == null) {
+            return;
+        }
+        if (!request.startsWith(RUN_PREFIX)) {
+            reject("unexpected request: " + request);
+        }
+        Path runDir = Paths.get(request.substring(RUN_PREFIX.length()));
+        // Compares the directories by file identity; "." is resolved by the OS against the real working directory.
+        if (!runDir.isAbsolute() || !Files.isDirectory(runDir) || !Files.isSameFile(runDir, Paths.get("."))) {
+            reject("working directory is not " + runDir);
+        }
+        System.setProperty("user.dir", runDir.toString());
+
+        try {
+            main.invoke(null, (Object) new String[0]);
+        } catch (InvocationTargetException exc) {
+            // Report Starfish's own exception, exiting with 1 like "java -jar".
+            throw exc.getCause();
+        }
+    }
+
+    private static void reject(String reason) {
+        System.err.println(REJECTED_LINE + ": " + reason);
+        System.err.flush();
+        System.exit(REJECTED_EXIT);
+    }
+}
@@ -0,0 +1,175 @@
+"""
+Batch XML generation.
+
+Generates many projects for one request on a shared process pool and lays the
+results out as one folder per project, so a parameter sweep needs a single
+HTTP round trip and uses every core instead of running the generator serially.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import threading
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.simulation import SimulationProject
+from app.services.xml_cache import XMLBundleCache
+from app.services.xml_generator import XMLGeneratorService
+from app.utils.zip_stream import iter_zip_stream
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _generate_in_worker(project: SimulationProject) -> Dict[str, str]:
+    """Process pool entry point; must stay importable at module level."""
+    return XMLGeneratorService().generate_xml_files(project)
+
+
+def batch_workers() -> int:
+    """Worker processes for batch generation: BATCH_GENERATE_WORKERS, defaulting to the CPU count."""
+    configured = os.getenv("BATCH_GENERATE_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return os.cpu_count() or 1
+
+
+def batch_max_projects() -> int:
+    """Largest accepted batch: BATCH_GENERATE_MAX_PROJECTS, default 1000."""
+    return int(os.getenv("BATCH_GENERATE_MAX_PROJECTS", "1000"))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers do not inherit the server's threads and locks, unlike fork.
+            _pool = ProcessPoolExecutor(
+                max_workers=batch_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes; a later batch starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def batch_folder_names(names: Sequence[Optional[str]]) -> List[str]:
+    """
+    Return a unique, filesystem-safe folder name for each project.
+
+    Unnamed projects become ``project_001``, ``project_002``...; duplicates get
+    a ``_2``, ``_3``... suffix. Uniqueness is case-insensitive so the archive
+    extracts cleanly on case-insensitive filesystems.
+    """
+    width = max(3, len(str(len(names))))
+    folders: List[str] = []
+    used = set()
+    for index, name in enumerate(names, start=1):
+        folder = re.sub(r"[^A-Za-z0-9._-]+", "_", (name or "").strip()).strip("._")
+        if not folder:
+            folder = f"project_{index:0{width}d}"
+
+        candidate = folder
+        suffix = 2
+        while candidate.lower() in used:
+            candidate = f"{folder}_{suffix}"
+            suffix += 1
+        used.add(candidate.lower())
+        folders.append(candidate)
+    return folders
+
+
+def iter_batch_entries(folders: Sequence[str], results: Sequence[Dict[str, str]]) -> Iterator[Tuple[str, str]]:
+    """Yield ``(folder/filename, text)`` pairs for iter_zip_stream."""
+    for folder, xml_files in zip(folders, results):
+        for filename, content in xml_files.items():
+            yield f"{folder}/{filename}", content
+
+
+class BatchGeneratorService:
+    """Generate XML files for many projects at once."""
+
+    def __init__(self, cache: Optional[XMLBundleCache] = None):
+        self.cache = cache
+
+    async def generate(self, projects: Sequence[SimulationProject]) -> List[Dict[str, str]]:
+        """
+        Generate every project and return the XML files in input order.
+
+        Projects already in the bundle cache are served from it; the rest run on
+        the process pool, or in one thread when only one project or one worker is left,
+        and are stored back into the cache. A failure raises ValueError naming the
+        1-based position of the failing project.
+        """
+        # Cache keys hash every section of every project, so all lookups run in one threadpool call
+        keys, results = await run_in_threadpool(self._lookup_cached, projects)
+        pending = [index for index, xml_files in enumerate(results) if xml_files is None]
+
+        logger.info(f"Batch generation: {len(projects) - len(pending)} cached, {len(pending)} to generate")
+        if len(pending) <= 1 or batch_workers() == 1:
+            # A pool cannot speed up a single project or a single core; generate in one thread
+            outcomes = await run_in_threadpool(self._generate_serially, [projects[index] for index in pending])
+        else:
+            loop = asyncio.get_running_loop()
+            pool = _get_pool()
+            runs = [loop.run_in_executor(pool, _generate_in_worker, projects[index]) for index in pending]
+            outcomes = await asyncio.gather(*runs, return_exceptions=True)
+
+        for index, outcome in zip(pending, outcomes):
+            if isinstance(outcome, BrokenProcessPool):
+                shutdown_pool()
+            if isinstance(outcome, BaseException):
+                raise ValueError(f"Project {index + 1}: {outcome}") from outcome
+            results[index] = outcome
+
+        if pending and self.cache is not None and self.cache.enabled:
+            # Building each ZIP archive is CPU work, so it stays off the event loop
+            await run_in_threadpool(self._store_generated, [(keys[index], results[index]) for index in pending])
+        return results
+
+    def _lookup_cached(
+        self, projects: Sequence[SimulationProject]
+    ) -> Tuple[List[Optional[str]], List[Optional[Dict[str, str]]]]:
+        """Cache key and cached XML files of each project; the files are None when it is not cached."""
+        if self.cache is None:
+            return [None] * len(projects), [None] * len(projects)
+        keys: List[Optional[str]] = []
+        results: List[Optional[Dict[str, str]]] = []
+        for project in projects:
+            key, bundle = self.cache.lookup(project)
+            keys.append(key)
+            results.append(bundle.xml_files if bundle is not None else None)
+        return keys, results
+
+    def _store_generated(self, generated: Sequence[Tuple[str, Dict[str, str]]]) -> None:
+        """Store freshly generated bundles, as stream_zip does for a single project."""
+        for key, xml_files in generated:
+            if sum(map(len, xml_files.values())) > self.cache.max_bytes:
+                # Too large to cache; skip building an archive that put() would reject
+                continue
+            self.cache.store(key, xml_files, b"".join(iter_zip_stream(xml_files.items())))
+
+    @staticmethod
+    def _generate_serially(projects: Sequence[SimulationProject]) -> List[object]:
+        outcomes: List[object] = []
+        for project in projects:
+            try:
+                outcomes.append(_generate_in_worker(project))
+            except Exception as exc:
+                outcomes.append(exc)
+        return outcomes
@@ -0,0 +1,185 @@
+"""
+Boundary polyline simplification.
+
+CAD-derived boundaries often have far more vertices than the mesh can
+resolve: detail smaller than a cell of ``DomainSettings.spacing`` does not
+change which cells a boundary cuts, but every vertex still has to be written
+to boundaries.xml and processed by Starfish's geometry setup. The simplifier
+drops those vertices with the Douglas-Peucker algorithm: a vertex is kept only
+if the polyline would otherwise move by more than the tolerance, given in
+mesh cells (default half a cell). End points are always kept.
+
+Simplification is opt-in and works on a copy of the project.
+"""
+
+from array import array
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+import logging
+import re
+
+from app.models.simulation import (
+    Boundary,
+    BoundarySimplificationReport,
+    DomainSettings,
+    SimplifiedProject,
+    SimulationProject,
+)
+from app.utils.path_codec import format_path, parse_path_coords
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE_CELLS = 0.5
+
+# One absolute move followed by line segments (implicit or with L), optionally closed.
+_POLYLINE_PATH = re.compile(r"\s*M[-+0-9.eE,\s]*(?:L[-+0-9.eE,\s]*)*(?P<closed>Z\s*)?")
+
+
+def douglas_peucker(coords: Sequence[float], tolerance: float) -> List[int]:
+    """
+    Indices of the points of a flat ``[x0, y0, x1, y1, ...]`` polyline to keep.
+
+    Points within ``tolerance`` of the simplified polyline are dropped. A
+    segment whose end points coincide (a closed ring) measures distance to
+    that point instead.
+    """
+    count = len(coords) // 2
+    if count < 3 or tolerance <= 0:
+        return list(range(count))
+
+    xs = coords[0:count * 2:2]
+    ys = coords[1:count * 2:2]
+    tolerance_squared = tolerance * tolerance
+    keep = bytearray(count)
+    keep[0] = keep[-1] = 1
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x0, y0 = xs[first], ys[first]
+        dx, dy = xs[last] - x0, ys[last] - y0
+        length_squared = dx * dx + dy * dy
+        inner = zip(xs[first + 1:last], ys[first + 1:last])
+        if length_squared:
+            # Squared distance to the chord, scaled by its squared length.
+            distances = [(dx * (y - y0) - dy * (x - x0)) ** 2 for x, y in inner]
+            limit = tolerance_squared * length_squared
+        else:
+            distances = [(x - x0) ** 2 + (y - y0) ** 2 for x, y in inner]
+            limit = tolerance_squared
+        worst = max(distances)
+        if worst > limit:
+            split = first + 1 + distances.index(worst)
+            keep[split] = 1
+            stack.append((first, split))
+            stack.append((split, last))
+    return [index for index in range(count) if keep[index]]
+
+
+def mesh_tolerance(domain: DomainSettings, tolerance_cells: float = DEFAULT_TOLERANCE_CELLS) -> float:
+    """
+    Tolerance in boundary coordinates for ``tolerance_cells`` cells of the mesh.
+
+    Uses the smallest spacing, divided by the largest boundary transform
+    scaling factor since Starfish scales boundary coordinates before meshing.
+
+    Raises:
+        ValueError: if the domain has no positive spacing
+    """
+    spacing = [value for value in domain.spacing if value > 0]
+    if not spacing:
+        raise ValueError("Boundary simplification needs a positive domain spacing")
+    tolerance = tolerance_cells * min(spacing)
+    scale = _max_scaling(domain)
+    return tolerance / scale if scale else tolerance
+
+
+class BoundarySimplifier:
+    """Simplify boundary paths and nodes of a project to a tolerance tied to the mesh spacing."""
+
+    def __init__(self, tolerance_cells: float = DEFAULT_TOLERANCE_CELLS):
+        if tolerance_cells <= 0:
+            raise ValueError("tolerance_cells must be positive")
+        self.tolerance_cells = tolerance_cells
+
+    def simplify_project(self, project: SimulationProject) -> SimplifiedProject:
+        """Return a simplified copy of the project with a per-boundary vertex report; ``project`` is not modified."""
+        tolerance = mesh_tolerance(project.domain, self.tolerance_cells)
+        boundaries: List[Boundary] = []
+        reports: List[BoundarySimplificationReport] = []
+        for boundary in project.boundaries:
+            simplified, report = self.simplify_boundary(boundary, tolerance)
+            boundaries.append(simplified)
+            reports.append(report)
+
+        original = sum(report.original_vertices for report in reports)
+        remaining = sum(report.simplified_vertices for report in reports)
+        logger.info(f"Simplified boundaries from {original} to {remaining} vertices (tolerance {tolerance:g})")
+        return SimplifiedProject(
+            tolerance=tolerance,
+            original_vertices=original,
+            simplified_vertices=remaining,
+            boundaries=reports,
+            project=project.model_copy(update={"boundaries": boundaries}),
+        )
+
+    def simplify_boundary(
+        self, boundary: Boundary, tolerance: float
+    ) -> Tuple[Boundary, BoundarySimplificationReport]:
+        """
+        Simplify one boundary's path and nodes/coords.
+
+        The report counts the vertices of the exported path: ``path`` when set,
+        otherwise the nodes it is generated from. Paths that are not a plain
+        ``M ... L ... [Z]`` polyline are left unchanged and reported as skipped.
+        """
+        update = {}
+        skipped = False
+        original_vertices = remaining_vertices = boundary.node_count()
+
+        if boundary.node_count() > 2:
+            if boundary.coords is not None:
+                kept = douglas_peucker(boundary.coords, tolerance)
+                update["coords"] = _select_points(boundary.coords, kept)
+            else:
+                points = list(chain.from_iterable(boundary.iter_points()))
+                kept = douglas_peucker(points, tolerance)
+                update["nodes"] = [boundary.nodes[index] for index in kept]
+            remaining_vertices = len(kept)
+
+        if boundary.path:
+            match = _POLYLINE_PATH.fullmatch(boundary.path)
+            if match is None:
+                skipped = True
+                original_vertices = remaining_vertices = len(parse_path_coords(boundary.path)) // 2
+            else:
+                coords = parse_path_coords(boundary.path)
+                kept = douglas_peucker(coords, tolerance)
+                original_vertices, remaining_vertices = len(coords) // 2, len(kept)
+                if remaining_vertices < original_vertices:
+                    path = format_path(_select_points(coords, kept))
+                    update["path"] = path + " Z" if match.group("closed") else path
+
+        report = BoundarySimplificationReport(
+            name=boundary.name,
+            original_vertices=original_vertices,
+            simplified_vertices=remaining_vertices,
+            skipped=skipped,
+        )
+        return (boundary.model_copy(update=update) if update else boundary), report
+
+
+def _select_points(coords: Sequence[float], indices: List[int]) -> array:
+    return array("d", chain.from_iterable((coords[2 * index], coords[2 * index + 1]) for index in indices))
+
+
+def _max_scaling(domain: DomainSettings) -> Optional[float]:
+    transform = domain.boundary_transform
+    if transform is None or not transform.scaling:
+        return None
+    try:
+        factors = [abs(float(part)) for part in re.split(r"[,\s]+", transform.scaling.strip()) if part]
+    except ValueError:
+        return None
+    return max(factors) if factors and max(factors) > 0 else None
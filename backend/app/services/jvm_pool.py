@@ -0,0 +1,296 @@
+"""
+Pool of pre-started JVMs for Starfish runs.
+
+``java -jar StarfishCLI.jar`` pays for JVM startup and for loading Starfish's
+classes on every run, which dominates short runs such as the edge cases in
+tools/run_starfish_cases.py. The pool keeps JVMs running StarfishLauncher.java
+that have already loaded the jar and wait on stdin; a run takes a ready JVM,
+which then calls Starfish's main class exactly as ``java -jar`` would. Each JVM
+runs one simulation and exits, so Starfish's static state never carries over
+between runs, and a replacement starts warming up as soon as one is taken.
+
+A process's working directory is fixed when it starts, so a waiting JVM sits in
+an empty staging directory and a run *adopts* it: the staging directory is
+renamed to the run directory's path and the run's files are moved into it. The
+run directory's path is then sent on the launcher's stdin; the launcher checks
+that it is its working directory and sets ``user.dir`` to it. The old staging
+path becomes a symlink to the run directory for the duration of the run, for
+any path the JVM cached before the rename. Adoption needs POSIX rename
+semantics and both directories on one filesystem; when a JVM is not ready,
+cannot be adopted or rejects the run, the runner falls back to a cold start.
+
+The pool is off by default (STARFISH_WARM_JVMS=0): it has not yet been
+verified against the real StarfishCLI.jar.
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LAUNCHER_SOURCE = Path(__file__).with_name("StarfishLauncher.java")
+READY_LINE = "STARFISH_LAUNCHER_READY"
+REJECTED_LINE = "STARFISH_LAUNCHER_REJECTED"
+# Exit code of a launcher that refused a run before starting Starfish.
+REJECTED_EXIT = 75
+
+
+class WarmJVM:
+    """One pre-started launcher process waiting in its staging directory."""
+
+    def __init__(self, command: Tuple[str, ...], cwd: Path):
+        self.command = command
+        self.cwd = cwd
+        # Symlink left at the staging path while an adopted run is in progress.
+        self.staging_link: Optional[Path] = None
+        self.process = subprocess.Popen(
+            list(command),
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self._ready = threading.Event()
+        self._ready_ok = False
+        threading.Thread(target=self._await_ready, name="starfish-jvm-ready", daemon=True).start()
+
+    def _await_ready(self) -> None:
+        line = self.process.stdout.readline()
+        self._ready_ok = line.strip() == READY_LINE
+        self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self._ready_ok and self.process.poll() is None
+
+    @property
+    def failed(self) -> bool:
+        return (self._ready.is_set() and not self._ready_ok) or self.process.poll() is not None
+
+    def wait_ready(self, timeout: Optional[float]) -> bool:
+        self._ready.wait(timeout)
+        return self.ready
+
+    def run(self, timeout: int) -> Optional[Tuple[int, str, str, bool]]:
+        """
+        Start the simulation in the adopted directory and wait for it.
+
+        Returns (returncode, stdout, stderr, timed_out), or None when the
+        launcher rejected the run before starting Starfish.
+        """
+        try:
+            try:
+                stdout, stderr = self.process.communicate(input=f"run {self.cwd}\n", timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                stdout, stderr = self.process.communicate()
+                return 124, stdout, stderr, True
+        finally:
+            self.remove_staging_link()
+
+        if self.process.returncode == REJECTED_EXIT and stderr.startswith(REJECTED_LINE):
+            logger.warning(f"Warm Starfish JVM rejected the run: {stderr.strip()}")
+            return None
+        return self.process.returncode, stdout, stderr, False
+
+    def remove_staging_link(self) -> None:
+        if self.staging_link is not None:
+            try:
+                os.unlink(self.staging_link)
+            except OSError:
+                pass
+            self.staging_link = None
+
+    def discard(self) -> None:
+        """Stop a JVM that will not run anything and remove its staging directory."""
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.communicate()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+
+class StarfishJVMPool:
+    """
+    Keeps up to ``size`` launcher JVMs warm for StarfishRunnerService.
+
+    Nothing starts until the first ``acquire``. Staging directories are created
+    under ``staging_dir`` (default: the system temp directory), which should be
+    on the same filesystem as the run directories.
+    """
+
+    def __init__(
+        self,
+        java_executable: str,
+        starfish_jar: Path,
+        size: int = 1,
+        staging_dir: Optional[Path | str] = None,
+    ):
+        self.java_executable = java_executable
+        self.starfish_jar = Path(starfish_jar)
+        self.size = max(0, size)
+        self.staging_dir = Path(staging_dir) if staging_dir is not None else Path(tempfile.gettempdir())
+        self._idle: Deque[WarmJVM] = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._warm_runs = 0
+        self._fallbacks = 0
+
+    @property
+    def command(self) -> Tuple[str, ...]:
+        jar = str(self.starfish_jar)
+        return (str(self.java_executable), "-cp", jar, str(LAUNCHER_SOURCE), jar)
+
+    @staticmethod
+    def supported() -> bool:
+        # Windows cannot rename a directory that is a process's working directory.
+        return os.name == "posix"
+
+    def start(self) -> None:
+        """Start JVMs until ``size`` are warming up or waiting."""
+        with self._lock:
+            self._fill()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every pooled JVM is ready; used by benchmarks to time warm runs only."""
+        self.start()
+        with self._lock:
+            pending = list(self._idle)
+        return all(jvm.wait_ready(timeout) for jvm in pending)
+
+    def acquire(self) -> Optional[WarmJVM]:
+        """Take a ready JVM, or return None when none is ready yet (the caller runs cold)."""
+        with self._lock:
+            if self._closed or not self.supported():
+                return None
+            failed = next((jvm for jvm in self._idle if jvm.failed), None)
+            if failed is not None:
+                # The launcher cannot start here (e.g. Java older than 11); stop trying for good.
+                self._closed = True
+                self._fallbacks += 1
+                discarded, self._idle = list(self._idle), deque()
+            else:
+                jvm = next((jvm for jvm in self._idle if jvm.ready), None)
+                if jvm is not None:
+                    self._idle.remove(jvm)
+                    self._warm_runs += 1
+                else:
+                    self._fallbacks += 1
+                self._fill()
+                return jvm
+
+        if failed.process.poll() is None:
+            failed.process.kill()
+        _, stderr = failed.process.communicate()
+        shutil.rmtree(failed.cwd, ignore_errors=True)
+        logger.warning(f"Warm Starfish JVM failed to start, using cold starts: {stderr.strip()[-500:]}")
+        for jvm in discarded:
+            if jvm is not failed:
+                jvm.discard()
+        return None
+
+    def release(self, jvm: WarmJVM) -> None:
+        """Return a JVM that was acquired but not used."""
+        with self._lock:
+            if not self._closed and len(self._idle) < self.size:
+                self._idle.appendleft(jvm)
+                return
+        jvm.discard()
+
+    def adopt(self, jvm: WarmJVM, run_dir: Path) -> bool:
+        """
+        Make ``run_dir`` the JVM's working directory, keeping its path, files and mode.
+
+        Returns False, with ``run_dir`` and its files back where they were, when
+        the directories are on different filesystems, the path cannot be sent
+        to the launcher or a rename fails.
+        """
+        run_dir = Path(run_dir).resolve()
+        staging = jvm.cwd
+        if "\n" in str(run_dir) or "\r" in str(run_dir):
+            return False
+        try:
+            run_stat = os.stat(run_dir)
+            if os.stat(staging).st_dev != run_stat.st_dev:
+                return False
+            aside = run_dir.with_name(f".{run_dir.name}.{uuid.uuid4().hex[:8]}")
+            os.rename(run_dir, aside)
+        except OSError:
+            return False
+
+        try:
+            os.rename(staging, run_dir)
+        except OSError:
+            os.rename(aside, run_dir)
+            return False
+
+        moved = []
+        try:
+            os.chmod(run_dir, run_stat.st_mode)
+            for entry in list(os.scandir(aside)):
+                os.rename(entry.path, run_dir / entry.name)
+                moved.append(entry.name)
+            os.rmdir(aside)
+        except OSError as exc:
+            logger.warning(f"Could not move {run_dir} into a warm JVM's directory, running cold: {exc}")
+            self._restore(run_dir, aside, staging, moved)
+            return False
+
+        jvm.cwd = run_dir
+        try:
+            # Paths the JVM derived from its old working directory lead to the run directory.
+            os.symlink(run_dir, staging, target_is_directory=True)
+            jvm.staging_link = staging
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _restore(run_dir: Path, aside: Path, staging: Path, moved: list) -> None:
+        """Undo a partial adoption: move the run's files back and give each directory its old path."""
+        try:
+            for name in reversed(moved):
+                os.rename(run_dir / name, aside / name)
+            os.rename(run_dir, staging)
+            os.rename(aside, run_dir)
+        except OSError as exc:
+            logger.error(f"Could not restore {run_dir} after a failed warm JVM adoption; its files are in {aside}: {exc}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "ready": sum(1 for jvm in self._idle if jvm.ready),
+                "warm_runs": self._warm_runs,
+                "fallbacks": self._fallbacks,
+            }
+
+    def close(self) -> None:
+        """Stop waiting JVMs; runs already in progress are not affected."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for jvm in idle:
+            jvm.discard()
+
+    def _fill(self) -> None:
+        if self._closed or not self.supported():
+            return
+        while len(self._idle) < self.size:
+            self.staging_dir.mkdir(parents=True, exist_ok=True)
+            cwd = Path(tempfile.mkdtemp(prefix="starfish_jvm_", dir=self.staging_dir))
+            try:
+                self._idle.append(WarmJVM(self.command, cwd))
+            except OSError as exc:
+                shutil.rmtree(cwd, ignore_errors=True)
+                logger.warning(f"Could not start a warm Starfish JVM: {exc}")
+                return
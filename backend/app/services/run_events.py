@@ -0,0 +1,217 @@
+"""
+Live events from a Starfish run directory.
+
+Starfish appends to ``starfish_stats.csv`` and ``starfish.log`` while it runs.
+The tailers here remember a byte offset per file and on each poll read only
+what was appended since, so a long run can be followed without re-reading
+whole files. New stats rows and important log lines are sent to API clients
+as Server-Sent Events.
+"""
+
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
+import csv
+import json
+import math
+
+from app.models.runs import RunStatus
+from app.services.starfish_stats import STATS_FILENAME
+
+LOG_FILENAME = "starfish.log"
+
+# Log lines worth showing while a run proceeds: input loading, domain setup, loop progress and problems.
+IMPORTANT_LOG_PREFIXES = (
+    "Loading ",
+    "Processing <",
+    "Domain type:",
+    "Added ",
+    "> nodes",
+    "> origin",
+    "> spacing",
+    ">dt:",
+    ">max_it:",
+    "Starting main loop",
+    "it:",
+    "Source Summary:",
+    "Done!",
+    "WARNING:",
+    "ERROR:",
+)
+
+# Stats columns sent to clients: iteration, simulation time, macroparticle counts and source terms.
+STATS_EVENT_COLUMNS = ("it", "time")
+STATS_EVENT_PREFIXES = ("mp.", "source.")
+
+_ACTIVE_STATES = ("queued", "running")
+
+
+def is_important_log_line(line: str, prefixes: Tuple[str, ...] = IMPORTANT_LOG_PREFIXES) -> bool:
+    return line.strip().startswith(prefixes)
+
+
+class FileTailer:
+    """Reads complete lines appended to a file since the previous call."""
+
+    def __init__(self, path: Path, max_read_bytes: int = 2**20):
+        self.path = Path(path)
+        self.max_read_bytes = max_read_bytes
+        self.offset = 0
+        self._partial = b""
+
+    @property
+    def pending(self) -> bool:
+        """True when the file has grown beyond what was read so far."""
+        try:
+            return self.path.stat().st_size > self.offset
+        except FileNotFoundError:
+            return False
+
+    def read_lines(self) -> List[str]:
+        """
+        Return the lines completed since the last call, reading at most ``max_read_bytes``.
+
+        A trailing line without a newline is held back until it is completed
+        (or returned by ``flush`` once the writer has finished).
+        """
+        try:
+            with self.path.open("rb") as handle:
+                handle.seek(self.offset)
+                data = handle.read(self.max_read_bytes)
+        except FileNotFoundError:
+            return []
+        if not data:
+            return []
+
+        self.offset += len(data)
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        return [_decode(line) for line in lines]
+
+    def flush(self) -> List[str]:
+        """Return the held-back last line, if any."""
+        partial, self._partial = self._partial, b""
+        return [_decode(partial)] if partial else []
+
+
+class StatsTailer:
+    """Parses rows appended to ``starfish_stats.csv`` into the columns sent as events."""
+
+    def __init__(self, path: Path):
+        self._lines = FileTailer(path)
+        self.columns: Optional[List[str]] = None
+        self._selected: List[Tuple[int, str]] = []
+
+    @property
+    def pending(self) -> bool:
+        return self._lines.pending
+
+    def read_rows(self, final: bool = False) -> List[Dict[str, Any]]:
+        lines = self._lines.read_lines()
+        if final:
+            lines += self._lines.flush()
+
+        rows: List[Dict[str, Any]] = []
+        for values in csv.reader(line for line in lines if line.strip()):
+            if self.columns is None:
+                self.columns = [value.strip() for value in values]
+                self._selected = [
+                    (index, name)
+                    for index, name in enumerate(self.columns)
+                    if name in STATS_EVENT_COLUMNS or name.startswith(STATS_EVENT_PREFIXES)
+                ]
+                continue
+            rows.append({name: _number(values[index]) for index, name in self._selected if index < len(values)})
+        return rows
+
+
+class RunTailer:
+    """Follows the stats and log files of one run directory."""
+
+    def __init__(self, run_dir: Path):
+        run_dir = Path(run_dir)
+        self.stats = StatsTailer(run_dir / STATS_FILENAME)
+        self.log = FileTailer(run_dir / LOG_FILENAME)
+
+    @property
+    def pending(self) -> bool:
+        return self.stats.pending or self.log.pending
+
+    def poll(self, final: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return ``(event, data)`` pairs for new stats rows and important log lines."""
+        events: List[Tuple[str, Dict[str, Any]]] = [("stats", row) for row in self.stats.read_rows(final)]
+        lines = self.log.read_lines()
+        if final:
+            lines += self.log.flush()
+        events.extend(("log", {"line": line}) for line in lines if is_important_log_line(line))
+        return events
+
+
+def format_sse(event: str, data: str) -> str:
+    """Format one Server-Sent Event; ``data`` must be a single line."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def stream_run_events(
+    run_dir: Path,
+    get_status: Callable[[], Optional[RunStatus]],
+    poll_interval: float = 0.5,
+    keepalive_seconds: float = 15.0,
+) -> AsyncIterator[str]:
+    """
+    Yield SSE messages for a run until it finishes.
+
+    Sends a ``status`` event at the start and on every state change, ``stats``
+    and ``log`` events as the files grow, and a comment line as keep-alive
+    when nothing happened for ``keepalive_seconds``. Once the run has
+    reached a final state the rest of both files is sent and the stream ends.
+    """
+    status = get_status()
+    if status is None:
+        return
+    yield format_sse("status", status.model_dump_json())
+
+    tailer = RunTailer(run_dir)
+    loop = asyncio.get_running_loop()
+    last_sent = loop.time()
+    while True:
+        finished = status.state not in _ACTIVE_STATES
+        # Once the run is over, read to the end of both files before closing the stream.
+        final = finished and not tailer.pending
+        for event, data in await asyncio.to_thread(tailer.poll, final):
+            yield format_sse(event, json.dumps(data))
+            last_sent = loop.time()
+        if final:
+            return
+        if finished or tailer.pending:
+            continue
+
+        await asyncio.sleep(poll_interval)
+        current = get_status()
+        if current is None:
+            return
+        if current.state != status.state:
+            yield format_sse("status", current.model_dump_json())
+            last_sent = loop.time()
+        status = current
+        if loop.time() - last_sent >= keepalive_seconds:
+            yield ": keep-alive\n\n"
+            last_sent = loop.time()
+
+
+def _decode(line: bytes) -> str:
+    return line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+def _number(value: str) -> Any:
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    # NaN and infinity are not valid JSON; keep them as text.
+    return number if math.isfinite(number) else value
@@ -0,0 +1,241 @@
+"""
+Simulation job queue.
+
+Runs submitted projects through AsyncStarfishRunner on a fixed number of
+worker tasks, so the API never blocks on a simulation and the number of
+concurrent JVMs on a node is bounded. Each run gets its own directory under
+the runs directory holding the XML files, Starfish outputs, captured
+stdout/stderr and a ``run.json`` status file, so results outlive the process.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+import asyncio
+import logging
+import os
+import re
+import uuid
+
+from app.models.runs import RunStatus
+from app.models.simulation import SimulationProject
+from app.services.starfish_runner import AsyncStarfishRunner
+
+logger = logging.getLogger(__name__)
+
+_RUN_ID = re.compile(r"^[0-9a-f]{32}$")
+STATUS_FILENAME = "run.json"
+
+
+class RunQueueFull(Exception):
+    """Raised when the queue already holds its maximum number of waiting runs."""
+
+
+def default_runs_dir() -> Path:
+    return Path(__file__).resolve().parents[3] / "starfish_runs" / "api"
+
+
+class RunQueue:
+    """Bounded FIFO of Starfish runs executed by ``concurrency`` worker tasks."""
+
+    def __init__(
+        self,
+        runs_dir: Path,
+        max_queued: int = 16,
+        concurrency: int = 1,
+        default_timeout: int = 600,
+        max_timeout: int = 3600,
+        runner: Optional[AsyncStarfishRunner] = None,
+        max_tracked: int = 1000,
+    ):
+        self.runs_dir = Path(runs_dir)
+        self.max_queued = max_queued
+        self.concurrency = max(1, concurrency)
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.runner = runner or AsyncStarfishRunner()
+        self.max_tracked = max_tracked
+        self._statuses: "OrderedDict[str, RunStatus]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "RunQueue":
+        """Configured by STARFISH_RUNS_DIR, RUN_QUEUE_MAX_SIZE, RUN_MAX_CONCURRENCY, RUN_TIMEOUT_SECONDS and RUN_MAX_TIMEOUT_SECONDS."""
+        return cls(
+            runs_dir=Path(os.getenv("STARFISH_RUNS_DIR") or default_runs_dir()),
+            max_queued=int(os.getenv("RUN_QUEUE_MAX_SIZE", "16")),
+            concurrency=int(os.getenv("RUN_MAX_CONCURRENCY", "1")),
+            default_timeout=int(os.getenv("RUN_TIMEOUT_SECONDS", "600")),
+            max_timeout=int(os.getenv("RUN_MAX_TIMEOUT_SECONDS", "3600")),
+        )
+
+    async def submit(self, project: SimulationProject, timeout: Optional[int] = None) -> RunStatus:
+        """
+        Queue a project for execution and return its initial status.
+
+        Raises ValueError for a timeout above the limit, RunQueueFull when the
+        queue is full, and RuntimeError/FileNotFoundError when Java or the
+        Starfish jar is missing.
+        """
+        timeout = timeout or self.default_timeout
+        if timeout > self.max_timeout:
+            raise ValueError(f"timeout must be at most {self.max_timeout} seconds")
+        self.runner.ensure_available()
+
+        queue = self._ensure_started()
+        if queue.full():
+            raise RunQueueFull(f"Run queue is full ({self.max_queued} runs waiting)")
+
+        run_id = uuid.uuid4().hex
+        run_dir = self.runs_dir / run_id
+        run_dir.mkdir(parents=True, exist_ok=False)
+        status = RunStatus(
+            id=run_id,
+            state="queued",
+            timeout=timeout,
+            run_dir=str(run_dir),
+            submitted_at=_now(),
+        )
+        self._save(status)
+        queue.put_nowait((run_id, project))
+        logger.info(f"Queued run {run_id} (timeout {timeout}s, {queue.qsize()} waiting)")
+        return status
+
+    def get(self, run_id: str) -> Optional[RunStatus]:
+        """Return a run's status from memory, or from its status file for older runs."""
+        status = self._statuses.get(run_id)
+        if status is not None:
+            return status
+        if not _RUN_ID.match(run_id):
+            return None
+        status_file = self.runs_dir / run_id / STATUS_FILENAME
+        if not status_file.exists():
+            return None
+        return RunStatus.model_validate_json(status_file.read_text(encoding="utf-8"))
+
+    def recover_interrupted(self) -> int:
+        """
+        Mark runs left queued or running by an earlier server process as failed.
+
+        Such runs have no worker task any more and would otherwise keep their
+        state forever, so polling and event streams would never see them end.
+        Runs tracked by this queue are left alone. Returns the number of runs marked.
+        """
+        if not self.runs_dir.is_dir():
+            return 0
+        recovered = 0
+        for status_file in self.runs_dir.glob(f"*/{STATUS_FILENAME}"):
+            run_id = status_file.parent.name
+            if run_id in self._statuses or not _RUN_ID.match(run_id):
+                continue
+            try:
+                status = RunStatus.model_validate_json(status_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Skipping unreadable run status {status_file}: {exc}")
+                continue
+            if status.state not in ("queued", "running"):
+                continue
+            self._finish(status, state="failed", error=f"Server stopped while the run was {status.state}")
+            recovered += 1
+        if recovered:
+            logger.info(f"Marked {recovered} interrupted runs as failed")
+        return recovered
+
+    async def shutdown(self) -> None:
+        """Stop the workers, killing running simulations, and mark unfinished runs cancelled."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                run_id, _ = self._queue.get_nowait()
+                self._finish(self._statuses[run_id], state="cancelled", error="Server shut down before the run started")
+        self._queue = None
+        self._loop = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Workers belong to the loop that serves requests; start them on first use.
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [
+                loop.create_task(self._worker(), name=f"starfish-run-worker-{index}")
+                for index in range(self.concurrency)
+            ]
+        return self._queue
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            run_id, project = await queue.get()
+            try:
+                await self._execute(self._statuses[run_id], project)
+            finally:
+                queue.task_done()
+
+    async def _execute(self, status: RunStatus, project: SimulationProject) -> None:
+        run_dir = Path(status.run_dir)
+        status = status.model_copy(update={"state": "running", "started_at": _now()})
+        self._save(status)
+        logger.info(f"Starting run {status.id}")
+
+        try:
+            result = await self.runner.run_project(project, timeout=status.timeout, work_dir=run_dir)
+        except asyncio.CancelledError:
+            self._finish(status, state="cancelled", error="Server shut down during the run")
+            raise
+        except Exception as exc:
+            logger.error(f"Run {status.id} failed: {exc}")
+            self._finish(status, state="failed", error=str(exc))
+            return
+
+        await asyncio.to_thread(self._write_output, run_dir, result.stdout, result.stderr)
+        if result.timed_out:
+            state = "timed_out"
+        else:
+            state = "succeeded" if result.ok else "failed"
+        self._finish(
+            status,
+            state=state,
+            returncode=result.returncode,
+            elapsed_seconds=round(result.elapsed_seconds, 3),
+            last_output_line=result.last_output_line,
+        )
+        logger.info(f"Run {status.id} {state} in {result.elapsed_seconds:.1f}s")
+
+    @staticmethod
+    def _write_output(run_dir: Path, stdout: str, stderr: str) -> None:
+        (run_dir / "stdout.log").write_text(stdout, encoding="utf-8")
+        (run_dir / "stderr.log").write_text(stderr, encoding="utf-8")
+
+    def _finish(self, status: RunStatus, **changes) -> None:
+        self._save(status.model_copy(update={"finished_at": _now(), **changes}))
+
+    def _save(self, status: RunStatus) -> None:
+        self._statuses[status.id] = status
+        self._statuses.move_to_end(status.id)
+        # Finished runs beyond the limit are dropped from memory; get() reads them from disk.
+        excess = len(self._statuses) - self.max_tracked
+        if excess > 0:
+            finished = [run_id for run_id, tracked in self._statuses.items() if tracked.state not in ("queued", "running")]
+            for run_id in finished[:excess]:
+                del self._statuses[run_id]
+
+        status_file = Path(status.run_dir) / STATUS_FILENAME
+        temporary = status_file.with_suffix(".tmp")
+        temporary.write_text(status.model_dump_json(indent=2), encoding="utf-8")
+        temporary.replace(status_file)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Shared queue used by the API.
+run_queue = RunQueue.from_env()
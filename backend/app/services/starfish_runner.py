@@ -1,13 +1,18 @@
 import argparse
+import asyncio
+import codecs
 from dataclasses import dataclass
+import inspect
+import locale
 import os
 from pathlib import Path, PurePath
 import shutil
+import signal
 import subprocess
 import sys
 import tempfile
 import time
-from typing import Mapping, Optional
+from typing import Awaitable, Callable, Iterable, Mapping, Optional, Union
 
 
 BACKEND_ROOT = Path(__file__).resolve().parents[2]
@@ -15,8 +20,12 @@ if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
 from app.models.simulation import SimulationProject
+from app.services.jvm_pool import StarfishJVMPool
 from app.services.xml_generator import XMLGeneratorService
 
+# Receives ("stdout" | "stderr", text) as output arrives; may be a coroutine function.
+OutputCallback = Callable[[str, str], Union[None, Awaitable[None]]]
+
 
 @dataclass(frozen=True)
 class StarfishRunResult:
@@ -46,9 +55,23 @@ class StarfishRunnerService:
         self,
         starfish_jar: Optional[Path | str] = None,
         java_executable: Optional[str] = None,
+        warm_jvms: Optional[int] = None,
     ):
         self.starfish_jar = self._resolve_starfish_jar(starfish_jar)
         self.java_executable = java_executable or shutil.which("java")
+        if warm_jvms is None:
+            warm_jvms = int(os.environ.get("STARFISH_WARM_JVMS", "0"))
+        # Optional pool of pre-started JVMs; runs fall back to a cold ``java -jar`` when none is ready.
+        self.jvm_pool = (
+            StarfishJVMPool(self.java_executable, self.starfish_jar, size=warm_jvms)
+            if warm_jvms > 0 and self.java_executable
+            else None
+        )
+
+    def close(self) -> None:
+        """Stop the JVMs waiting in the warm pool, if any."""
+        if self.jvm_pool is not None:
+            self.jvm_pool.close()
 
     def ensure_available(self) -> None:
         if not self.java_executable:
@@ -76,9 +99,10 @@ class StarfishRunnerService:
         work_dir: Optional[Path | str] = None,
         keep_work_dir: bool = False,
     ) -> StarfishRunResult:
-        xml_files = XMLGeneratorService().generate_xml_files(project)
-        return self.run_xml_files(
-            xml_files,
+        self.ensure_available()
+        xml_chunks = XMLGeneratorService().iter_xml_files(project)
+        return self._run_xml_chunks(
+            xml_chunks,
             timeout=timeout,
             work_dir=work_dir,
             keep_work_dir=keep_work_dir,
@@ -94,21 +118,34 @@ class StarfishRunnerService:
         self.ensure_available()
         if "starfish.xml" not in {self._safe_filename(name) for name in xml_files}:
             raise ValueError("xml_files must include starfish.xml")
+        return self._run_xml_chunks(
+            xml_files.items(),
+            timeout=timeout,
+            work_dir=work_dir,
+            keep_work_dir=keep_work_dir,
+        )
 
+    def _run_xml_chunks(
+        self,
+        xml_chunks: Iterable[tuple[str, str]],
+        timeout: int,
+        work_dir: Optional[Path | str],
+        keep_work_dir: bool,
+    ) -> StarfishRunResult:
         if work_dir is not None:
             run_dir = Path(work_dir)
             run_dir.mkdir(parents=True, exist_ok=True)
-            self.write_xml_files(run_dir, xml_files)
+            self.write_xml_chunks(run_dir, xml_chunks)
             return self._run_in_dir(run_dir, timeout, keep_result_dir=True)
 
         if keep_work_dir:
             run_dir = Path(tempfile.mkdtemp(prefix="starfish_run_"))
-            self.write_xml_files(run_dir, xml_files)
+            self.write_xml_chunks(run_dir, xml_chunks)
             return self._run_in_dir(run_dir, timeout, keep_result_dir=True)
 
         with tempfile.TemporaryDirectory(prefix="starfish_run_") as tmp_dir:
             run_dir = Path(tmp_dir)
-            self.write_xml_files(run_dir, xml_files)
+            self.write_xml_chunks(run_dir, xml_chunks)
             return self._run_in_dir(run_dir, timeout, keep_result_dir=False)
 
     def run_directory(
@@ -125,10 +162,25 @@ class StarfishRunnerService:
         return self._run_in_dir(run_dir, timeout, keep_result_dir=True)
 
     def write_xml_files(self, target_dir: Path, xml_files: Mapping[str, str]) -> None:
+        self.write_xml_chunks(target_dir, xml_files.items())
+
+    def write_xml_chunks(self, target_dir: Path, xml_chunks: Iterable[tuple[str, str]]) -> None:
+        """Write (filename, text-chunk) pairs as they are produced; chunks of one file must be consecutive."""
         target_dir.mkdir(parents=True, exist_ok=True)
-        for filename, content in xml_files.items():
-            safe_name = self._safe_filename(filename)
-            (target_dir / safe_name).write_text(content, encoding="utf-8")
+        current_name: Optional[str] = None
+        handle = None
+        try:
+            for filename, chunk in xml_chunks:
+                if filename != current_name:
+                    if handle is not None:
+                        handle.close()
+                    safe_name = self._safe_filename(filename)
+                    handle = (target_dir / safe_name).open("w", encoding="utf-8")
+                    current_name = filename
+                handle.write(chunk)
+        finally:
+            if handle is not None:
+                handle.close()
 
     def _run_in_dir(
         self,
@@ -136,6 +188,11 @@ class StarfishRunnerService:
         timeout: int,
         keep_result_dir: bool,
     ) -> StarfishRunResult:
+        if self.jvm_pool is not None:
+            result = self._run_warm(run_dir, timeout, keep_result_dir)
+            if result is not None:
+                return result
+
         command = (str(self.java_executable), "-jar", str(self.starfish_jar))
         started = time.monotonic()
         try:
@@ -170,6 +227,37 @@ class StarfishRunnerService:
                 timed_out=True,
             )
 
+    def _run_warm(
+        self,
+        run_dir: Path,
+        timeout: int,
+        keep_result_dir: bool,
+    ) -> Optional[StarfishRunResult]:
+        jvm = self.jvm_pool.acquire()
+        if jvm is None:
+            return None
+        if not self.jvm_pool.adopt(jvm, run_dir):
+            self.jvm_pool.release(jvm)
+            return None
+
+        started = time.monotonic()
+        outcome = jvm.run(timeout)
+        if outcome is None:
+            # Rejected before Starfish started; run_dir holds the run's files, so a cold start can use it.
+            return None
+        returncode, stdout, stderr, timed_out = outcome
+        if timed_out:
+            stderr = f"{stderr}\nTimed out after {timeout} seconds".strip()
+        return StarfishRunResult(
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            elapsed_seconds=time.monotonic() - started,
+            command=jvm.command,
+            run_dir=str(run_dir) if keep_result_dir else None,
+            timed_out=timed_out,
+        )
+
     @staticmethod
     def _resolve_starfish_jar(starfish_jar: Optional[Path | str]) -> Path:
         if starfish_jar is not None:
@@ -198,6 +286,245 @@ class StarfishRunnerService:
         return str(value)
 
 
+class AsyncStarfishRunner:
+    """
+    Starfish runs on asyncio subprocesses, for use inside an event loop.
+
+    Runs never block the loop. ``max_concurrency`` bounds how many JVMs run at
+    once (the timeout only starts once a run has a slot). Starfish runs in its
+    own process group, so timeouts and task cancellation kill the JVM and
+    anything it started. ``on_output`` receives stdout/stderr text as it arrives.
+
+    This is not a StarfishRunnerService: its run methods are coroutines. Jar
+    and java lookup, XML writing and filename checks are delegated to a
+    StarfishRunnerService held in ``service``; its warm JVM pool is
+    synchronous and therefore disabled.
+    """
+
+    READ_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        starfish_jar: Optional[Path | str] = None,
+        java_executable: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.service = StarfishRunnerService(starfish_jar, java_executable, warm_jvms=0)
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    @property
+    def starfish_jar(self) -> Path:
+        return self.service.starfish_jar
+
+    @property
+    def java_executable(self) -> Optional[str]:
+        return self.service.java_executable
+
+    def ensure_available(self) -> None:
+        self.service.ensure_available()
+
+    async def java_version_line(self) -> str:
+        return await asyncio.to_thread(self.service.java_version_line)
+
+    async def run_project(
+        self,
+        project: SimulationProject,
+        timeout: int = 60,
+        work_dir: Optional[Path | str] = None,
+        keep_work_dir: bool = False,
+        on_output: Optional[OutputCallback] = None,
+    ) -> StarfishRunResult:
+        self.ensure_available()
+        xml_chunks = await asyncio.to_thread(XMLGeneratorService().iter_xml_files, project)
+        return await self._run_xml_chunks(xml_chunks, timeout, work_dir, keep_work_dir, on_output)
+
+    async def run_xml_files(
+        self,
+        xml_files: Mapping[str, str],
+        timeout: int = 60,
+        work_dir: Optional[Path | str] = None,
+        keep_work_dir: bool = False,
+        on_output: Optional[OutputCallback] = None,
+    ) -> StarfishRunResult:
+        self.ensure_available()
+        if "starfish.xml" not in {StarfishRunnerService._safe_filename(name) for name in xml_files}:
+            raise ValueError("xml_files must include starfish.xml")
+        return await self._run_xml_chunks(xml_files.items(), timeout, work_dir, keep_work_dir, on_output)
+
+    async def run_directory(
+        self,
+        project_dir: Path | str,
+        timeout: int = 60,
+        on_output: Optional[OutputCallback] = None,
+    ) -> StarfishRunResult:
+        self.ensure_available()
+        run_dir = Path(project_dir).expanduser().resolve()
+        if not run_dir.is_dir():
+            raise NotADirectoryError(f"Starfish project directory does not exist: {run_dir}")
+        if not (run_dir / "starfish.xml").exists():
+            raise FileNotFoundError(f"Missing required file: {run_dir / 'starfish.xml'}")
+        return await self._run_in_dir(run_dir, timeout, keep_result_dir=True, on_output=on_output)
+
+    async def _run_xml_chunks(
+        self,
+        xml_chunks: Iterable[tuple[str, str]],
+        timeout: int,
+        work_dir: Optional[Path | str],
+        keep_work_dir: bool,
+        on_output: Optional[OutputCallback],
+    ) -> StarfishRunResult:
+        if work_dir is not None:
+            run_dir = Path(work_dir)
+            await asyncio.to_thread(self.service.write_xml_chunks, run_dir, xml_chunks)
+            return await self._run_in_dir(run_dir, timeout, keep_result_dir=True, on_output=on_output)
+
+        run_dir = Path(tempfile.mkdtemp(prefix="starfish_run_"))
+        try:
+            await asyncio.to_thread(self.service.write_xml_chunks, run_dir, xml_chunks)
+            return await self._run_in_dir(run_dir, timeout, keep_result_dir=keep_work_dir, on_output=on_output)
+        finally:
+            if not keep_work_dir:
+                await asyncio.to_thread(shutil.rmtree, run_dir, True)
+
+    async def _run_in_dir(
+        self,
+        run_dir: Path,
+        timeout: int,
+        keep_result_dir: bool,
+        on_output: Optional[OutputCallback] = None,
+    ) -> StarfishRunResult:
+        if self._slots is None:
+            return await self._run_process(run_dir, timeout, keep_result_dir, on_output)
+        async with self._slots:
+            return await self._run_process(run_dir, timeout, keep_result_dir, on_output)
+
+    async def _run_process(
+        self,
+        run_dir: Path,
+        timeout: int,
+        keep_result_dir: bool,
+        on_output: Optional[OutputCallback],
+    ) -> StarfishRunResult:
+        command = (str(self.java_executable), "-jar", str(self.starfish_jar))
+        started = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=run_dir,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **self._process_group_options(),
+        )
+        stdout_parts: list[str] = []
+        stderr_parts: list[str] = []
+        finished = asyncio.ensure_future(
+            asyncio.gather(
+                self._pump(process.stdout, "stdout", stdout_parts, on_output),
+                self._pump(process.stderr, "stderr", stderr_parts, on_output),
+                process.wait(),
+            )
+        )
+
+        timed_out = False
+        try:
+            await asyncio.wait_for(asyncio.shield(finished), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            await self._kill_process_group(process)
+            await finished
+        except BaseException:
+            # Cancelled, or the output callback failed: never leave the JVM running.
+            try:
+                await asyncio.shield(self._kill_process_group(process))
+                await asyncio.shield(finished)
+            except BaseException:
+                pass
+            raise
+
+        stdout = "".join(stdout_parts)
+        stderr = "".join(stderr_parts)
+        if timed_out:
+            stderr = f"{stderr}\nTimed out after {timeout} seconds".strip()
+        return StarfishRunResult(
+            returncode=124 if timed_out else process.returncode,
+            stdout=stdout,
+            stderr=stderr,
+            elapsed_seconds=time.monotonic() - started,
+            command=command,
+            run_dir=str(run_dir) if keep_result_dir else None,
+            timed_out=timed_out,
+        )
+
+    @classmethod
+    async def _pump(
+        cls,
+        stream: asyncio.StreamReader,
+        name: str,
+        parts: list[str],
+        on_output: Optional[OutputCallback],
+    ) -> None:
+        """Decode a pipe incrementally with universal newlines, like subprocess text mode."""
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+        pending_cr = ""
+        while True:
+            data = await stream.read(cls.READ_CHUNK_SIZE)
+            text = pending_cr + decoder.decode(data, final=not data)
+            pending_cr = ""
+            if data and text.endswith("\r"):
+                # The matching "\n" may arrive in the next chunk.
+                text, pending_cr = text[:-1], "\r"
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            if text:
+                parts.append(text)
+                if on_output is not None:
+                    result = on_output(name, text)
+                    if inspect.isawaitable(result):
+                        await result
+            if not data:
+                return
+
+    @staticmethod
+    def _process_group_options() -> dict:
+        if os.name == "posix":
+            return {"start_new_session": True}
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+    @staticmethod
+    async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+        """
+        Kill the JVM and every process it started.
+
+        POSIX kills the whole session. Windows has no group kill signal (Java
+        answers CTRL_BREAK_EVENT with a thread dump), so ``taskkill /T`` ends
+        the process tree; it runs as an asyncio subprocess so the loop keeps
+        serving while it works. Children whose parent has already exited are
+        no longer in that tree and may survive.
+        """
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+                return
+            if process.returncode is not None:
+                return
+            try:
+                taskkill = await asyncio.create_subprocess_exec(
+                    "taskkill", "/F", "/T", "/PID", str(process.pid),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+                try:
+                    await asyncio.wait_for(taskkill.wait(), 10)
+                except asyncio.TimeoutError:
+                    taskkill.kill()
+            except OSError:
+                pass
+            if process.returncode is None:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+
 def main(argv: Optional[list[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Run StarfishCLI from ezxml4starfish.")
     parser.add_argument(
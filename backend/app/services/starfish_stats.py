@@ -0,0 +1,205 @@
+"""
+Reading ``starfish_stats.csv``.
+
+Starfish appends one row per output iteration with columns such as ``it``,
+``time``, ``mp.<species>`` and ``source.<name> (kg/s)``. Long runs with many
+species make that file large, so summaries should not load it as a list of
+dicts of strings:
+
+* ``read_stats_tail`` parses only the header and the final row, found by
+  reading backwards from the end of the file, and counts the other rows by
+  scanning their bytes without decoding or parsing them.
+* ``load_stats`` loads the whole file into one typed ``array('d')`` (8 bytes per
+  value). ``StarfishStats.column`` slices a column out of it without copying
+  row by row, and ``summarize`` computes min/max/mean per column over a window
+  of iterations with the C-level ``min``/``max``/``math.fsum`` on those slices.
+
+While Starfish is still writing, the last line can be an incomplete row.
+Rows whose field count differs from the header are skipped, so the final row
+always has every column.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Mapping, Optional, Sequence
+import csv
+import math
+
+from app.utils.reverse_lines import iter_reversed_lines
+
+STATS_FILENAME = "starfish_stats.csv"
+
+
+@dataclass(frozen=True)
+class StatsTail:
+    """Header, last complete row (as written) and number of complete data rows of a stats file."""
+
+    columns: List[str]
+    final_row: Dict[str, str]
+    rows: int
+
+
+@dataclass(frozen=True)
+class ColumnSummary:
+    min: float
+    max: float
+    mean: float
+
+
+class StarfishStats:
+    """Stats rows held in one flat row-major ``array('d')``, read back one column at a time."""
+
+    def __init__(self, columns: Sequence[str], values: array):
+        self.columns = list(columns)
+        self.values = values
+        self._index = {name: index for index, name in enumerate(self.columns)}
+
+    def __len__(self) -> int:
+        return len(self.values) // len(self.columns) if self.columns else 0
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> array:
+        """Values of one column for rows ``start:stop``, as an ``array('d')``."""
+        width = len(self.columns)
+        index = self._index[name]
+        stop = len(self) if stop is None else min(stop, len(self))
+        if stop <= start:
+            return array("d")
+        return self.values[start * width + index:stop * width:width]
+
+    def row(self, index: int) -> Dict[str, float]:
+        width = len(self.columns)
+        index = range(len(self))[index]
+        return dict(zip(self.columns, self.values[index * width:(index + 1) * width]))
+
+    def window(self, first_it: Optional[float] = None, last_it: Optional[float] = None) -> range:
+        """Row indices whose ``it`` lies in ``[first_it, last_it]``; Starfish writes ``it`` in ascending order."""
+        if first_it is None and last_it is None:
+            return range(len(self))
+        iterations = self.column("it")
+        start = 0 if first_it is None else bisect_left(iterations, first_it)
+        stop = len(self) if last_it is None else bisect_right(iterations, last_it)
+        return range(start, max(start, stop))
+
+    def summarize(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        first_it: Optional[float] = None,
+        last_it: Optional[float] = None,
+        last_rows: Optional[int] = None,
+    ) -> Dict[str, ColumnSummary]:
+        """
+        Min, max and mean of each column over a window of iterations.
+
+        The window is ``[first_it, last_it]`` by iteration number, or the final
+        ``last_rows`` rows of it. NaN values (unparseable cells) are ignored; a
+        column with no other values is left out.
+        """
+        rows = self.window(first_it, last_it)
+        if last_rows is not None:
+            rows = rows[-last_rows:] if last_rows > 0 else rows[:0]
+        if not rows:
+            return {}
+
+        summaries: Dict[str, ColumnSummary] = {}
+        for name in columns or self.columns:
+            values = self.column(name, rows.start, rows.stop)
+            if any(map(math.isnan, values)):
+                values = array("d", (value for value in values if not math.isnan(value)))
+            if values:
+                summaries[name] = ColumnSummary(min(values), max(values), math.fsum(values) / len(values))
+        return summaries
+
+
+def load_stats(stats_file: Path) -> StarfishStats:
+    """
+    Load a stats file into a ``StarfishStats``; a missing file gives no columns and no rows.
+
+    Blank lines and rows with the wrong number of fields (a row still being
+    written) are skipped; cells that are not numbers become NaN.
+    """
+    values = array("d")
+    if not Path(stats_file).exists():
+        return StarfishStats([], values)
+
+    with Path(stats_file).open(newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        columns = [name.strip() for name in next(reader, [])]
+        width = len(columns)
+        for row in reader:
+            if len(row) != width:
+                continue
+            mark = len(values)
+            try:
+                values.extend(map(float, row))
+            except ValueError:
+                del values[mark:]
+                values.extend(map(_to_float, row))
+    return StarfishStats(columns, values)
+
+
+def read_stats_tail(stats_file: Path) -> StatsTail:
+    """
+    Header, final complete row and row count of a stats file.
+
+    Only the header and the last lines are parsed. Counting rows still reads
+    the whole file, but only as bytes. Blank lines are not rows, like
+    ``csv.DictReader``. Trailing rows with the wrong number of fields (a row
+    still being written) are neither counted nor returned.
+    """
+    stats_file = Path(stats_file)
+    if not stats_file.exists():
+        return StatsTail([], {}, 0)
+
+    with stats_file.open("rb") as handle:
+        header = handle.readline()
+        columns = [name.strip() for name in next(csv.reader([_decode(header)]), [])]
+        final_values: List[str] = []
+        incomplete = 0
+        for line in iter_reversed_lines(handle, start=len(header)):
+            if not line:
+                continue
+            values = next(csv.reader([_decode(line)]), [])
+            if len(values) == len(columns):
+                final_values = values
+                break
+            incomplete += 1
+        rows = _count_rows(handle, start=len(header)) - incomplete if final_values else 0
+
+    final_row = {name: value.strip() for name, value in zip(columns, final_values)}
+    return StatsTail(columns, final_row, rows)
+
+
+def particle_counts(row: Mapping[str, object]) -> Dict[str, int]:
+    """Final macroparticle count per species from the ``mp.<species>`` columns of a row."""
+    counts: Dict[str, int] = {}
+    for key, value in row.items():
+        if key.startswith("mp."):
+            try:
+                counts[key.removeprefix("mp.")] = int(float(value))
+            except (TypeError, ValueError):
+                counts[key.removeprefix("mp.")] = 0
+    return counts
+
+
+def source_terms(row: Mapping[str, object]) -> Dict[str, object]:
+    """The ``source.<name>`` columns of a row."""
+    return {key: value for key, value in row.items() if key.startswith("source.")}
+
+
+def _count_rows(handle: BinaryIO, start: int) -> int:
+    """Number of non-empty lines after byte ``start``."""
+    handle.seek(start)
+    return sum(1 for line in handle if line.strip(b"\r\n"))
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r\n")
@@ -0,0 +1,235 @@
+"""
+Content-addressed cache for generated XML bundles.
+
+Bundles are keyed by a SHA-256 of the canonical project JSON, so re-exporting an
+unchanged project returns the previously generated XML files and ZIP archive
+instead of running the generator again. Single XML files are also cached by
+the fingerprints of the project sections they depend on, so a partly edited
+project only regenerates the files whose inputs changed.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from app.models.simulation import SimulationProject
+from app.services.xml_generator import XMLGeneratorService
+from app.utils.zip_stream import iter_zip_stream
+
+logger = logging.getLogger(__name__)
+
+
+def project_cache_key(project: SimulationProject) -> str:
+    """Return the canonical content hash of a project, combined from its section fingerprints."""
+    fingerprints = project.section_fingerprints()
+    return hashlib.sha256(json.dumps(fingerprints, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class XMLBundle:
+    key: str
+    xml_files: Dict[str, str]
+    zip_bytes: bytes
+
+    @property
+    def size(self) -> int:
+        return sum(len(content) for content in self.xml_files.values()) + len(self.zip_bytes)
+
+
+class _BoundedLRUCache(ABC):
+    """Thread-safe LRU cache bounded by entry count and total size, with hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int, max_bytes: int, enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _sizeof(self, value: Any) -> int:
+        """Size of ``value`` counted against ``max_bytes``."""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key``, counting a hit or a miss."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """Insert a value, evicting least recently used entries to stay within bounds."""
+        if not self.enabled:
+            return False
+
+        size = self._sizeof(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current occupancy."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """Drop all cached values; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def _env_enabled() -> bool:
+    return os.getenv("XML_CACHE_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+class XMLSectionCache(_BoundedLRUCache):
+    """
+    Generated text of single XML files, keyed by the file name and the fingerprints it depends on.
+
+    Used by XMLGeneratorService to reuse files whose project sections did not change.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 2**20, enabled: bool = True):
+        super().__init__(max_entries, max_bytes, enabled)
+
+    @classmethod
+    def from_env(cls) -> "XMLSectionCache":
+        """Build a cache configured by XML_CACHE_ENABLED and XML_SECTION_CACHE_MAX_MB."""
+        max_bytes = int(float(os.getenv("XML_SECTION_CACHE_MAX_MB", "32")) * 2**20)
+        return cls(max_bytes=max_bytes, enabled=_env_enabled())
+
+    def _sizeof(self, value: str) -> int:
+        return len(value)
+
+
+class XMLBundleCache(_BoundedLRUCache):
+    """Complete generated bundles (XML files and ZIP archive) keyed by project content hash."""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 2**20, enabled: bool = True):
+        super().__init__(max_entries, max_bytes, enabled)
+
+    @classmethod
+    def from_env(cls) -> "XMLBundleCache":
+        """Build a cache configured by XML_CACHE_ENABLED, XML_CACHE_MAX_ENTRIES and XML_CACHE_MAX_MB."""
+        max_entries = int(os.getenv("XML_CACHE_MAX_ENTRIES", "128"))
+        max_bytes = int(float(os.getenv("XML_CACHE_MAX_MB", "64")) * 2**20)
+        return cls(max_entries=max_entries, max_bytes=max_bytes, enabled=_env_enabled())
+
+    def _sizeof(self, value: XMLBundle) -> int:
+        return value.size
+
+    def lookup(self, project: SimulationProject) -> Tuple[str, Optional[XMLBundle]]:
+        """Return the project's key and its cached bundle, counting a hit or a miss."""
+        key = project_cache_key(project)
+        bundle = self.get(key)
+        if bundle is None:
+            return key, None
+        return key, XMLBundle(bundle.key, dict(bundle.xml_files), bundle.zip_bytes)
+
+    def store(self, key: str, xml_files: Dict[str, str], zip_bytes: bytes) -> None:
+        """Cache a generated bundle under ``key``."""
+        if self.enabled and not self.put(key, XMLBundle(key, dict(xml_files), zip_bytes)):
+            logger.info(f"XML bundle {key[:12]} is larger than the cache and was not stored")
+
+    def get_bundle(
+        self,
+        project: SimulationProject,
+        generator: Optional[XMLGeneratorService] = None,
+    ) -> XMLBundle:
+        """
+        Return the XML files and ZIP archive for a project, generating them on a miss.
+        """
+        key, bundle = self.lookup(project)
+        if bundle is not None:
+            return bundle
+
+        generator = generator or XMLGeneratorService()
+        xml_files = generator.generate_xml_files(project)
+        zip_bytes = b"".join(iter_zip_stream(xml_files.items()))
+        self.store(key, xml_files, zip_bytes)
+        return XMLBundle(key, dict(xml_files), zip_bytes)
+
+    def stream_zip(self, key: str, entries: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+        """
+        Stream a ZIP archive for generated entries and cache it once complete.
+
+        Output is collected only while it fits in the cache, so streaming a
+        project too large to cache keeps its bounded memory use.
+        """
+        if not self.enabled:
+            yield from iter_zip_stream(entries)
+            return
+
+        xml_chunks: Dict[str, List[str]] = {}
+        zip_chunks: List[bytes] = []
+        collected = 0
+        collecting = True
+
+        def collect(size: int) -> None:
+            nonlocal collected, collecting
+            collected += size
+            if collected > self.max_bytes:
+                # Too large to cache: release what was collected so far.
+                collecting = False
+                xml_chunks.clear()
+                zip_chunks.clear()
+
+        def tee(source: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+            for filename, chunk in source:
+                if collecting:
+                    xml_chunks.setdefault(filename, []).append(chunk)
+                    collect(len(chunk))
+                yield filename, chunk
+
+        for data in iter_zip_stream(tee(entries)):
+            if collecting:
+                zip_chunks.append(data)
+                collect(len(data))
+            yield data
+
+        if collecting:
+            xml_files = {filename: "".join(parts) for filename, parts in xml_chunks.items()}
+            self.store(key, xml_files, b"".join(zip_chunks))
+
+
+# Shared caches used by the API.
+xml_bundle_cache = XMLBundleCache.from_env()
+xml_section_cache = XMLSectionCache.from_env()
@@ -3,18 +3,55 @@ XML生成服务
 将JSON结构生成为Starfish XML文件
 """
 
-from typing import Dict, List, Any
+from collections import defaultdict
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import logging
 
-from app.models.simulation import SimulationProject, Boundary, Material, Source, Interaction
+from app.models.simulation import (
+    PROJECT_SECTIONS,
+    Boundary,
+    Interaction,
+    Material,
+    ResolvedProject,
+    SimulationProject,
+    Source,
+)
+from app.utils.path_codec import flatten_points, format_path
 
 logger = logging.getLogger(__name__)
 
 class XMLGeneratorService:
     """XML生成服务类"""
 
+    # 文件生成顺序（也是ZIP和磁盘写入的顺序）
+    XML_FILE_ORDER = (
+        "domain.xml",
+        "boundaries.xml",
+        "materials.xml",
+        "sources.xml",
+        "interactions.xml",
+        "starfish.xml",
+    )
+
+    # 各文件依赖的项目部分；starfish.xml还依赖实际生成的文件列表
+    XML_FILE_SECTIONS = {
+        "domain.xml": ("domain",),
+        "boundaries.xml": ("boundaries", "domain"),
+        "materials.xml": ("materials",),
+        "sources.xml": ("sources",),
+        "interactions.xml": ("interactions",),
+        "starfish.xml": ("settings",),
+    }
+
+    def __init__(self, section_cache=None):
+        """
+        Args:
+            section_cache: 可选的单文件缓存（提供get/put方法和max_bytes属性，
+                如XMLSectionCache）。提供时，依赖部分指纹未变的文件直接复用之前的输出
+        """
+        self.section_cache = section_cache
+
     def generate_xml_files(self, project: SimulationProject) -> Dict[str, str]:
         """
         生成所有XML文件
@@ -25,57 +62,166 @@ class XMLGeneratorService:
         Returns:
             Dict[str, str]: 文件名到XML内容的映射
         """
+        chunks: Dict[str, List[str]] = {}
+        for filename, chunk in self.iter_xml_files(project):
+            chunks.setdefault(filename, []).append(chunk)
+
+        xml_files = {filename: "".join(parts) for filename, parts in chunks.items()}
+        logger.info(f"Generated {len(xml_files)} XML files")
+        return xml_files
+
+    def iter_xml_files(self, project: SimulationProject) -> Iterator[Tuple[str, str]]:
+        """
+        惰性生成所有XML文件
+
+        调用时立即完成项目修正（见resolve_project），因此修正阶段的异常在调用处抛出；
+        返回的迭代器再按XML_FILE_ORDER逐个文件、逐个顶层元素产出文本块。
+        同一文件的块是连续的，按顺序拼接即为完整文件内容。传入的project不会被修改。
+
+        Args:
+            project: 项目对象
+
+        Returns:
+            Iterator[Tuple[str, str]]: (文件名, 文本块) 迭代器
+        """
         logger.info("Starting XML file generation")
+        resolved = self.resolve_project(project)
+        return self._iter_planned_files(resolved, self._planned_xml_files(resolved))
+
+    def _iter_planned_files(self, project: SimulationProject, filenames: List[str]) -> Iterator[Tuple[str, str]]:
+        if self.section_cache is None:
+            for filename in filenames:
+                for chunk in self.iter_file_chunks(project, filename):
+                    yield filename, chunk
+                logger.info(f"Generated {filename}")
+            return
 
-        # 验证和修复材料引用
-        self._validate_and_fix_material_references(project)
+        # 指纹基于修正后的项目计算，修正阶段补充的材料、边界等都会反映在指纹中
+        fingerprints = project.section_fingerprints()
+        for filename in filenames:
+            key = self._section_cache_key(filename, fingerprints, filenames)
+            cached = self.section_cache.get(key)
+            if cached is not None:
+                yield filename, cached
+                logger.info(f"Reused {filename}")
+                continue
+
+            # 边生成边收集，超过缓存上限后不再收集，避免大文件占用双份内存
+            parts: Optional[List[str]] = []
+            collected = 0
+            for chunk in self.iter_file_chunks(project, filename):
+                if parts is not None:
+                    parts.append(chunk)
+                    collected += len(chunk)
+                    if collected > self.section_cache.max_bytes:
+                        parts = None
+                yield filename, chunk
+            if parts is not None:
+                self.section_cache.put(key, "".join(parts))
+            logger.info(f"Generated {filename}")
+
+    def _section_cache_key(self, filename: str, fingerprints: Dict[str, str], filenames: List[str]) -> Tuple:
+        """单文件缓存键：文件名 + 依赖部分的指纹"""
+        key = (filename,) + tuple(fingerprints[section] for section in self.XML_FILE_SECTIONS[filename])
+        if filename == "starfish.xml":
+            key += tuple(filenames)
+        return key
+
+    def resolve_project(self, project: SimulationProject) -> ResolvedProject:
+        """
+        生成前修正项目，返回新的只读ResolvedProject
 
-        # 处理电离能：从MCC相互作用中提取并添加到材料定义中
-        self._process_ionization_energies(project)
+        补充缺失的材料定义、写入电离能、为没有边界的源指定（必要时创建）默认边界。
+        修正在副本上进行，传入的project不会被修改：被修正的列表和其中的边界、材料、源
+        会浅拷贝，节点列表、相互作用等未被修改的部分与原项目共享。
 
-        xml_files = {}
+        Args:
+            project: 项目对象
 
-        # 生成计算域文件
-        xml_files["domain.xml"] = self._generate_domain_xml(project)
-        logger.info("Generated domain.xml")
+        Returns:
+            ResolvedProject: 修正后的项目，XML生成只读取此对象
+        """
+        if isinstance(project, ResolvedProject):
+            return project
 
-        # 生成边界文件（在处理源项后，可能会创建默认边界）
-        # 先处理源项，这可能会创建默认边界
-        sources_xml = None
-        if project.sources:
-            sources_xml = self._generate_sources_xml(project.sources, project)
+        working = project.model_copy(update={
+            "boundaries": [boundary.model_copy() for boundary in project.boundaries],
+            "materials": [material.model_copy() for material in project.materials],
+            "sources": [source.model_copy() for source in project.sources],
+        })
 
-        # 现在生成边界文件（如果有边界的话）
-        if project.boundaries:
-            xml_files["boundaries.xml"] = self._generate_boundaries_xml(project.boundaries, project)
-            logger.info("Generated boundaries.xml")
+        # 验证和修复材料引用
+        self._validate_and_fix_material_references(working)
 
-        # 生成材料文件
-        if project.materials:
-            xml_files["materials.xml"] = self._generate_materials_xml(project.materials)
-            logger.info("Generated materials.xml")
+        # 处理电离能：从MCC相互作用中提取并添加到材料定义中
+        self._process_ionization_energies(working)
 
-        # 生成源文件（如果之前没有生成的话）
-        if project.sources and sources_xml is None:
-            sources_xml = self._generate_sources_xml(project.sources, project)
+        # 没有边界的源使用第一个边界，没有边界时创建默认边界
+        for source in working.sources:
+            if not source.boundary:
+                source.boundary = self._find_available_boundary_for_volume_source(source, working)
 
-        if sources_xml:
-            xml_files["sources.xml"] = sources_xml
-            logger.info("Generated sources.xml")
+        return ResolvedProject.model_construct(**{name: getattr(working, name) for name in PROJECT_SECTIONS})
 
-        # 生成相互作用文件
-        if project.interactions:
-            xml_files["interactions.xml"] = self._generate_interactions_xml(project.interactions)
-            logger.info("Generated interactions.xml")
+    def iter_file_chunks(self, project: SimulationProject, filename: str) -> Iterator[str]:
+        """
+        惰性生成单个XML文件的文本块
 
-        # 最后生成主配置文件（这样可以正确检查所有文件是否存在）
-        xml_files["starfish.xml"] = self._generate_starfish_xml(project, xml_files)
-        logger.info("Generated starfish.xml")
+        未经resolve_project修正的项目会先被修正（不修改传入的对象）。只读取修正后的项目，
+        因此可以在多个线程中对同一个ResolvedProject并发生成不同的文件。
 
-        logger.info(f"Generated {len(xml_files)} XML files")
-        return xml_files
-    
-    def _generate_starfish_xml(self, project: SimulationProject, xml_files: Dict[str, str] = None) -> str:
+        Args:
+            project: 项目对象，通常是resolve_project返回的ResolvedProject
+            filename: 要生成的文件名
+
+        Yields:
+            str: 文本块，按顺序拼接即为完整文件内容
+        """
+        project = self.resolve_project(project)
+        if filename not in self._planned_xml_files(project):
+            raise ValueError(f"{filename} is not generated for this project")
+
+        if filename == "domain.xml":
+            yield self._generate_domain_xml(project)
+        elif filename == "boundaries.xml":
+            yield from self._iter_pretty_chunks(
+                ET.Element("boundaries"),
+                self._iter_boundary_elements(project.boundaries, project),
+            )
+        elif filename == "materials.xml":
+            yield from self._iter_pretty_chunks(
+                ET.Element("materials"),
+                (self._build_material_element(material) for material in project.materials),
+            )
+        elif filename == "sources.xml":
+            yield from self._iter_pretty_chunks(
+                ET.Element("sources"),
+                (self._build_source_element(source, project) for source in project.sources),
+            )
+        elif filename == "interactions.xml":
+            yield from self._iter_pretty_chunks(
+                ET.Element("material_interactions"),
+                (self._build_interaction_element(interaction) for interaction in project.interactions),
+            )
+        else:
+            # 最后生成主配置文件（这样可以正确检查所有文件是否存在）
+            yield self._generate_starfish_xml(project, self._planned_xml_files(project))
+
+    def _planned_xml_files(self, project: SimulationProject) -> List[str]:
+        """根据项目内容确定要生成的文件"""
+        sections = {
+            "boundaries.xml": project.boundaries,
+            "materials.xml": project.materials,
+            "sources.xml": project.sources,
+            "interactions.xml": project.interactions,
+        }
+        return [
+            filename
+            for filename in self.XML_FILE_ORDER
+            if filename not in sections or sections[filename]
+        ]
+
+    def _generate_starfish_xml(self, project: SimulationProject, xml_files: Collection[str] = None) -> str:
         """生成主配置文件"""
         root = ET.Element("simulation")
 
@@ -293,10 +439,16 @@ class XMLGeneratorService:
     def _generate_boundaries_xml(self, boundaries: List[Boundary], project: SimulationProject = None) -> str:
         """生成边界文件"""
         root = ET.Element("boundaries")
+        for child in self._iter_boundary_elements(boundaries, project):
+            root.append(child)
 
+        return self._prettify_xml(root)
+
+    def _iter_boundary_elements(self, boundaries: List[Boundary], project: SimulationProject = None) -> Iterator[ET.Element]:
+        """逐个生成boundaries.xml的子元素"""
         # 添加transform元素（如果有）
         if project and project.domain.boundary_transform:
-            transform = ET.SubElement(root, "transform")
+            transform = ET.Element("transform")
             if project.domain.boundary_transform.scaling:
                 scaling = ET.SubElement(transform, "scaling")
                 scaling.text = project.domain.boundary_transform.scaling
@@ -306,136 +458,145 @@ class XMLGeneratorService:
             if project.domain.boundary_transform.reverse is not None:
                 reverse = ET.SubElement(transform, "reverse")
                 reverse.text = str(project.domain.boundary_transform.reverse).lower()
+            yield transform
 
         for boundary in boundaries:
-            boundary_elem = ET.SubElement(root, "boundary")
-            boundary_elem.set("name", boundary.name)
-            boundary_elem.set("type", self._map_boundary_type_to_starfish(boundary.type))
-
-            # 添加value属性（优先使用value，然后是potential）
-            value_attr = None
-            if boundary.value is not None:
-                value_attr = str(boundary.value)
-            elif boundary.potential is not None:
-                value_attr = str(boundary.potential)
-
-            if value_attr is not None:
-                boundary_elem.set("value", value_attr)
-
-            # 添加reverse属性
-            if boundary.reverse is not None:
-                boundary_elem.set("reverse", str(boundary.reverse).lower())
-
-            # 添加材料
-            if boundary.material:
-                material_elem = ET.SubElement(boundary_elem, "material")
-                material_elem.text = boundary.material
-
-            # 添加路径 - path是必需的
-            path_elem = ET.SubElement(boundary_elem, "path")
-            path_value = boundary.path if boundary.path else self._get_default_boundary_path(boundary)
-            path_elem.text = path_value
-
-            # 添加温度（优先使用temp，然后是temperature）
-            temp_value = boundary.temp if boundary.temp is not None else boundary.temperature
-            if temp_value is not None:
-                temp_elem = ET.SubElement(boundary_elem, "temp")
-                if temp_value == int(temp_value):
-                    temp_elem.text = str(int(temp_value))
-                else:
-                    temp_elem.text = str(temp_value)
+            yield self._build_boundary_element(boundary)
+
+    def _build_boundary_element(self, boundary: Boundary) -> ET.Element:
+        """生成单个<boundary>元素"""
+        boundary_elem = ET.Element("boundary")
+        boundary_elem.set("name", boundary.name)
+        boundary_elem.set("type", self._map_boundary_type_to_starfish(boundary.type))
+
+        # 添加value属性（优先使用value，然后是potential）
+        value_attr = None
+        if boundary.value is not None:
+            value_attr = str(boundary.value)
+        elif boundary.potential is not None:
+            value_attr = str(boundary.potential)
+
+        if value_attr is not None:
+            boundary_elem.set("value", value_attr)
+
+        # 添加reverse属性
+        if boundary.reverse is not None:
+            boundary_elem.set("reverse", str(boundary.reverse).lower())
+
+        # 添加材料
+        if boundary.material:
+            material_elem = ET.SubElement(boundary_elem, "material")
+            material_elem.text = boundary.material
+
+        # 添加路径 - path是必需的
+        path_elem = ET.SubElement(boundary_elem, "path")
+        path_value = boundary.path if boundary.path else self._get_default_boundary_path(boundary)
+        path_elem.text = path_value
+
+        # 添加温度（优先使用temp，然后是temperature）
+        temp_value = boundary.temp if boundary.temp is not None else boundary.temperature
+        if temp_value is not None:
+            temp_elem = ET.SubElement(boundary_elem, "temp")
+            if temp_value == int(temp_value):
+                temp_elem.text = str(int(temp_value))
+            else:
+                temp_elem.text = str(temp_value)
 
-            # 添加节点
-            if boundary.nodes:
-                nodes_elem = ET.SubElement(boundary_elem, "nodes")
-                for node in boundary.nodes:
-                    node_elem = ET.SubElement(nodes_elem, "node")
-                    node_elem.set("x", str(node.x))
-                    node_elem.set("y", str(node.y))
+        # 添加节点
+        if boundary.node_count():
+            nodes_elem = ET.SubElement(boundary_elem, "nodes")
+            for x, y in boundary.iter_points():
+                ET.SubElement(nodes_elem, "node", x=str(x), y=str(y))
 
-        return self._prettify_xml(root)
+        return boundary_elem
 
     def _generate_materials_xml(self, materials: List[Material]) -> str:
         """生成材料文件 - 符合Starfish XML规范"""
         root = ET.Element("materials")
 
         for material in materials:
-            material_elem = ET.SubElement(root, "material")
-            material_elem.set("name", material.name)
-            material_elem.set("type", material.type)  # 直接使用Starfish类型
-
-            # 根据材料类型添加相应属性
-            if material.type == "kinetic":
-                # 动力学材料必需属性
-                # molwt是必需的
-                molwt = ET.SubElement(material_elem, "molwt")
-                molwt_value = material.molwt if material.molwt is not None else self._get_default_molwt(material.type, material.name)
-                if molwt_value == int(molwt_value):
-                    molwt.text = str(int(molwt_value))
-                else:
-                    molwt.text = str(molwt_value)
-
-                # charge是必需的
-                charge = ET.SubElement(material_elem, "charge")
-                charge.text = str(int(material.charge))
-
-                # spwt是必需的
-                spwt = ET.SubElement(material_elem, "spwt")
-                spwt_value = material.spwt if material.spwt is not None else 1e11
-                spwt_text = f"{spwt_value:.0e}".replace("e+0", "e").replace("e+", "e")
-                spwt.text = spwt_text
-
-                # 可选属性
-                if material.init:
-                    init = ET.SubElement(material_elem, "init")
-                    init.text = material.init
-
-                if material.ref_temp is not None:
-                    ref_temp = ET.SubElement(material_elem, "ref_temp")
-                    ref_temp.text = str(int(material.ref_temp) if material.ref_temp == int(material.ref_temp) else material.ref_temp)
-
-                if material.visc_temp_index is not None:
-                    visc_temp_index = ET.SubElement(material_elem, "visc_temp_index")
-                    visc_temp_index.text = str(material.visc_temp_index)
-
-                if material.vss_alpha is not None:
-                    vss_alpha = ET.SubElement(material_elem, "vss_alpha")
-                    vss_alpha.text = str(material.vss_alpha)
-
-                if material.diam is not None:
-                    diam = ET.SubElement(material_elem, "diam")
-                    diam.text = f"{material.diam:.2e}"
-
-                # 添加电离能（如果存在）
-                if material.ionization_energy is not None:
-                    ionization_energy = ET.SubElement(material_elem, "ionization_energy")
-                    ionization_energy.text = str(material.ionization_energy)
-
-            elif material.type == "boltzmann_electrons":
-                # 玻尔兹曼电子材料
-                if material.model:
-                    model = ET.SubElement(material_elem, "model")
-                    model.text = material.model
-
-                if material.kTe0 is not None:
-                    kTe0 = ET.SubElement(material_elem, "kTe0")
-                    kTe0.text = str(material.kTe0)
-
-            elif material.type == "solid":
-                # 固体材料必需属性
-                molwt = ET.SubElement(material_elem, "molwt")
-                molwt_value = material.molwt if material.molwt is not None else self._get_default_molwt(material.type, material.name)
-                if molwt_value == int(molwt_value):
-                    molwt.text = str(int(molwt_value))
-                else:
-                    molwt.text = str(molwt_value)
-
-                if material.density is not None:
-                    density = ET.SubElement(material_elem, "density")
-                    density.text = str(int(material.density) if material.density == int(material.density) else material.density)
+            root.append(self._build_material_element(material))
 
         return self._prettify_xml(root)
 
+    def _build_material_element(self, material: Material) -> ET.Element:
+        """生成单个<material>元素"""
+        material_elem = ET.Element("material")
+        material_elem.set("name", material.name)
+        material_elem.set("type", material.type)  # 直接使用Starfish类型
+
+        # 根据材料类型添加相应属性
+        if material.type == "kinetic":
+            # 动力学材料必需属性
+            # molwt是必需的
+            molwt = ET.SubElement(material_elem, "molwt")
+            molwt_value = material.molwt if material.molwt is not None else self._get_default_molwt(material.type, material.name)
+            if molwt_value == int(molwt_value):
+                molwt.text = str(int(molwt_value))
+            else:
+                molwt.text = str(molwt_value)
+
+            # charge是必需的
+            charge = ET.SubElement(material_elem, "charge")
+            charge.text = str(int(material.charge))
+
+            # spwt是必需的
+            spwt = ET.SubElement(material_elem, "spwt")
+            spwt_value = material.spwt if material.spwt is not None else 1e11
+            spwt_text = f"{spwt_value:.0e}".replace("e+0", "e").replace("e+", "e")
+            spwt.text = spwt_text
+
+            # 可选属性
+            if material.init:
+                init = ET.SubElement(material_elem, "init")
+                init.text = material.init
+
+            if material.ref_temp is not None:
+                ref_temp = ET.SubElement(material_elem, "ref_temp")
+                ref_temp.text = str(int(material.ref_temp) if material.ref_temp == int(material.ref_temp) else material.ref_temp)
+
+            if material.visc_temp_index is not None:
+                visc_temp_index = ET.SubElement(material_elem, "visc_temp_index")
+                visc_temp_index.text = str(material.visc_temp_index)
+
+            if material.vss_alpha is not None:
+                vss_alpha = ET.SubElement(material_elem, "vss_alpha")
+                vss_alpha.text = str(material.vss_alpha)
+
+            if material.diam is not None:
+                diam = ET.SubElement(material_elem, "diam")
+                diam.text = f"{material.diam:.2e}"
+
+            # 添加电离能（如果存在）
+            if material.ionization_energy is not None:
+                ionization_energy = ET.SubElement(material_elem, "ionization_energy")
+                ionization_energy.text = str(material.ionization_energy)
+
+        elif material.type == "boltzmann_electrons":
+            # 玻尔兹曼电子材料
+            if material.model:
+                model = ET.SubElement(material_elem, "model")
+                model.text = material.model
+
+            if material.kTe0 is not None:
+                kTe0 = ET.SubElement(material_elem, "kTe0")
+                kTe0.text = str(material.kTe0)
+
+        elif material.type == "solid":
+            # 固体材料必需属性
+            molwt = ET.SubElement(material_elem, "molwt")
+            molwt_value = material.molwt if material.molwt is not None else self._get_default_molwt(material.type, material.name)
+            if molwt_value == int(molwt_value):
+                molwt.text = str(int(molwt_value))
+            else:
+                molwt.text = str(molwt_value)
+
+            if material.density is not None:
+                density = ET.SubElement(material_elem, "density")
+                density.text = str(int(material.density) if material.density == int(material.density) else material.density)
+
+        return material_elem
+
     def _map_material_type_to_starfish(self, material_type: str) -> str:
         """将ezxml4starfish的材料类型映射到Starfish支持的类型"""
         # Starfish主要支持两种材料类型：kinetic 和 solid
@@ -559,16 +720,10 @@ class XMLGeneratorService:
     def _get_default_boundary_path(self, boundary: Boundary) -> str:
         """为边界生成默认路径"""
         # 如果有节点信息，根据节点生成路径
-        if boundary.nodes and len(boundary.nodes) >= 2:
-            # 使用SVG路径格式
-            path_parts = []
-            first_node = boundary.nodes[0]
-            path_parts.append(f"M {first_node.x}, {first_node.y}")
-
-            for node in boundary.nodes[1:]:
-                path_parts.append(f"L {node.x} {node.y}")
-
-            return " ".join(path_parts)
+        if boundary.node_count() >= 2:
+            # 使用SVG路径格式：M x, y L x y ...
+            coords = boundary.coords if boundary.coords is not None else flatten_points(boundary.iter_points())
+            return format_path(coords, move_separator=", ", line_separator=" ")
 
         # 根据边界名称和类型生成默认路径
         name_lower = boundary.name.lower()
@@ -593,124 +748,128 @@ class XMLGeneratorService:
         root = ET.Element("sources")
 
         for source in sources:
-            # 基于Starfish v0.25的实际支持，所有源都使用 <boundary_source> 标签
-            # 但根据原始类型使用不同的参数配置
-            source_elem = ET.SubElement(root, "boundary_source")
-            source_elem.set("name", source.name)
-            starfish_source_type = self._map_source_type_to_starfish(source.type)
-
-            if source.type in ["volume", "preload", "maxwellian"]:
-                # 体积源转换为ambient边界源
-                source_elem.set("type", starfish_source_type)
-
-                # 为体积源找到一个边界
-                boundary_name = source.boundary or self._find_available_boundary_for_volume_source(source, project)
-                boundary = ET.SubElement(source_elem, "boundary")
-                boundary.text = boundary_name
-
-                if source.material:
-                    material = ET.SubElement(source_elem, "material")
-                    material.text = source.material
-
-                # 设置enforce为density（体积源通常控制密度）
+            root.append(self._build_source_element(source, project))
+
+        return self._prettify_xml(root)
+
+    def _build_source_element(self, source: Source, project: 'SimulationProject') -> ET.Element:
+        """生成单个<boundary_source>元素"""
+        # 基于Starfish v0.25的实际支持，所有源都使用 <boundary_source> 标签
+        # 但根据原始类型使用不同的参数配置
+        source_elem = ET.Element("boundary_source")
+        source_elem.set("name", source.name)
+        starfish_source_type = self._map_source_type_to_starfish(source.type)
+
+        if source.type in ["volume", "preload", "maxwellian"]:
+            # 体积源转换为ambient边界源
+            source_elem.set("type", starfish_source_type)
+
+            # 体积源的边界已在resolve_project中确定
+            boundary = ET.SubElement(source_elem, "boundary")
+            boundary.text = source.boundary
+
+            if source.material:
+                material = ET.SubElement(source_elem, "material")
+                material.text = source.material
+
+            # 设置enforce为density（体积源通常控制密度）
+            enforce = ET.SubElement(source_elem, "enforce")
+            enforce.text = "density"
+
+            # 添加drift_velocity（必需）
+            drift_velocity = ET.SubElement(source_elem, "drift_velocity")
+            drift_velocity.text = "0,0,0"  # 体积源无漂移
+
+            if source.temperature is not None:
+                temperature = ET.SubElement(source_elem, "temperature")
+                temperature.text = str(source.temperature)
+
+            # 将rate转换为density
+            if source.density is not None:
+                density = ET.SubElement(source_elem, "density")
+                density.text = str(source.density)
+            elif source.rate is not None:
+                density = ET.SubElement(source_elem, "density")
+                # 简单的rate到density转换（这是一个近似）
+                density_value = source.rate / 1e15  # 简单的转换因子
+                density.text = str(max(density_value, 1e12))  # 最小密度值
+            else:
+                density = ET.SubElement(source_elem, "density")
+                density.text = "1e12"
+
+        else:
+            # 边界源 - 设置类型和基本参数
+            source_elem.set("type", starfish_source_type)
+
+            boundary = ET.SubElement(source_elem, "boundary")
+            boundary.text = source.boundary
+
+            if source.material:
+                material = ET.SubElement(source_elem, "material")
+                material.text = source.material
+
+            # 根据边界源类型添加相应参数
+            if starfish_source_type == "ambient":
+                # 环境源需要enforce、drift_velocity、temperature等
                 enforce = ET.SubElement(source_elem, "enforce")
-                enforce.text = "density"
+                if source.enforce:
+                    enforce.text = source.enforce
+                elif source.density is not None or source.rate is not None:
+                    enforce.text = "density"
+                else:
+                    enforce.text = "pressure"
 
                 # 添加drift_velocity（必需）
                 drift_velocity = ET.SubElement(source_elem, "drift_velocity")
-                drift_velocity.text = "0,0,0"  # 体积源无漂移
+                if source.drift_velocity:
+                    drift_velocity.text = source.drift_velocity
+                elif source.v_drift is not None:
+                    drift_velocity.text = f"{source.v_drift},0,0"
+                else:
+                    drift_velocity.text = "0,0,0"
 
                 if source.temperature is not None:
                     temperature = ET.SubElement(source_elem, "temperature")
                     temperature.text = str(source.temperature)
 
-                # 将rate转换为density
+                # 添加密度或压力 - 确保只添加一个
                 if source.density is not None:
                     density = ET.SubElement(source_elem, "density")
                     density.text = str(source.density)
                 elif source.rate is not None:
                     density = ET.SubElement(source_elem, "density")
-                    # 简单的rate到density转换（这是一个近似）
-                    density_value = source.rate / 1e15  # 简单的转换因子
-                    density.text = str(max(density_value, 1e12))  # 最小密度值
+                    density.text = str(max(source.rate / 1e15, 1e12))
+                elif source.total_pressure is not None:
+                    total_pressure = ET.SubElement(source_elem, "total_pressure")
+                    total_pressure.text = str(source.total_pressure)
                 else:
-                    density = ET.SubElement(source_elem, "density")
-                    density.text = "1e12"
+                    # 提供默认压力
+                    total_pressure = ET.SubElement(source_elem, "total_pressure")
+                    total_pressure.text = "1000.0"
+
+            elif starfish_source_type in ["uniform", "cosine"]:
+                # uniform和cosine源的参数
+                if source.mdot is not None:
+                    mdot = ET.SubElement(source_elem, "mdot")
+                    mdot.text = str(source.mdot)
+                else:
+                    # 如果没有mdot，提供默认值
+                    mdot = ET.SubElement(source_elem, "mdot")
+                    mdot.text = "1e-12"  # 默认质量流率
 
-            else:
-                # 边界源 - 设置类型和基本参数
-                source_elem.set("type", starfish_source_type)
-
-                boundary_name = source.boundary or self._find_available_boundary_for_volume_source(source, project)
-                boundary = ET.SubElement(source_elem, "boundary")
-                boundary.text = boundary_name
-
-                if source.material:
-                    material = ET.SubElement(source_elem, "material")
-                    material.text = source.material
-
-                # 根据边界源类型添加相应参数
-                if starfish_source_type == "ambient":
-                    # 环境源需要enforce、drift_velocity、temperature等
-                    enforce = ET.SubElement(source_elem, "enforce")
-                    if source.enforce:
-                        enforce.text = source.enforce
-                    elif source.density is not None or source.rate is not None:
-                        enforce.text = "density"
-                    else:
-                        enforce.text = "pressure"
-
-                    # 添加drift_velocity（必需）
-                    drift_velocity = ET.SubElement(source_elem, "drift_velocity")
-                    if source.drift_velocity:
-                        drift_velocity.text = source.drift_velocity
-                    elif source.v_drift is not None:
-                        drift_velocity.text = f"{source.v_drift},0,0"
-                    else:
-                        drift_velocity.text = "0,0,0"
-
-                    if source.temperature is not None:
-                        temperature = ET.SubElement(source_elem, "temperature")
-                        temperature.text = str(source.temperature)
-
-                    # 添加密度或压力 - 确保只添加一个
-                    if source.density is not None:
-                        density = ET.SubElement(source_elem, "density")
-                        density.text = str(source.density)
-                    elif source.rate is not None:
-                        density = ET.SubElement(source_elem, "density")
-                        density.text = str(max(source.rate / 1e15, 1e12))
-                    elif source.total_pressure is not None:
-                        total_pressure = ET.SubElement(source_elem, "total_pressure")
-                        total_pressure.text = str(source.total_pressure)
-                    else:
-                        # 提供默认压力
-                        total_pressure = ET.SubElement(source_elem, "total_pressure")
-                        total_pressure.text = "1000.0"
-
-                elif starfish_source_type in ["uniform", "cosine"]:
-                    # uniform和cosine源的参数
-                    if source.mdot is not None:
-                        mdot = ET.SubElement(source_elem, "mdot")
-                        mdot.text = str(source.mdot)
-                    else:
-                        # 如果没有mdot，提供默认值
-                        mdot = ET.SubElement(source_elem, "mdot")
-                        mdot.text = "1e-12"  # 默认质量流率
-
-                    if source.temperature is not None:
-                        temperature = ET.SubElement(source_elem, "temperature")
-                        temperature.text = str(source.temperature)
-
-                    # uniform和cosine源需要v_drift参数
-                    v_drift = ET.SubElement(source_elem, "v_drift")
-                    if source.v_drift is not None:
-                        v_drift.text = str(source.v_drift)
-                    else:
-                        # 提供默认漂移速度
-                        v_drift.text = "0"
+                if source.temperature is not None:
+                    temperature = ET.SubElement(source_elem, "temperature")
+                    temperature.text = str(source.temperature)
 
-        return self._prettify_xml(root)
+                # uniform和cosine源需要v_drift参数
+                v_drift = ET.SubElement(source_elem, "v_drift")
+                if source.v_drift is not None:
+                    v_drift.text = str(source.v_drift)
+                else:
+                    # 提供默认漂移速度
+                    v_drift.text = "0"
+
+        return source_elem
 
     def _map_boundary_type_to_starfish(self, boundary_type: str) -> str:
         """Map application boundary types to Starfish v0.25 geometry boundary types."""
@@ -773,267 +932,273 @@ class XMLGeneratorService:
         root = ET.Element("material_interactions")
 
         for interaction in interactions:
-            if interaction.type == "surface_hit":
-                # 表面碰撞
-                interaction_elem = ET.SubElement(root, "surface_hit")
+            root.append(self._build_interaction_element(interaction))
 
-                # 处理source和target - 优先使用显式字段，否则从materials数组中提取
-                source_material = interaction.source
-                target_material = interaction.target
+        return self._prettify_xml(root)
 
-                if not source_material or not target_material:
-                    if interaction.materials and len(interaction.materials) >= 2:
-                        source_material = interaction.materials[0]
-                        target_material = interaction.materials[1]
+    def _build_interaction_element(self, interaction: Interaction) -> ET.Element:
+        """生成单个相互作用元素"""
+        if interaction.type == "surface_hit":
+            # 表面碰撞
+            interaction_elem = ET.Element("surface_hit")
+
+            # 处理source和target - 优先使用显式字段，否则从materials数组中提取
+            source_material = interaction.source
+            target_material = interaction.target
+
+            if not source_material or not target_material:
+                if interaction.materials and len(interaction.materials) >= 2:
+                    source_material = interaction.materials[0]
+                    target_material = interaction.materials[1]
+
+            if source_material:
+                interaction_elem.set("source", source_material)
+            if target_material:
+                interaction_elem.set("target", target_material)
+
+            if interaction.product:
+                product = ET.SubElement(interaction_elem, "product")
+                product.text = interaction.product
+
+            if interaction.model:
+                model = ET.SubElement(interaction_elem, "model")
+                model.text = interaction.model
+
+            if interaction.prob is not None:
+                prob = ET.SubElement(interaction_elem, "prob")
+                prob.text = str(interaction.prob)
+
+            if interaction.c_accom is not None:
+                c_accom = ET.SubElement(interaction_elem, "c_accom")
+                c_accom.text = str(interaction.c_accom)
+
+            if interaction.c_rest is not None:
+                c_rest = ET.SubElement(interaction_elem, "c_rest")
+                c_rest.text = str(interaction.c_rest)
+
+        elif interaction.type == "dsmc":
+            # DSMC碰撞
+            interaction_elem = ET.Element("dsmc")
+            # model 属性是必需的，默认为 "elastic"
+            model = interaction.model if interaction.model else "elastic"
+            interaction_elem.set("model", model)
+
+            if interaction.pair:
+                pair = ET.SubElement(interaction_elem, "pair")
+                pair.text = interaction.pair
+            elif interaction.materials and len(interaction.materials) >= 2:
+                pair = ET.SubElement(interaction_elem, "pair")
+                pair.text = ",".join(interaction.materials[:2])
+
+            # 处理sigma，确保使用Starfish支持的类型
+            if interaction.sigma:
+                # 获取材料列表用于映射
+                materials_list = []
+                if interaction.pair:
+                    materials_list = interaction.pair.split(",")
+                elif interaction.materials and len(interaction.materials) >= 2:
+                    materials_list = interaction.materials[:2]
 
+                mapped_sigma = self._map_sigma_to_starfish(
+                    interaction.sigma,
+                    "dsmc",
+                    materials_list
+                )
+                sigma = ET.SubElement(interaction_elem, "sigma")
+                sigma.text = mapped_sigma
+
+                # 如果映射到const sigma但原始不是const，且没有提供coeffs，提供默认值
+                if (mapped_sigma == "const" and
+                    interaction.sigma.lower() != "const" and
+                    not interaction.sigma_coeffs):
+                    sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
+                    sigma_coeffs.text = "1e-19"  # DSMC默认截面值
+                elif interaction.sigma_coeffs:
+                    sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
+                    sigma_coeffs.text = interaction.sigma_coeffs
+
+            if interaction.frequency is not None:
+                frequency = ET.SubElement(interaction_elem, "frequency")
+                frequency.text = str(interaction.frequency)
+
+            if interaction.sig_cr_max is not None:
+                sig_cr_max = ET.SubElement(interaction_elem, "sig_cr_max")
+                sig_cr_max.text = str(interaction.sig_cr_max)
+
+        elif interaction.type == "mcc":
+            # MCC碰撞
+            interaction_elem = ET.Element("mcc")
+            if interaction.mcc_model:
+                interaction_elem.set("model", interaction.mcc_model)
+
+            # 处理source和target - 优先使用显式字段，否则从materials数组中提取
+            source_material = interaction.source
+            target_material = interaction.target
+
+            if not source_material or not target_material:
+                if interaction.materials and len(interaction.materials) >= 2:
+                    source_material = interaction.materials[0]
+                    target_material = interaction.materials[1]
+
+            if source_material:
+                source = ET.SubElement(interaction_elem, "source")
+                source.text = source_material
+
+            if target_material:
+                target = ET.SubElement(interaction_elem, "target")
+                target.text = target_material
+
+            # 处理sigma，确保使用Starfish支持的类型
+            if interaction.sigma:
+                # 映射sigma到Starfish支持的类型
+                materials_list = []
                 if source_material:
-                    interaction_elem.set("source", source_material)
+                    materials_list.append(source_material)
                 if target_material:
-                    interaction_elem.set("target", target_material)
+                    materials_list.append(target_material)
 
-                if interaction.product:
-                    product = ET.SubElement(interaction_elem, "product")
-                    product.text = interaction.product
-
-                if interaction.model:
-                    model = ET.SubElement(interaction_elem, "model")
-                    model.text = interaction.model
+                mapped_sigma = self._map_sigma_to_starfish(
+                    interaction.sigma,
+                    "mcc",
+                    materials_list
+                )
+                sigma = ET.SubElement(interaction_elem, "sigma")
+                sigma.text = mapped_sigma
+
+                # 如果映射到const sigma但原始不是const，且没有提供coeffs，提供默认值
+                if (mapped_sigma == "const" and
+                    interaction.sigma.lower() != "const" and
+                    not interaction.sigma_coeffs):
+                    sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
+                    # 根据MCC模型类型提供合适的默认截面值
+                    if interaction.mcc_model == "ionization":
+                        sigma_coeffs.text = "1e-20"  # 电离截面默认值
+                    elif interaction.mcc_model == "cex":
+                        sigma_coeffs.text = "5e-19"  # 电荷交换截面默认值
+                    else:
+                        sigma_coeffs.text = "1e-19"  # 通用默认值
+                elif interaction.sigma_coeffs:
+                    sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
+                    sigma_coeffs.text = interaction.sigma_coeffs
 
-                if interaction.prob is not None:
-                    prob = ET.SubElement(interaction_elem, "prob")
-                    prob.text = str(interaction.prob)
+            if interaction.max_target_temp is not None:
+                max_target_temp = ET.SubElement(interaction_elem, "max_target_temp")
+                max_target_temp.text = str(interaction.max_target_temp)
 
-                if interaction.c_accom is not None:
-                    c_accom = ET.SubElement(interaction_elem, "c_accom")
-                    c_accom.text = str(interaction.c_accom)
+            # 注意：ionization_energy现在在材料定义中，不在MCC相互作用中
 
-                if interaction.c_rest is not None:
-                    c_rest = ET.SubElement(interaction_elem, "c_rest")
-                    c_rest.text = str(interaction.c_rest)
+        elif interaction.type == "chemistry":
+            # 化学反应
+            interaction_elem = ET.Element("chemistry")
+            interaction_elem.set("name", interaction.name)
 
-            elif interaction.type == "dsmc":
-                # DSMC碰撞
-                interaction_elem = ET.SubElement(root, "dsmc")
-                # model 属性是必需的，默认为 "elastic"
-                model = interaction.model if interaction.model else "elastic"
-                interaction_elem.set("model", model)
+            if interaction.sources:
+                sources = ET.SubElement(interaction_elem, "sources")
+                sources.text = interaction.sources
 
-                if interaction.pair:
-                    pair = ET.SubElement(interaction_elem, "pair")
-                    pair.text = interaction.pair
+            if interaction.products:
+                products = ET.SubElement(interaction_elem, "products")
+                products.text = interaction.products
+
+            if interaction.rate_type or interaction.is_sigma is not None:
+                rate = ET.SubElement(interaction_elem, "rate")
+                if interaction.rate_type:
+                    rate.set("type", interaction.rate_type)
+                if interaction.is_sigma is not None:
+                    rate.set("is_sigma", str(interaction.is_sigma).lower())
+
+                if interaction.coeffs:
+                    coeffs = ET.SubElement(rate, "coeffs")
+                    coeffs.text = interaction.coeffs
+
+                if interaction.output_wrappers:
+                    output_wrappers = ET.SubElement(rate, "output_wrappers")
+                    output_wrappers.text = interaction.output_wrappers
+
+                # Starfish要求所有化学反应都有dep_var元素
+                if interaction.dep_var:
+                    dep_var = ET.SubElement(rate, "dep_var")
+                    # 对于const类型，尝试使用Starfish支持的变量名
+                    if interaction.rate_type == "const":
+                        # 尝试使用电子密度变量名
+                        dep_var.text = "ne"  # 电子密度
+                    else:
+                        dep_var.text = interaction.dep_var
+                else:
+                    # 如果没有指定dep_var，提供默认值
+                    dep_var = ET.SubElement(rate, "dep_var")
+                    dep_var.text = "ne"  # 默认使用电子密度
+
+        elif interaction.type == "sputtering":
+            # 溅射
+            interaction_elem = ET.Element("sputtering")
+            # 溅射参数可以根据需要添加
+        else:
+            # 其他类型的相互作用 - 映射到Starfish支持的类型
+            logger.warning(f"Unknown interaction type '{interaction.type}', mapping to supported Starfish format")
+
+            # 根据相互作用类型和名称，映射到Starfish支持的格式
+            if (interaction.source and interaction.target) or any(keyword in interaction.name.lower() for keyword in ['surface', 'impact', 'wall', 'hit']):
+                # 表面撞击相互作用 - 使用surface_hit格式
+                interaction_elem = ET.Element("surface_hit")
+
+                # 设置源和目标材料
+                if interaction.source:
+                    interaction_elem.set("source", interaction.source)
+                elif interaction.materials and len(interaction.materials) >= 1:
+                    interaction_elem.set("source", interaction.materials[0])
+
+                if interaction.target:
+                    interaction_elem.set("target", interaction.target)
                 elif interaction.materials and len(interaction.materials) >= 2:
-                    pair = ET.SubElement(interaction_elem, "pair")
-                    pair.text = ",".join(interaction.materials[:2])
-
-                # 处理sigma，确保使用Starfish支持的类型
-                if interaction.sigma:
-                    # 获取材料列表用于映射
-                    materials_list = []
-                    if interaction.pair:
-                        materials_list = interaction.pair.split(",")
-                    elif interaction.materials and len(interaction.materials) >= 2:
-                        materials_list = interaction.materials[:2]
-
-                    mapped_sigma = self._map_sigma_to_starfish(
-                        interaction.sigma,
-                        "dsmc",
-                        materials_list
-                    )
-                    sigma = ET.SubElement(interaction_elem, "sigma")
-                    sigma.text = mapped_sigma
-
-                    # 如果映射到const sigma但原始不是const，且没有提供coeffs，提供默认值
-                    if (mapped_sigma == "const" and
-                        interaction.sigma.lower() != "const" and
-                        not interaction.sigma_coeffs):
-                        sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
-                        sigma_coeffs.text = "1e-19"  # DSMC默认截面值
-                    elif interaction.sigma_coeffs:
-                        sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
-                        sigma_coeffs.text = interaction.sigma_coeffs
-
-                if interaction.frequency is not None:
-                    frequency = ET.SubElement(interaction_elem, "frequency")
-                    frequency.text = str(interaction.frequency)
-
-                if interaction.sig_cr_max is not None:
-                    sig_cr_max = ET.SubElement(interaction_elem, "sig_cr_max")
-                    sig_cr_max.text = str(interaction.sig_cr_max)
-
-            elif interaction.type == "mcc":
-                # MCC碰撞
-                interaction_elem = ET.SubElement(root, "mcc")
-                if interaction.mcc_model:
-                    interaction_elem.set("model", interaction.mcc_model)
-
-                # 处理source和target - 优先使用显式字段，否则从materials数组中提取
-                source_material = interaction.source
-                target_material = interaction.target
+                    interaction_elem.set("target", interaction.materials[1])
 
-                if not source_material or not target_material:
-                    if interaction.materials and len(interaction.materials) >= 2:
-                        source_material = interaction.materials[0]
-                        target_material = interaction.materials[1]
+                # 添加产物
+                if interaction.product:
+                    product = ET.SubElement(interaction_elem, "product")
+                    product.text = interaction.product
+                elif interaction.materials and len(interaction.materials) >= 1:
+                    product = ET.SubElement(interaction_elem, "product")
+                    product.text = interaction.materials[0]  # 默认产物与源相同
 
-                if source_material:
-                    source = ET.SubElement(interaction_elem, "source")
-                    source.text = source_material
+                # 添加模型
+                model = ET.SubElement(interaction_elem, "model")
+                model.text = interaction.model or "diffuse"  # 默认为漫反射
+
+                # 添加概率
+                prob = ET.SubElement(interaction_elem, "prob")
+                prob.text = str(interaction.prob if interaction.prob is not None else 1.0)
 
-                if target_material:
-                    target = ET.SubElement(interaction_elem, "target")
-                    target.text = target_material
-
-                # 处理sigma，确保使用Starfish支持的类型
-                if interaction.sigma:
-                    # 映射sigma到Starfish支持的类型
-                    materials_list = []
-                    if source_material:
-                        materials_list.append(source_material)
-                    if target_material:
-                        materials_list.append(target_material)
-
-                    mapped_sigma = self._map_sigma_to_starfish(
-                        interaction.sigma,
-                        "mcc",
-                        materials_list
-                    )
-                    sigma = ET.SubElement(interaction_elem, "sigma")
-                    sigma.text = mapped_sigma
-
-                    # 如果映射到const sigma但原始不是const，且没有提供coeffs，提供默认值
-                    if (mapped_sigma == "const" and
-                        interaction.sigma.lower() != "const" and
-                        not interaction.sigma_coeffs):
-                        sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
-                        # 根据MCC模型类型提供合适的默认截面值
-                        if interaction.mcc_model == "ionization":
-                            sigma_coeffs.text = "1e-20"  # 电离截面默认值
-                        elif interaction.mcc_model == "cex":
-                            sigma_coeffs.text = "5e-19"  # 电荷交换截面默认值
-                        else:
-                            sigma_coeffs.text = "1e-19"  # 通用默认值
-                    elif interaction.sigma_coeffs:
-                        sigma_coeffs = ET.SubElement(interaction_elem, "sigma_coeffs")
-                        sigma_coeffs.text = interaction.sigma_coeffs
-
-                if interaction.max_target_temp is not None:
-                    max_target_temp = ET.SubElement(interaction_elem, "max_target_temp")
-                    max_target_temp.text = str(interaction.max_target_temp)
-
-                # 注意：ionization_energy现在在材料定义中，不在MCC相互作用中
-
-            elif interaction.type == "chemistry":
-                # 化学反应
-                interaction_elem = ET.SubElement(root, "chemistry")
-                interaction_elem.set("name", interaction.name)
-
-                if interaction.sources:
-                    sources = ET.SubElement(interaction_elem, "sources")
-                    sources.text = interaction.sources
-
-                if interaction.products:
-                    products = ET.SubElement(interaction_elem, "products")
-                    products.text = interaction.products
-
-                if interaction.rate_type or interaction.is_sigma is not None:
-                    rate = ET.SubElement(interaction_elem, "rate")
-                    if interaction.rate_type:
-                        rate.set("type", interaction.rate_type)
-                    if interaction.is_sigma is not None:
-                        rate.set("is_sigma", str(interaction.is_sigma).lower())
-
-                    if interaction.coeffs:
-                        coeffs = ET.SubElement(rate, "coeffs")
-                        coeffs.text = interaction.coeffs
-
-                    if interaction.output_wrappers:
-                        output_wrappers = ET.SubElement(rate, "output_wrappers")
-                        output_wrappers.text = interaction.output_wrappers
-
-                    # Starfish要求所有化学反应都有dep_var元素
-                    if interaction.dep_var:
-                        dep_var = ET.SubElement(rate, "dep_var")
-                        # 对于const类型，尝试使用Starfish支持的变量名
-                        if interaction.rate_type == "const":
-                            # 尝试使用电子密度变量名
-                            dep_var.text = "ne"  # 电子密度
-                        else:
-                            dep_var.text = interaction.dep_var
-                    else:
-                        # 如果没有指定dep_var，提供默认值
-                        dep_var = ET.SubElement(rate, "dep_var")
-                        dep_var.text = "ne"  # 默认使用电子密度
-
-            elif interaction.type == "sputtering":
-                # 溅射
-                interaction_elem = ET.SubElement(root, "sputtering")
-                # 溅射参数可以根据需要添加
             else:
-                # 其他类型的相互作用 - 映射到Starfish支持的类型
-                logger.warning(f"Unknown interaction type '{interaction.type}', mapping to supported Starfish format")
-
-                # 根据相互作用类型和名称，映射到Starfish支持的格式
-                if (interaction.source and interaction.target) or any(keyword in interaction.name.lower() for keyword in ['surface', 'impact', 'wall', 'hit']):
-                    # 表面撞击相互作用 - 使用surface_hit格式
-                    interaction_elem = ET.SubElement(root, "surface_hit")
-
-                    # 设置源和目标材料
-                    if interaction.source:
-                        interaction_elem.set("source", interaction.source)
-                    elif interaction.materials and len(interaction.materials) >= 1:
-                        interaction_elem.set("source", interaction.materials[0])
-
-                    if interaction.target:
-                        interaction_elem.set("target", interaction.target)
-                    elif interaction.materials and len(interaction.materials) >= 2:
-                        interaction_elem.set("target", interaction.materials[1])
-
-                    # 添加产物
-                    if interaction.product:
-                        product = ET.SubElement(interaction_elem, "product")
-                        product.text = interaction.product
-                    elif interaction.materials and len(interaction.materials) >= 1:
-                        product = ET.SubElement(interaction_elem, "product")
-                        product.text = interaction.materials[0]  # 默认产物与源相同
-
-                    # 添加模型
-                    model = ET.SubElement(interaction_elem, "model")
-                    model.text = interaction.model or "diffuse"  # 默认为漫反射
-
-                    # 添加概率
-                    prob = ET.SubElement(interaction_elem, "prob")
-                    prob.text = str(interaction.prob if interaction.prob is not None else 1.0)
+                # 默认作为DSMC处理 - 这是Starfish支持的主要相互作用类型
+                logger.info(f"Mapping interaction '{interaction.name}' to DSMC format")
+                interaction_elem = ET.Element("dsmc")
+
+                # 设置模型 - 只支持Starfish认可的模型
+                model_name = interaction.model or interaction.type.lower()
+                # Starfish支持的DSMC模型：elastic, inelastic
+                if model_name not in ["elastic", "inelastic"]:
+                    # 将不支持的模型映射到支持的模型
+                    if model_name in ["charge_exchange", "ionization", "excitation"]:
+                        model_name = "inelastic"  # 非弹性过程
+                    else:
+                        model_name = "elastic"  # 默认为弹性碰撞
+                interaction_elem.set("model", model_name)
 
-                else:
-                    # 默认作为DSMC处理 - 这是Starfish支持的主要相互作用类型
-                    logger.info(f"Mapping interaction '{interaction.name}' to DSMC format")
-                    interaction_elem = ET.SubElement(root, "dsmc")
-
-                    # 设置模型 - 只支持Starfish认可的模型
-                    model_name = interaction.model or interaction.type.lower()
-                    # Starfish支持的DSMC模型：elastic, inelastic
-                    if model_name not in ["elastic", "inelastic"]:
-                        # 将不支持的模型映射到支持的模型
-                        if model_name in ["charge_exchange", "ionization", "excitation"]:
-                            model_name = "inelastic"  # 非弹性过程
-                        else:
-                            model_name = "elastic"  # 默认为弹性碰撞
-                    interaction_elem.set("model", model_name)
-
-                    # 添加材料对
-                    if interaction.materials and len(interaction.materials) >= 2:
-                        pair = ET.SubElement(interaction_elem, "pair")
-                        pair.text = ",".join(interaction.materials[:2])  # 只取前两个材料
-
-                    # 添加碰撞截面
-                    sigma = ET.SubElement(interaction_elem, "sigma")
-                    sigma.text = interaction.sigma or "Bird463"  # 默认使用Bird463模型
-
-                    # 添加频率
-                    frequency = ET.SubElement(interaction_elem, "frequency")
-                    frequency.text = str(interaction.frequency if interaction.frequency is not None else 1)
+                # 添加材料对
+                if interaction.materials and len(interaction.materials) >= 2:
+                    pair = ET.SubElement(interaction_elem, "pair")
+                    pair.text = ",".join(interaction.materials[:2])  # 只取前两个材料
 
-        return self._prettify_xml(root)
+                # 添加碰撞截面
+                sigma = ET.SubElement(interaction_elem, "sigma")
+                sigma.text = interaction.sigma or "Bird463"  # 默认使用Bird463模型
+
+                # 添加频率
+                frequency = ET.SubElement(interaction_elem, "frequency")
+                frequency.text = str(interaction.frequency if interaction.frequency is not None else 1)
+
+        return interaction_elem
 
     def _map_interaction_model_to_starfish(self, model_name: str, materials: List[str], sigma: str = None) -> str:
         """
@@ -1253,97 +1418,100 @@ class XMLGeneratorService:
         return default_material.name
 
     def _validate_and_fix_material_references(self, project: SimulationProject) -> None:
-        """验证和修复材料引用"""
+        """
+        验证和修复材料引用
+
+        单次遍历建立引用索引（材料名称 -> 引用它的实体，按首次引用的顺序），
+        然后按该顺序一次性创建所有缺失的材料，并汇总报告。
+        """
         # 收集所有已定义的材料名称
         defined_materials = {material.name for material in project.materials}
-        logger.info(f"Defined materials: {sorted(defined_materials)}")
+        logger.info(f"Defined materials: {len(defined_materials)}")
+
+        references = self._index_material_references(project)
+
+        # 按首次引用的顺序批量补全：None表示未指定材料的固体边界，在该位置分配默认固体材料
+        created: List[str] = []
+        for material_name in references:
+            if material_name is None:
+                default_name = self._get_or_create_default_solid_material(project, defined_materials)
+                for boundary in project.boundaries:
+                    if boundary.type == "solid" and not boundary.material:
+                        boundary.material = default_name
+                logger.info(
+                    f"Assigned default solid material '{default_name}' to {len(references[None])} solid boundaries"
+                )
+            elif material_name not in defined_materials:
+                project.materials.append(self._create_default_material(material_name))
+                defined_materials.add(material_name)
+                created.append(material_name)
+
+        if created:
+            logger.warning(
+                f"Created default definitions for {len(created)} undefined materials: "
+                + self._describe_material_references(created, references)
+            )
 
-        # 收集所有引用的材料名称
-        referenced_materials = set()
+        logger.info(f"Referenced materials: {sum(1 for name in references if name is not None)}")
+        logger.info(f"Material reference validation completed")
+
+    def _index_material_references(self, project: SimulationProject) -> Dict[Optional[str], List[Any]]:
+        """
+        建立材料引用索引
+
+        Returns:
+            Dict[Optional[str], List[Any]]: 材料名称到引用它的边界、源或相互作用的映射，按首次引用的顺序排列；
+                键None收集未指定材料的固体边界
+        """
+        references: Dict[Optional[str], List[Any]] = defaultdict(list)
 
         # 检查边界中的材料引用
         for boundary in project.boundaries:
             if boundary.type == "solid" and not boundary.material:
-                boundary.material = self._get_or_create_default_solid_material(project, defined_materials)
-                logger.info(
-                    f"Assigned default solid material '{boundary.material}' to boundary '{boundary.name}'"
-                )
-
-            if boundary.material:
-                referenced_materials.add(boundary.material)
-                if boundary.material not in defined_materials:
-                    logger.warning(f"Boundary '{boundary.name}' references undefined material '{boundary.material}'")
-                    # 修复：使用默认材料或创建缺失的材料
-                    default_material = self._create_default_material(boundary.material)
-                    project.materials.append(default_material)
-                    defined_materials.add(default_material.name)
-                    logger.info(f"Created default material '{default_material.name}' for boundary '{boundary.name}'")
+                references[None].append(boundary)
+            elif boundary.material:
+                references[boundary.material].append(boundary)
 
         # 检查源中的材料引用
         for source in project.sources:
             if source.material:
-                referenced_materials.add(source.material)
-                if source.material not in defined_materials:
-                    logger.warning(f"Source '{source.name}' references undefined material '{source.material}'")
-                    # 修复：使用默认材料或创建缺失的材料
-                    default_material = self._create_default_material(source.material)
-                    project.materials.append(default_material)
-                    defined_materials.add(default_material.name)
-                    logger.info(f"Created default material '{default_material.name}' for source '{source.name}'")
-
-        # 检查相互作用中的材料引用
+                references[source.material].append(source)
+
+        # 检查相互作用中的材料引用：materials列表、单独的材料字段、化学反应的反应物和生成物
         for interaction in project.interactions:
-            # 检查materials列表
             for material_name in interaction.materials:
-                referenced_materials.add(material_name)
-                if material_name not in defined_materials:
-                    logger.warning(f"Interaction '{interaction.name}' references undefined material '{material_name}'")
-                    # 修复：使用默认材料或创建缺失的材料
-                    default_material = self._create_default_material(material_name)
-                    project.materials.append(default_material)
-                    defined_materials.add(default_material.name)
-                    logger.info(f"Created default material '{default_material.name}' for interaction '{interaction.name}'")
-
-            # 检查单独的材料字段
-            material_fields = [interaction.source, interaction.target, interaction.product]
-            for material_name in material_fields:
-                if material_name:
-                    referenced_materials.add(material_name)
-                    if material_name not in defined_materials:
-                        logger.warning(f"Interaction '{interaction.name}' references undefined material '{material_name}'")
-                        # 修复：使用默认材料或创建缺失的材料
-                        default_material = self._create_default_material(material_name)
-                        project.materials.append(default_material)
-                        defined_materials.add(default_material.name)
-                        logger.info(f"Created default material '{default_material.name}' for interaction '{interaction.name}'")
-
-            # 检查化学反应中的材料
-            if interaction.sources:
-                for material_name in interaction.sources.split(','):
-                    material_name = material_name.strip()
-                    if material_name:
-                        referenced_materials.add(material_name)
-                        if material_name not in defined_materials:
-                            logger.warning(f"Interaction '{interaction.name}' references undefined material '{material_name}' in sources")
-                            default_material = self._create_default_material(material_name)
-                            project.materials.append(default_material)
-                            defined_materials.add(default_material.name)
-                            logger.info(f"Created default material '{default_material.name}' for interaction '{interaction.name}'")
+                references[material_name].append(interaction)
 
-            if interaction.products:
-                for material_name in interaction.products.split(','):
-                    material_name = material_name.strip()
-                    if material_name:
-                        referenced_materials.add(material_name)
-                        if material_name not in defined_materials:
-                            logger.warning(f"Interaction '{interaction.name}' references undefined material '{material_name}' in products")
-                            default_material = self._create_default_material(material_name)
-                            project.materials.append(default_material)
-                            defined_materials.add(default_material.name)
-                            logger.info(f"Created default material '{default_material.name}' for interaction '{interaction.name}'")
-
-        logger.info(f"Referenced materials: {sorted(referenced_materials)}")
-        logger.info(f"Material reference validation completed")
+            for material_name in (interaction.source, interaction.target, interaction.product):
+                if material_name:
+                    references[material_name].append(interaction)
+
+            for species in (interaction.sources, interaction.products):
+                if species:
+                    for material_name in species.split(','):
+                        material_name = material_name.strip()
+                        if material_name:
+                            references[material_name].append(interaction)
+
+        return dict(references)
+
+    @staticmethod
+    def _describe_material_references(
+        material_names: List[str],
+        references: Dict[Optional[str], List[Any]],
+        limit: int = 20,
+    ) -> str:
+        """汇总缺失材料及其引用者（每种材料最多列出3个引用者，最多列出limit种材料）"""
+        parts = []
+        for material_name in material_names[:limit]:
+            referrers = references[material_name]
+            described = ", ".join(f"{type(entity).__name__.lower()} '{entity.name}'" for entity in referrers[:3])
+            if len(referrers) > 3:
+                described += f" and {len(referrers) - 3} more"
+            parts.append(f"'{material_name}' (referenced by {described})")
+        if len(material_names) > limit:
+            parts.append(f"... and {len(material_names) - limit} more")
+        return "; ".join(parts)
 
     def _create_default_material(self, material_name: str) -> Material:
         """为缺失的材料创建默认定义"""
@@ -1392,7 +1560,6 @@ class XMLGeneratorService:
         if material_type == "solid":
             default_material.density = 8000.0  # 默认密度
 
-        logger.info(f"Created default material: {material_name} (type: {material_type}, charge: {charge})")
         return default_material
 
     def _process_ionization_energies(self, project: SimulationProject) -> None:
@@ -1461,14 +1628,99 @@ class XMLGeneratorService:
         return mapped_type
 
     def _prettify_xml(self, elem: ET.Element) -> str:
-        """格式化XML输出"""
-        rough_string = ET.tostring(elem, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        pretty_xml = reparsed.toprettyxml(indent="  ")
-
-        # 移除空行和XML声明
-        lines = [line for line in pretty_xml.split('\n') if line.strip()]
-        if lines and lines[0].startswith('<?xml'):
-            lines = lines[1:]  # 移除XML声明行
+        """
+        格式化XML输出
 
+        单次遍历ElementTree直接输出缩进文本，结果与
+        ET.tostring -> minidom.toprettyxml(indent="  ") -> 去除空行和XML声明 的旧流程逐字节一致。
+        """
+        lines: List[str] = []
+        self._write_pretty_element(elem, 0, lines)
         return '\n'.join(lines)
+
+    def _iter_pretty_chunks(self, root: ET.Element, children: Iterable[ET.Element]) -> Iterator[str]:
+        """
+        逐个顶层子元素输出格式化文本块
+
+        root只提供标签和属性；children被逐个格式化后即丢弃，因此内存只与单个子元素有关。
+        所有块拼接后与把children加入root再调用_prettify_xml的结果完全一致。
+        """
+        start = self._pretty_start_tag(root, "")
+        opened = False
+        for child in children:
+            lines: List[str] = []
+            self._write_pretty_element(child, 1, lines)
+            if not opened:
+                yield start + ">"
+                opened = True
+            if lines:
+                yield "\n" + "\n".join(lines)
+
+        if opened:
+            yield f"\n</{root.tag}>"
+        else:
+            yield start + "/>"
+
+    def _pretty_start_tag(self, elem: ET.Element, indent: str) -> str:
+        """生成不含结尾括号的开始标签"""
+        start = indent + "<" + elem.tag
+        for name, value in elem.items():
+            start += f' {name}="{self._escape_xml_data(value)}"'
+        return start
+
+    def _write_pretty_element(self, elem: ET.Element, level: int, lines: List[str]) -> None:
+        """按minidom的排版规则输出一个元素及其子元素"""
+        indent = "  " * level
+        tag = elem.tag
+        start = self._pretty_start_tag(elem, indent)
+
+        text = self._normalize_xml_text(elem.text)
+        children = list(elem)
+        if not children:
+            if text:
+                self._append_pretty_line(lines, f"{start}>{self._escape_xml_data(text)}</{tag}>")
+            else:
+                self._append_pretty_line(lines, start + "/>")
+            return
+
+        # 混合内容：minidom把文本节点单独缩进成一行
+        child_indent = indent + "  "
+        self._append_pretty_line(lines, start + ">")
+        if text:
+            self._append_pretty_line(lines, child_indent + self._escape_xml_data(text))
+        for child in children:
+            self._write_pretty_element(child, level + 1, lines)
+            tail = self._normalize_xml_text(child.tail)
+            if tail:
+                self._append_pretty_line(lines, child_indent + self._escape_xml_data(tail))
+        self._append_pretty_line(lines, f"{indent}</{tag}>")
+
+    @staticmethod
+    def _append_pretty_line(lines: List[str], line: str) -> None:
+        """追加一行输出，与旧流程一样丢弃只包含空白的行"""
+        if "\n" in line:
+            lines.extend(part for part in line.split("\n") if part.strip())
+        elif line.strip():
+            lines.append(line)
+
+    @staticmethod
+    def _normalize_xml_text(text: Any) -> str:
+        """模拟XML解析器对文本中换行符的规范化（\r\n和\r都变为\n）"""
+        if not text:
+            return ""
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    @staticmethod
+    def _escape_xml_data(data: str) -> str:
+        """与minidom一致的转义：文本和属性值都转义 & < \" >"""
+        if "&" in data:
+            data = data.replace("&", "&amp;")
+        if "<" in data:
+            data = data.replace("<", "&lt;")
+        if '"' in data:
+            data = data.replace('"', "&quot;")
+        if ">" in data:
+            data = data.replace(">", "&gt;")
+        return data
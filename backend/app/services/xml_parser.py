@@ -5,17 +5,27 @@ The parser accepts the split XML files produced by XMLGeneratorService and a
 subset of hand-written Starfish project files. Its main contract is stable
 round-tripping: generated XML should import back into SimulationProject without
 losing the fields exposed by the UI.
+
+Each boundary, material, source and interaction is turned into its model as
+soon as its element has been read, so only one element's raw values exist at
+a time instead of a second copy of the whole project as nested dicts. The
+element is then cleared, so the parsed tree shrinks as the models grow; the
+section parsers therefore consume the elements they are given.
 """
 
+from array import array
 from pathlib import PurePath
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+import asyncio
 import logging
 import re
 import xml.etree.ElementTree as ET
 
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 
-from app.models.simulation import SimulationProject
+from app.models.simulation import Boundary, Interaction, Material, SimulationProject, Source
+from app.utils.path_codec import flatten_points, format_path, parse_path_coords
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +33,76 @@ logger = logging.getLogger(__name__)
 class XMLParserService:
     """Parse Starfish XML files into the application data model."""
 
+    # Files making up a split Starfish project, in merge order.
+    PROJECT_FILES = (
+        "starfish.xml",
+        "domain.xml",
+        "boundaries.xml",
+        "materials.xml",
+        "sources.xml",
+        "interactions.xml",
+    )
+
+    def __init__(self, compact_geometry: bool = False):
+        # Boundaries get packed float64 ``coords`` instead of one GeometryNode
+        # per point, which is much smaller and cheaper to validate for long walls.
+        self.compact_geometry = compact_geometry
+
     async def parse_files(self, file_dict: Dict[str, UploadFile]) -> SimulationProject:
         logger.info("Starting XML file parsing")
 
-        starfish_file = self._find_file(file_dict, "starfish.xml")
-        if starfish_file is None:
+        uploads = {filename: self._find_file(file_dict, filename) for filename in self.PROJECT_FILES}
+        if uploads["starfish.xml"] is None:
             raise ValueError("Missing required file: starfish.xml")
 
-        starfish_root = ET.fromstring(await starfish_file.read())
+        # Uploads are read concurrently and each file is parsed in the threadpool,
+        # so large projects do not block the event loop.
+        present = [(filename, upload) for filename, upload in uploads.items() if upload is not None]
+        sections = await asyncio.gather(
+            *(self._parse_upload(filename, upload) for filename, upload in present)
+        )
+        project = await run_in_threadpool(
+            self._build_project,
+            {filename: section for (filename, _), section in zip(present, sections)},
+        )
+
+        logger.info("XML parsing completed successfully")
+        return project
+
+    async def _parse_upload(self, filename: str, upload: UploadFile) -> Any:
+        if filename != "starfish.xml":
+            logger.info(f"Parsing {filename}")
+        if filename == "boundaries.xml":
+            return await run_in_threadpool(self._parse_boundaries_stream, upload.file)
+        content = await upload.read()
+        return await run_in_threadpool(self._parse_file_content, filename, content)
+
+    def _parse_file_content(self, filename: str, content: bytes) -> Any:
+        root = ET.fromstring(content)
+        if filename == "starfish.xml":
+            return root
+        if filename == "domain.xml":
+            return self._parse_domain_settings(root)
+        if filename == "materials.xml":
+            return self._parse_materials(root)
+        if filename == "sources.xml":
+            return self._parse_sources(root)
+        if filename == "interactions.xml":
+            return self._parse_interactions(root)
+        raise ValueError(f"Unsupported project file: {filename}")
+
+    def _build_project(self, sections: Dict[str, Any]) -> SimulationProject:
+        # Boundaries, materials, sources and interactions are already models,
+        # validated one element at a time while the XML was walked; pydantic
+        # accepts those instances as they are. Validating is kept on purpose:
+        # pydantic-core builds models faster than a model_construct() path
+        # skipping validation would (tools/bench_model_construction.py), and it
+        # still rejects values the parser does not normalize.
+        return SimulationProject(**self._project_data(sections))
+
+    def _project_data(self, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge the parsed sections into the data of one SimulationProject."""
+        starfish_root = sections["starfish.xml"]
         parsed_data: Dict[str, Any] = {
             "settings": self._parse_global_settings(starfish_root),
             "domain": self._parse_domain_settings(starfish_root),
@@ -40,43 +112,25 @@ class XMLParserService:
             "interactions": [],
         }
 
-        domain_file = self._find_file(file_dict, "domain.xml")
-        if domain_file is not None:
-            logger.info("Parsing domain.xml")
-            domain_root = ET.fromstring(await domain_file.read())
-            parsed_data["domain"] = self._parse_domain_settings(domain_root)
-
-        boundaries_file = self._find_file(file_dict, "boundaries.xml")
-        if boundaries_file is not None:
-            logger.info("Parsing boundaries.xml")
-            boundaries_root = ET.fromstring(await boundaries_file.read())
-            parsed_data["boundaries"] = self._parse_boundaries(boundaries_root)
-            transform = self._parse_boundary_transform(boundaries_root)
+        if "domain.xml" in sections:
+            parsed_data["domain"] = sections["domain.xml"]
+
+        if "boundaries.xml" in sections:
+            boundaries, transform = sections["boundaries.xml"]
+            parsed_data["boundaries"] = boundaries
             if transform:
                 parsed_data["domain"]["boundary_transform"] = transform
 
-        materials_file = self._find_file(file_dict, "materials.xml")
-        if materials_file is not None:
-            logger.info("Parsing materials.xml")
-            materials_root = ET.fromstring(await materials_file.read())
-            parsed_data["materials"] = self._parse_materials(materials_root)
-
-        sources_file = self._find_file(file_dict, "sources.xml")
-        if sources_file is not None:
-            logger.info("Parsing sources.xml")
-            sources_root = ET.fromstring(await sources_file.read())
-            parsed_data["sources"] = self._parse_sources(sources_root)
-
-        interactions_file = self._find_file(file_dict, "interactions.xml")
-        if interactions_file is not None:
-            logger.info("Parsing interactions.xml")
-            interactions_root = ET.fromstring(await interactions_file.read())
-            parsed_data["interactions"] = self._parse_interactions(interactions_root)
+        for filename, key in (
+            ("materials.xml", "materials"),
+            ("sources.xml", "sources"),
+            ("interactions.xml", "interactions"),
+        ):
+            if filename in sections:
+                parsed_data[key] = sections[filename]
 
         self._parse_inline_elements(starfish_root, parsed_data)
-
-        logger.info("XML parsing completed successfully")
-        return SimulationProject(**parsed_data)
+        return parsed_data
 
     def _find_file(
         self, file_dict: Dict[str, UploadFile], target_name: str
@@ -222,7 +276,9 @@ class XMLParserService:
         transform_elem = root.find("transform")
         if transform_elem is None:
             return None
+        return self._parse_transform_element(transform_elem)
 
+    def _parse_transform_element(self, transform_elem: ET.Element) -> Optional[Dict[str, Any]]:
         transform: Dict[str, Any] = {}
         for field in ("scaling", "translation"):
             value = self._child_text(transform_elem, field)
@@ -235,64 +291,120 @@ class XMLParserService:
 
         return transform or None
 
-    def _parse_boundaries(self, root: ET.Element) -> List[Dict[str, Any]]:
+    def _parse_boundaries(self, root: ET.Element) -> List[Boundary]:
         container = root.find("boundaries") if root.tag != "boundaries" else root
         if container is None:
             return []
 
         boundaries = []
         for index, boundary_elem in enumerate(container.findall("boundary")):
-            boundary_name = boundary_elem.get("name", f"boundary_{index}")
-            boundary: Dict[str, Any] = {
-                "id": boundary_name,
-                "name": boundary_name,
-                "type": self._normalize_boundary_type(boundary_elem.get("type")),
-                "nodes": [],
-            }
+            boundaries.append(self._parse_boundary_element(boundary_elem, index))
+            boundary_elem.clear()
+        return boundaries
+
+    def _parse_boundaries_stream(
+        self, source: BinaryIO
+    ) -> Tuple[List[Boundary], Optional[Dict[str, Any]]]:
+        """Parse a boundaries file incrementally.
+
+        Equivalent to ``_parse_boundaries`` and ``_parse_boundary_transform`` on
+        the parsed root, but each ``<boundary>`` is converted as soon as its end
+        tag is read and then discarded, so memory is bounded by the largest
+        single boundary instead of the whole document.
+        """
+        boundaries: List[Boundary] = []
+        transform: Optional[Dict[str, Any]] = None
+        transform_seen = False
+        root: Optional[ET.Element] = None
+        container: Optional[ET.Element] = None
+        container_depth = 0
+        container_open = False
+        depth = 0
+
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                    if elem.tag == "boundaries":
+                        container, container_depth, container_open = elem, 1, True
+                elif depth == 2 and container is None and elem.tag == "boundaries":
+                    container, container_depth, container_open = elem, 2, True
+                continue
 
-            for attr_name in ("value", "reverse"):
-                attr_value = boundary_elem.get(attr_name)
-                if attr_value is None:
-                    continue
-                if attr_name == "reverse":
-                    boundary[attr_name] = self._parse_bool_text(attr_value)
-                else:
-                    boundary[attr_name] = attr_value
-
-            material = self._child_text(boundary_elem, "material")
-            if material:
-                boundary["material"] = material
-
-            path_elem = boundary_elem.find("path")
-            path_text = self._text_or_none(path_elem)
-            path_points = self._parse_points_from_container(path_elem)
-            direct_points = self._parse_points_from_container(boundary_elem)
-            nodes_points = self._parse_nodes_element(boundary_elem.find("nodes"))
-            nodes = nodes_points or direct_points or path_points
-
-            if path_text:
-                boundary["path"] = path_text
-            elif nodes:
-                boundary["path"] = self._path_from_nodes(nodes)
+            if depth == 2 and elem.tag == "transform" and not transform_seen:
+                transform_seen = True
+                transform = self._parse_transform_element(elem)
+
+            if container_open and depth == container_depth + 1:
+                if elem.tag == "boundary":
+                    boundaries.append(self._parse_boundary_element(elem, len(boundaries)))
+                elem.clear()
+                container.remove(elem)
+            elif depth == 2:
+                elem.clear()
+                root.remove(elem)
+
+            if elem is container:
+                container_open = False
+            depth -= 1
+
+        return boundaries, transform
+
+    def _parse_boundary_element(self, boundary_elem: ET.Element, index: int) -> Boundary:
+        boundary_name = boundary_elem.get("name", f"boundary_{index}")
+        boundary: Dict[str, Any] = {
+            "id": boundary_name,
+            "name": boundary_name,
+            "type": self._normalize_boundary_type(boundary_elem.get("type")),
+        }
 
+        for attr_name in ("value", "reverse"):
+            attr_value = boundary_elem.get(attr_name)
+            if attr_value is None:
+                continue
+            if attr_name == "reverse":
+                boundary[attr_name] = self._parse_bool_text(attr_value)
+            else:
+                boundary[attr_name] = attr_value
+
+        material = self._child_text(boundary_elem, "material")
+        if material:
+            boundary["material"] = material
+
+        path_elem = boundary_elem.find("path")
+        path_text = self._text_or_none(path_elem)
+        path_points = self._parse_points_from_container(path_elem)
+        direct_points = self._parse_points_from_container(boundary_elem)
+        nodes_points = self._parse_nodes_element(boundary_elem.find("nodes"))
+        nodes = nodes_points or direct_points or path_points
+
+        if path_text:
+            boundary["path"] = path_text
+        elif nodes:
+            boundary["path"] = self._path_from_nodes(nodes)
+
+        if self.compact_geometry:
+            if nodes:
+                boundary["coords"] = self._pack_nodes(nodes)
+            elif boundary.get("path"):
+                boundary["coords"] = self._coords_from_path(boundary["path"])
+        else:
             if not nodes and boundary.get("path"):
                 nodes = self._nodes_from_path(boundary["path"])
-
             boundary["nodes"] = nodes
 
-            temp = self._child_text(boundary_elem, "temp")
-            if temp:
-                boundary["temp"] = float(temp)
-
-            temperature = self._child_text(boundary_elem, "temperature")
-            if temperature:
-                boundary["temperature"] = float(temperature)
+        temp = self._child_text(boundary_elem, "temp")
+        if temp:
+            boundary["temp"] = float(temp)
 
-            boundaries.append(boundary)
+        temperature = self._child_text(boundary_elem, "temperature")
+        if temperature:
+            boundary["temperature"] = float(temperature)
 
-        return boundaries
+        return Boundary.model_validate(boundary)
 
-    def _parse_materials(self, root: ET.Element) -> List[Dict[str, Any]]:
+    def _parse_materials(self, root: ET.Element) -> List[Material]:
         container = root.find("materials") if root.tag != "materials" else root
         if container is None:
             return []
@@ -332,11 +444,12 @@ class XMLParserService:
                 if value:
                     material[field] = value
 
-            materials.append(material)
+            materials.append(Material.model_validate(material))
+            material_elem.clear()
 
         return materials
 
-    def _parse_sources(self, root: ET.Element) -> List[Dict[str, Any]]:
+    def _parse_sources(self, root: ET.Element) -> List[Source]:
         container = root.find("sources") if root.tag != "sources" else root
         if container is None:
             return []
@@ -366,11 +479,12 @@ class XMLParserService:
             if region_elem is not None:
                 source["region"] = ET.tostring(region_elem, encoding="unicode")
 
-            sources.append(source)
+            sources.append(Source.model_validate(source))
+            source_elem.clear()
 
         return sources
 
-    def _parse_interactions(self, root: ET.Element) -> List[Dict[str, Any]]:
+    def _parse_interactions(self, root: ET.Element) -> List[Interaction]:
         container = root
         if root.tag not in {"material_interactions", "interactions"}:
             material_interactions = root.find("material_interactions")
@@ -383,14 +497,15 @@ class XMLParserService:
         interactions = []
         for index, elem in enumerate(list(container)):
             interaction = self._parse_interaction_element(elem, index)
-            if interaction:
+            if interaction is not None:
                 interactions.append(interaction)
+            elem.clear()
 
         return interactions
 
     def _parse_interaction_element(
         self, elem: ET.Element, index: int
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Interaction]:
         tag = elem.tag
         if tag == "interaction":
             raw_type = elem.get("type", "dsmc")
@@ -484,7 +599,7 @@ class XMLParserService:
         if materials_elem is not None and materials_elem.text:
             interaction["materials"] = self._split_csv(materials_elem.text)
 
-        return interaction
+        return Interaction.model_validate(interaction)
 
     def _parse_inline_elements(self, root: ET.Element, parsed_data: Dict[str, Any]) -> None:
         inline_domain = root.find("domain")
@@ -552,22 +667,18 @@ class XMLParserService:
         return {"x": values[0], "y": values[1]}
 
     def _nodes_from_path(self, path: str) -> List[Dict[str, float]]:
-        values = [
-            float(match)
-            for match in re.findall(r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?", path)
-        ]
-        return [
-            {"x": values[index], "y": values[index + 1]}
-            for index in range(0, len(values) - 1, 2)
-        ]
+        values = iter(self._coords_from_path(path))
+        return [{"x": x, "y": y} for x, y in zip(values, values)]
+
+    def _coords_from_path(self, path: str) -> array:
+        """Flat ``[x0, y0, x1, y1, ...]`` coordinates of a path; an odd trailing number is dropped."""
+        return parse_path_coords(path)
+
+    def _pack_nodes(self, nodes: List[Dict[str, float]]) -> array:
+        return array("d", flatten_points((node["x"], node["y"]) for node in nodes))
 
     def _path_from_nodes(self, nodes: List[Dict[str, float]]) -> str:
-        if not nodes:
-            return ""
-        head, *tail = nodes
-        commands = [f"M {head['x']},{head['y']}"]
-        commands.extend(f"L {node['x']},{node['y']}" for node in tail)
-        return " ".join(commands)
+        return format_path(flatten_points((node["x"], node["y"]) for node in nodes))
 
     def _parse_float_list(self, text: str) -> List[float]:
         return [
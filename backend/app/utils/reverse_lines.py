@@ -0,0 +1,80 @@
+"""
+Reading text files from the end.
+
+Summaries of a Starfish run only need the last few (matching) lines of
+``starfish.log`` or the last row of ``starfish_stats.csv``. Reading fixed-size
+blocks backwards from the end of the file and stopping as soon as enough lines
+were found keeps time and memory independent of the file size.
+"""
+
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional
+import io
+
+# Bytes read per backward step.
+REVERSE_READ_BLOCK_SIZE = 64 * 1024
+
+
+def iter_reversed_lines(
+    handle: BinaryIO,
+    start: int = 0,
+    block_size: int = REVERSE_READ_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the lines of a binary file from last to first, without line endings.
+
+    Only bytes from offset ``start`` to the end are considered. A final
+    newline does not produce an empty last line, like ``str.splitlines``.
+    """
+    position = handle.seek(0, io.SEEK_END)
+    if position <= start:
+        return
+
+    pending = b""
+    at_end = True
+    while position > start:
+        size = min(block_size, position - start)
+        position -= size
+        handle.seek(position)
+        chunk = handle.read(size)
+        if at_end:
+            at_end = False
+            if chunk.endswith(b"\n"):
+                chunk = chunk[:-1]
+        lines = (chunk + pending).split(b"\n")
+        # The first piece may continue in the previous block.
+        pending = lines[0]
+        for line in reversed(lines[1:]):
+            yield line.rstrip(b"\r")
+    yield pending.rstrip(b"\r")
+
+
+def tail_lines(
+    path: Path,
+    limit: int,
+    keep: Optional[Callable[[str], bool]] = None,
+    encoding: str = "utf-8",
+) -> List[str]:
+    """
+    The last ``limit`` lines of a text file accepted by ``keep``, in file order.
+
+    Lines are decoded and filtered while reading backwards, so only as much of
+    the file is read as it takes to find them. A missing file gives no lines.
+    """
+    if limit <= 0:
+        return []
+    try:
+        handle = Path(path).open("rb")
+    except FileNotFoundError:
+        return []
+
+    found: List[str] = []
+    with handle:
+        for raw in iter_reversed_lines(handle):
+            line = raw.decode(encoding, errors="replace")
+            if keep is None or keep(line):
+                found.append(line)
+                if len(found) == limit:
+                    break
+    found.reverse()
+    return found
@@ -0,0 +1,122 @@
+"""
+Streaming ZIP writer.
+
+Builds a ZIP archive incrementally and yields the compressed bytes as soon as
+zipfile produces them, so an HTTP response can start sending before the whole
+archive exists and memory stays bounded by one file's pending data.
+
+When errors must surface before the response starts, the stream can first be
+written to a spooled temporary file (``spool_stream``): small archives stay in
+memory, larger ones go to disk, and ``iter_spooled`` then sends it in chunks.
+"""
+
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+import logging
+import tempfile
+import time
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Text is encoded and compressed in slices of this many characters.
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+# Spooled archives larger than this are moved from memory to a temporary file.
+ZIP_SPOOL_MAX_MEMORY = 8 * 2**20
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that buffers zipfile output until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_stream(
+    entries: Iterable[Tuple[str, str]],
+    compression: int = zipfile.ZIP_DEFLATED,
+    chunk_size: int = ZIP_STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive built from ``(filename, text)`` pairs.
+
+    Consecutive pairs with the same filename are appended to the same archive
+    entry, so producers may emit one file as several text chunks. Entries are
+    UTF-8 encoded. Because the sink is unseekable, zipfile writes sizes and
+    CRCs in data descriptors after each entry.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression) as zip_file:
+        current_name: Optional[str] = None
+        current_entry = None
+        try:
+            for filename, text in entries:
+                if filename != current_name:
+                    if current_entry is not None:
+                        current_entry.close()
+                        logger.info(f"Added {current_name} to ZIP")
+                    zip_info = zipfile.ZipInfo(filename, date_time=time.localtime(time.time())[:6])
+                    zip_info.compress_type = compression
+                    zip_info.external_attr = 0o600 << 16
+                    current_entry = zip_file.open(zip_info, "w")
+                    current_name = filename
+
+                for start in range(0, len(text), chunk_size):
+                    current_entry.write(text[start:start + chunk_size].encode("utf-8"))
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            if current_entry is not None:
+                current_entry.close()
+                current_entry = None
+                logger.info(f"Added {current_name} to ZIP")
+        finally:
+            if current_entry is not None:
+                current_entry.close()
+
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def spool_stream(chunks: Iterable[bytes], max_memory: int = ZIP_SPOOL_MAX_MEMORY) -> BinaryIO:
+    """
+    Write a byte stream to a spooled temporary file and return it rewound.
+
+    Exceptions raised while producing ``chunks`` propagate to the caller, and
+    the temporary file is closed.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        for data in chunks:
+            spooled.write(data)
+        spooled.seek(0)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled
+
+
+def iter_spooled(spooled: BinaryIO, chunk_size: int = ZIP_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the contents of a file from ``spool_stream`` in chunks, closing it afterwards."""
+    try:
+        while True:
+            data = spooled.read(chunk_size)
+            if not data:
+                break
+            yield data
+    finally:
+        spooled.close()
@@ -0,0 +1,77 @@
+import math
+
+import pytest
+
+from app.services.starfish_stats import StarfishStats, load_stats
+
+
+STATS_CSV = (
+    "it,time,mp.O+,mp.e-\n"
+    "0,0.0,0,10\n"
+    "10,1.0,5,12\n"
+    "\n"
+    "20,2.0,bad,14\n"
+    "30,3.0,9,16\n"
+    "40,4.0,11\n"
+)
+
+
+@pytest.fixture
+def stats(tmp_path) -> StarfishStats:
+    stats_file = tmp_path / "starfish_stats.csv"
+    stats_file.write_text(STATS_CSV, encoding="utf-8")
+    return load_stats(stats_file)
+
+
+def test_load_skips_blank_and_partial_rows(stats):
+    assert stats.columns == ["it", "time", "mp.O+", "mp.e-"]
+    assert len(stats) == 4
+    assert stats.row(-1) == {"it": 30.0, "time": 3.0, "mp.O+": 9.0, "mp.e-": 16.0}
+
+
+def test_column_values(stats):
+    assert list(stats.column("it")) == [0.0, 10.0, 20.0, 30.0]
+    assert list(stats.column("mp.e-", 1, 3)) == [12.0, 14.0]
+    assert list(stats.column("time", 3, 100)) == [3.0]
+    assert list(stats.column("time", 3, 1)) == []
+
+
+def test_unparseable_cells_are_nan(stats):
+    assert math.isnan(stats.column("mp.O+")[2])
+
+
+def test_window_bounds_are_inclusive(stats):
+    assert stats.window() == range(0, 4)
+    assert stats.window(10, 20) == range(1, 3)
+    assert stats.window(5, 25) == range(1, 3)
+    assert stats.window(first_it=30) == range(3, 4)
+    assert stats.window(last_it=0) == range(0, 1)
+    assert stats.window(31, 100) == range(4, 4)
+
+
+def test_summarize_window(stats):
+    summary = stats.summarize(["mp.e-"], first_it=10, last_it=30)
+    assert summary["mp.e-"].min == 12.0
+    assert summary["mp.e-"].max == 16.0
+    assert summary["mp.e-"].mean == pytest.approx(14.0)
+
+
+def test_summarize_last_rows(stats):
+    summary = stats.summarize(["it", "time"], last_rows=2)
+    assert (summary["it"].min, summary["it"].max) == (20.0, 30.0)
+    assert summary["time"].mean == pytest.approx(2.5)
+    assert stats.summarize(last_rows=0) == {}
+
+
+def test_summarize_ignores_nan(stats):
+    summary = stats.summarize(["mp.O+"])
+    assert (summary["mp.O+"].min, summary["mp.O+"].max) == (0.0, 9.0)
+    assert summary["mp.O+"].mean == pytest.approx(14.0 / 3)
+    # A window holding only NaN leaves the column out.
+    assert stats.summarize(["mp.O+"], first_it=20, last_it=20) == {}
+
+
+def test_missing_file(tmp_path):
+    stats = load_stats(tmp_path / "missing.csv")
+    assert len(stats) == 0
+    assert stats.summarize() == {}
@@ -0,0 +1,117 @@
+import argparse
+import gc
+import json
+import logging
+from pathlib import Path
+import statistics
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.models.simulation import Boundary  # noqa: E402
+from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from app.services.xml_parser import XMLParserService  # noqa: E402
+from tools.synthetic_projects import build_scaled_project, wall_points  # noqa: E402
+
+
+FORMATS = ("nodes", "coords")
+
+
+def boundary_payload(geometry: str, count: int) -> str:
+    """JSON body of one boundary as the API receives it."""
+    points = wall_points(count)
+    if geometry == "coords":
+        payload = {"name": "wall", "coords": [value for point in points for value in point]}
+    else:
+        payload = {"name": "wall", "nodes": [{"x": x, "y": y} for x, y in points]}
+    return json.dumps(payload)
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def retained_mb(fn) -> float:
+    """Memory still allocated by the object ``fn`` returns, measured with tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / 2**20
+
+
+def measure(geometry: str, count: int, repeat: int) -> dict:
+    compact = geometry == "coords"
+    payload = boundary_payload(geometry, count)
+    boundary = Boundary.model_validate_json(payload)
+
+    project = build_scaled_project(boundaries=1, nodes_per_boundary=count, compact_geometry=compact)
+    generator = XMLGeneratorService()
+    boundaries_xml = generator.generate_xml_files(project)["boundaries.xml"]
+    parser = XMLParserService(compact_geometry=compact)
+
+    def parse_to_model():
+        # The parser clears each element once it is converted, so every run needs a fresh tree.
+        return parser._parse_boundaries(ET.fromstring(boundaries_xml))
+
+    return {
+        "geometry": geometry,
+        "nodes": count,
+        "validate_seconds": best_of(repeat, lambda: Boundary.model_validate_json(payload)),
+        "model_mb": retained_mb(lambda: Boundary.model_validate_json(payload)),
+        "dump_seconds": best_of(repeat, boundary.model_dump_json),
+        "generate_seconds": best_of(repeat, lambda: generator.generate_xml_files(project)),
+        "parse_seconds": best_of(repeat, parse_to_model),
+        "parsed_mb": retained_mb(parse_to_model),
+    }
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = argparse.ArgumentParser(
+        description="Compare List[GeometryNode] boundaries with packed coords: validation, memory, generate and parse."
+    )
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10_000, 100_000], help="Points per boundary.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement (median is reported).")
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>8} {'geometry':>8} {'validate ms':>12} {'model MiB':>10} {'dump ms':>9} "
+        f"{'generate ms':>12} {'parse ms':>9} {'parsed MiB':>11}"
+    )
+    for count in args.nodes:
+        results = {geometry: measure(geometry, count, args.repeat) for geometry in FORMATS}
+        for geometry in FORMATS:
+            result = results[geometry]
+            print(
+                f"{count:>8} {geometry:>8} {result['validate_seconds'] * 1e3:>12.1f} {result['model_mb']:>10.2f} "
+                f"{result['dump_seconds'] * 1e3:>9.1f} {result['generate_seconds'] * 1e3:>12.1f} "
+                f"{result['parse_seconds'] * 1e3:>9.1f} {result['parsed_mb']:>11.2f}"
+            )
+        nodes, coords = results["nodes"], results["coords"]
+        print(
+            f"{'':>8} {'ratio':>8} {nodes['validate_seconds'] / coords['validate_seconds']:>11.1f}x "
+            f"{nodes['model_mb'] / coords['model_mb']:>9.1f}x {nodes['dump_seconds'] / coords['dump_seconds']:>8.1f}x "
+            f"{nodes['generate_seconds'] / coords['generate_seconds']:>11.1f}x "
+            f"{nodes['parse_seconds'] / coords['parse_seconds']:>8.1f}x {nodes['parsed_mb'] / coords['parsed_mb']:>10.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
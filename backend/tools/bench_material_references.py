@@ -0,0 +1,135 @@
+import argparse
+import logging
+import os
+from pathlib import Path
+import sys
+import time
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.models.simulation import Material, SimulationProject  # noqa: E402
+from app.services.xml_generator import XMLGeneratorService, logger as generator_logger  # noqa: E402
+from tools.synthetic_projects import build_scaled_project, scaled_interactions  # noqa: E402
+
+
+class PerReferenceXMLGeneratorService(XMLGeneratorService):
+    """Previous validator that checks and logs every reference in place, kept as the reference."""
+
+    def _create_default_material(self, material_name: str) -> Material:
+        material = super()._create_default_material(material_name)
+        generator_logger.info(
+            f"Created default material: {material_name} (type: {material.type}, charge: {material.charge})"
+        )
+        return material
+
+    def _add_missing(self, project, defined_materials: set, material_name: str, owner: str, suffix: str = "") -> None:
+        if material_name not in defined_materials:
+            generator_logger.warning(f"{owner} references undefined material '{material_name}'{suffix}")
+            default_material = self._create_default_material(material_name)
+            project.materials.append(default_material)
+            defined_materials.add(default_material.name)
+            generator_logger.info(f"Created default material '{default_material.name}' for {owner.lower()}")
+
+    def _validate_and_fix_material_references(self, project: SimulationProject) -> None:
+        defined_materials = {material.name for material in project.materials}
+        generator_logger.info(f"Defined materials: {sorted(defined_materials)}")
+        referenced_materials = set()
+
+        for boundary in project.boundaries:
+            if boundary.type == "solid" and not boundary.material:
+                boundary.material = self._get_or_create_default_solid_material(project, defined_materials)
+                generator_logger.info(
+                    f"Assigned default solid material '{boundary.material}' to boundary '{boundary.name}'"
+                )
+            if boundary.material:
+                referenced_materials.add(boundary.material)
+                self._add_missing(project, defined_materials, boundary.material, f"Boundary '{boundary.name}'")
+
+        for source in project.sources:
+            if source.material:
+                referenced_materials.add(source.material)
+                self._add_missing(project, defined_materials, source.material, f"Source '{source.name}'")
+
+        for interaction in project.interactions:
+            owner = f"Interaction '{interaction.name}'"
+            for material_name in interaction.materials:
+                referenced_materials.add(material_name)
+                self._add_missing(project, defined_materials, material_name, owner)
+            for material_name in [interaction.source, interaction.target, interaction.product]:
+                if material_name:
+                    referenced_materials.add(material_name)
+                    self._add_missing(project, defined_materials, material_name, owner)
+            for field, label in ((interaction.sources, " in sources"), (interaction.products, " in products")):
+                if field:
+                    for material_name in field.split(','):
+                        material_name = material_name.strip()
+                        if material_name:
+                            referenced_materials.add(material_name)
+                            self._add_missing(project, defined_materials, material_name, owner, label)
+
+        generator_logger.info(f"Referenced materials: {sorted(referenced_materials)}")
+        generator_logger.info("Material reference validation completed")
+
+
+def build_project(interactions: int, species: int) -> SimulationProject:
+    """A project defining a few materials whose interactions reference ``species`` names, most undefined."""
+    project = build_scaled_project(boundaries=4, materials=20, sources=4)
+    project.interactions = scaled_interactions(interactions, [f"species_{index}" for index in range(species)])
+    return project
+
+
+def time_validation(generator: XMLGeneratorService, project: SimulationProject, repeat: int) -> tuple[float, SimulationProject]:
+    best = float("inf")
+    result = project
+    for _ in range(repeat):
+        result = project.model_copy(deep=True)
+        started = time.perf_counter()
+        generator._validate_and_fix_material_references(result)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def material_snapshot(project: SimulationProject) -> list[dict]:
+    return [material.model_dump(exclude={"id"}) for material in project.materials]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-reference and indexed material reference validation.")
+    parser.add_argument(
+        "--interactions",
+        type=int,
+        nargs="+",
+        default=[100, 1_000, 10_000],
+        help="Interaction counts to benchmark.",
+    )
+    parser.add_argument("--species-ratio", type=float, default=0.1, help="Distinct species referenced per interaction.")
+    parser.add_argument("--log-level", default="INFO", help="Generator log level; records are written to os.devnull.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; the best run is reported.")
+    args = parser.parse_args()
+
+    # Log at a production-like level, but to a sink, so formatting and handler cost is included.
+    logging.basicConfig(level=args.log_level.upper(), stream=open(os.devnull, "w"), force=True)
+
+    print(f"{'interactions':>12} {'missing':>8} {'per-ref s':>10} {'indexed s':>10} {'speedup':>8}")
+    for count in args.interactions:
+        project = build_project(count, max(int(count * args.species_ratio), 2))
+        reference_seconds, expected = time_validation(PerReferenceXMLGeneratorService(), project, args.repeat)
+        indexed_seconds, actual = time_validation(XMLGeneratorService(), project, args.repeat)
+        if material_snapshot(expected) != material_snapshot(actual):
+            print(f"ERROR: resolved materials for {count} interactions differ from the reference", file=sys.stderr)
+            return 1
+
+        missing = len(actual.materials) - len(project.materials)
+        print(
+            f"{count:>12} {missing:>8} {reference_seconds:>10.4f} {indexed_seconds:>10.4f} "
+            f"{reference_seconds / indexed_seconds:>7.1f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
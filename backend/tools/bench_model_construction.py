@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import functools
+import io
+import logging
+from pathlib import Path
+import statistics
+import sys
+import time
+import typing
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from fastapi import UploadFile  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from app.models.simulation import SimulationProject  # noqa: E402
+from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from app.services.xml_parser import XMLParserService  # noqa: E402
+from tools.synthetic_projects import build_scaled_project  # noqa: E402
+
+
+CASES = {
+    "boundaries=100 x 1000 nodes": {"boundaries": 100, "nodes_per_boundary": 1000},
+    "boundaries=4 x 100000 nodes": {"boundaries": 4, "nodes_per_boundary": 100_000},
+    "materials=1000": {"materials": 1000},
+    "interactions=10000": {"materials": 100, "interactions": 10_000},
+    "sources=1000": {"sources": 1000},
+}
+
+
+def _model_type(annotation) -> tuple[str, type[BaseModel] | None]:
+    """How a field holds nested models: ("model", M), ("list", M) or ("value", None)."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return "model", annotation
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if origin is typing.Union and len(args) == 1:
+        return _model_type(args[0])
+    if origin is list and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return "list", args[0]
+    return "value", None
+
+
+@functools.lru_cache(maxsize=None)
+def _nested_fields(model: type[BaseModel]) -> dict[str, tuple[str, type[BaseModel]]]:
+    """The fields of ``model`` that hold nested models, with how they hold them."""
+    nested = {}
+    for name, field in model.model_fields.items():
+        kind, nested_model = _model_type(field.annotation)
+        if nested_model is not None:
+            nested[name] = (kind, nested_model)
+    return nested
+
+
+def construct_trusted(model: type[BaseModel], data: dict) -> BaseModel:
+    """Build ``model`` from already-normalized parser output with ``model_construct``, skipping validation."""
+    nested_fields = _nested_fields(model)
+    if not nested_fields:
+        return model.model_construct(**data)
+    values = dict(data)
+    for name, (kind, nested) in nested_fields.items():
+        value = values.get(name)
+        if kind == "model" and isinstance(value, dict):
+            values[name] = construct_trusted(nested, value)
+        elif kind == "list" and value:
+            values[name] = [construct_trusted(nested, item) if isinstance(item, dict) else item for item in value]
+    return model.model_construct(**values)
+
+
+def parsed_project_data(project: SimulationProject) -> dict:
+    """
+    The values the parser sets for this project's XML, as plain dicts.
+
+    The parser validates each element as it reads it; dumping only the fields
+    it set gives the same data as nested dicts.
+    """
+    xml_files = XMLGeneratorService().generate_xml_files(project)
+    uploads = {name: UploadFile(file=io.BytesIO(content.encode("utf-8")), filename=name) for name, content in xml_files.items()}
+    return asyncio.run(XMLParserService().parse_files(uploads)).model_dump(exclude_unset=True)
+
+
+def median_seconds(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = argparse.ArgumentParser(
+        description="Compare validated SimulationProject construction with model_construct on parser output."
+    )
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES), help="Projects to compare.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per mode (median is reported).")
+    args = parser.parse_args()
+
+    print(f"{'case':<30} {'validated ms':>13} {'construct ms':>13} {'construct/validated':>20}")
+    for name in args.cases:
+        data = parsed_project_data(build_scaled_project(**CASES[name]))
+        validated = SimulationProject(**data)
+        constructed = construct_trusted(SimulationProject, data)
+        if validated.model_dump_json() != constructed.model_dump_json():
+            print(f"ERROR: {name}: model_construct result differs from the validated project", file=sys.stderr)
+            return 1
+
+        validated_seconds = median_seconds(args.repeat, lambda: SimulationProject(**data))
+        construct_seconds = median_seconds(args.repeat, lambda: construct_trusted(SimulationProject, data))
+        print(
+            f"{name:<30} {validated_seconds * 1e3:>13.1f} {construct_seconds * 1e3:>13.1f} "
+            f"{construct_seconds / validated_seconds:>19.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+import argparse
+import json
+import logging
+import math
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.xml_parser import XMLParserService  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+MODES = ("tree", "stream")
+
+
+def write_synthetic_boundaries(path: Path, size_mb: float, nodes_per_boundary: int = 5000) -> tuple[int, int]:
+    """Write a generator-style boundaries.xml of roughly ``size_mb`` megabytes."""
+    target_bytes = int(size_mb * 2**20)
+    boundaries = 0
+    nodes = 0
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("<boundaries>\n  <transform>\n    <scaling>1,1</scaling>\n  </transform>\n")
+        while handle.tell() < target_bytes:
+            points = [
+                (round(index * 1e-5, 6), round(0.05 + 0.02 * math.sin(boundaries + index / 50.0), 6))
+                for index in range(nodes_per_boundary)
+            ]
+            head, *tail = points
+            path_text = f"M {head[0]}, {head[1]} " + " ".join(f"L {x} {y}" for x, y in tail)
+            handle.write(f'  <boundary name="wall_{boundaries}" type="solid" value="0">\n')
+            handle.write("    <material>wall</material>\n")
+            handle.write(f"    <path>{path_text}</path>\n    <temp>300</temp>\n    <nodes>\n")
+            handle.writelines(f'      <node x="{x}" y="{y}"/>\n' for x, y in points)
+            handle.write("    </nodes>\n  </boundary>\n")
+            boundaries += 1
+            nodes += nodes_per_boundary
+        handle.write("</boundaries>")
+    return boundaries, nodes
+
+
+def parse(mode: str, path: Path):
+    parser = XMLParserService()
+    if mode == "tree":
+        root = ET.fromstring(path.read_bytes())
+        return parser._parse_boundaries(root), parser._parse_boundary_transform(root)
+    with path.open("rb") as handle:
+        return parser._parse_boundaries_stream(handle)
+
+
+def max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run_worker(mode: str, path: Path) -> int:
+    baseline_rss = max_rss_mb()
+    started = time.perf_counter()
+    boundaries, _transform = parse(mode, path)
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "seconds": elapsed,
+                "boundaries": len(boundaries),
+                "nodes": sum(boundary.node_count() for boundary in boundaries),
+                "baseline_rss_mb": baseline_rss,
+                "max_rss_mb": max_rss_mb(),
+            }
+        )
+    )
+    return 0
+
+
+def check_equivalence(directory: Path) -> bool:
+    sample = directory / "sample_boundaries.xml"
+    write_synthetic_boundaries(sample, 0.2, nodes_per_boundary=200)
+    return parse("tree", sample) == parse("stream", sample)
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = argparse.ArgumentParser(description="Compare tree and iterparse parsing of a large boundaries.xml.")
+    parser.add_argument("--size-mb", type=float, default=50.0, help="Synthetic boundaries.xml size in MB.")
+    parser.add_argument("--file", type=Path, default=None, help="Parse this boundaries.xml instead of a synthetic one.")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args.worker, args.file)
+
+    with tempfile.TemporaryDirectory(prefix="bench_boundaries_") as tmp_dir:
+        directory = Path(tmp_dir)
+        if not check_equivalence(directory):
+            print("ERROR: streaming parse differs from the tree parse")
+            return 1
+
+        boundaries_file = args.file
+        if boundaries_file is None:
+            boundaries_file = directory / "boundaries.xml"
+            count, nodes = write_synthetic_boundaries(boundaries_file, args.size_mb)
+            print(f"Synthetic file: {boundaries_file.stat().st_size / 2**20:.1f} MB, {count} boundaries, {nodes} nodes")
+
+        print(f"{'mode':>8} {'seconds':>9} {'peak RSS MiB':>13} {'RSS growth MiB':>15}")
+        for mode in MODES:
+            completed = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), "--worker", mode, "--file", str(boundaries_file)],
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                print(completed.stderr)
+                return 1
+            stats = json.loads(completed.stdout.strip().splitlines()[-1])
+            if stats["max_rss_mb"] is None:
+                print(f"{mode:>8} {stats['seconds']:>9.2f} {'n/a':>13} {'n/a':>15}")
+            else:
+                growth = stats["max_rss_mb"] - stats["baseline_rss_mb"]
+                print(f"{mode:>8} {stats['seconds']:>9.2f} {stats['max_rss_mb']:>13.1f} {growth:>15.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
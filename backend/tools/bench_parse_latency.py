@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+import statistics
+import sys
+import time
+from typing import Any, Dict
+import xml.etree.ElementTree as ET
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import httpx  # noqa: E402
+from fastapi import UploadFile  # noqa: E402
+
+import app.api.project as project_api  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.simulation import SimulationProject  # noqa: E402
+from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from app.services.xml_parser import XMLParserService  # noqa: E402
+from tools.synthetic_projects import build_scaled_project  # noqa: E402
+
+
+class SerialXMLParserService(XMLParserService):
+    """Reference parser that reads and parses each file in turn on the event loop."""
+
+    async def parse_files(self, file_dict: Dict[str, UploadFile]) -> SimulationProject:
+        sections: Dict[str, Any] = {}
+        for filename in self.PROJECT_FILES:
+            upload = self._find_file(file_dict, filename)
+            if upload is None:
+                continue
+            content = await upload.read()
+            if filename == "boundaries.xml":
+                root = ET.fromstring(content)
+                sections[filename] = (self._parse_boundaries(root), self._parse_boundary_transform(root))
+            else:
+                sections[filename] = self._parse_file_content(filename, content)
+        return self._build_project(sections)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(parser_class: type, xml_files: dict[str, str], concurrency: int, interval: float) -> dict[str, float]:
+    project_api.XMLParserService = parser_class
+    transport = httpx.ASGITransport(app=app)
+    upload = [("files", (name, content.encode("utf-8"), "application/xml")) for name, content in xml_files.items()]
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        health_latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def ping() -> None:
+            # Latency is measured from each probe's scheduled time, so time spent
+            # waiting for a blocked event loop to even send the probe is counted.
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                response = await client.get("/health")
+                response.raise_for_status()
+                finished = time.perf_counter()
+                health_latencies.append(finished - scheduled)
+                scheduled = max(scheduled + interval, finished)
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+
+        async def parse_once() -> None:
+            response = await client.post("/api/v1/project/parse", files=upload)
+            response.raise_for_status()
+
+        pinger = asyncio.create_task(ping())
+        await asyncio.sleep(interval * 5)
+        started = time.perf_counter()
+        await asyncio.gather(*(parse_once() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        done.set()
+        await pinger
+
+    return {
+        "wall": wall,
+        "p50": statistics.median(health_latencies),
+        "p99": percentile(health_latencies, 0.99),
+        "max": max(health_latencies),
+        "pings": len(health_latencies),
+    }
+
+
+async def run(args: argparse.Namespace) -> int:
+    project = build_scaled_project(
+        boundaries=args.boundaries,
+        nodes_per_boundary=args.nodes_per_boundary,
+        materials=args.materials,
+        sources=args.materials,
+        interactions=args.interactions,
+    )
+    xml_files = XMLGeneratorService().generate_xml_files(project)
+    size_mb = sum(len(content) for content in xml_files.values()) / 2**20
+    print(f"Project upload: {size_mb:.1f} MB across {len(xml_files)} files, {args.concurrency} concurrent parse requests")
+
+    original = project_api.XMLParserService
+    try:
+        print(f"{'parser':>10} {'wall s':>8} {'health p50 ms':>14} {'p99 ms':>8} {'max ms':>8} {'pings':>6}")
+        for label, parser_class in (("serial", SerialXMLParserService), ("threaded", XMLParserService)):
+            stats = await measure(parser_class, xml_files, args.concurrency, args.interval)
+            print(
+                f"{label:>10} {stats['wall']:>8.2f} {stats['p50'] * 1e3:>14.1f} "
+                f"{stats['p99'] * 1e3:>8.1f} {stats['max'] * 1e3:>8.1f} {stats['pings']:>6}"
+            )
+    finally:
+        project_api.XMLParserService = original
+    return 0
+
+
+def main() -> int:
+    # app.api.project configures INFO logging on import; keep request logs out of the timings.
+    logging.getLogger().setLevel(logging.ERROR)
+
+    parser = argparse.ArgumentParser(description="Measure /health latency while several project parses are in flight.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent /parse requests.")
+    parser.add_argument("--boundaries", type=int, default=20, help="Boundaries in the uploaded project.")
+    parser.add_argument("--nodes-per-boundary", type=int, default=5000, help="Nodes per boundary.")
+    parser.add_argument("--materials", type=int, default=200, help="Materials and sources in the uploaded project.")
+    parser.add_argument("--interactions", type=int, default=5000, help="Interactions in the uploaded project.")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between /health probes.")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
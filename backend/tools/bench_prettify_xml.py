@@ -0,0 +1,109 @@
+import argparse
+import logging
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from tools.starfish_case_matrix import build_starfish_edge_cases  # noqa: E402
+from tools.synthetic_projects import build_scaled_project  # noqa: E402
+
+
+class MinidomXMLGeneratorService(XMLGeneratorService):
+    """Generator using the previous tostring -> minidom -> toprettyxml formatting, kept as the reference."""
+
+    def _prettify_xml(self, elem: ET.Element) -> str:
+        rough_string = ET.tostring(elem, encoding="unicode")
+        pretty_xml = minidom.parseString(rough_string).toprettyxml(indent="  ")
+        lines = [line for line in pretty_xml.split("\n") if line.strip()]
+        if lines and lines[0].startswith("<?xml"):
+            lines = lines[1:]
+        return "\n".join(lines)
+
+
+def check_case_matrix() -> list[str]:
+    errors: list[str] = []
+    for case in build_starfish_edge_cases():
+        expected = MinidomXMLGeneratorService().generate_xml_files(case.project_factory())
+        actual = XMLGeneratorService().generate_xml_files(case.project_factory())
+        for filename in sorted(set(expected) | set(actual)):
+            if expected.get(filename) != actual.get(filename):
+                errors.append(f"{case.name}: {filename} differs from the minidom reference")
+    return errors
+
+
+def time_boundaries(generator: XMLGeneratorService, project, repeat: int) -> tuple[float, str]:
+    best = float("inf")
+    content = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = generator._generate_boundaries_xml(project.boundaries, project)
+        best = min(best, time.perf_counter() - started)
+    return best, content
+
+
+def peak_memory(generator: XMLGeneratorService, project) -> int:
+    tracemalloc.start()
+    try:
+        generator._generate_boundaries_xml(project.boundaries, project)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = argparse.ArgumentParser(description="Compare the streaming XML formatter with the minidom reference.")
+    parser.add_argument(
+        "--nodes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Total boundary node counts to benchmark.",
+    )
+    parser.add_argument("--boundaries", type=int, default=10, help="Number of boundaries the nodes are spread over.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; the best run is reported.")
+    args = parser.parse_args()
+
+    errors = check_case_matrix()
+    if errors:
+        print("\n".join(errors))
+        return 1
+    print("Starfish case matrix output is byte-identical to the minidom reference.")
+
+    print(f"{'nodes':>8} {'minidom s':>10} {'stream s':>10} {'speedup':>8} {'minidom MiB':>12} {'stream MiB':>11}")
+    for total_nodes in args.nodes:
+        project = build_scaled_project(
+            boundaries=args.boundaries,
+            nodes_per_boundary=max(total_nodes // args.boundaries, 2),
+        )
+        reference = MinidomXMLGeneratorService()
+        streaming = XMLGeneratorService()
+
+        reference_seconds, expected = time_boundaries(reference, project, args.repeat)
+        streaming_seconds, actual = time_boundaries(streaming, project, args.repeat)
+        if expected != actual:
+            print(f"ERROR: boundaries.xml for {total_nodes} nodes differs from the minidom reference")
+            return 1
+
+        reference_peak = peak_memory(reference, project) / 2**20
+        streaming_peak = peak_memory(streaming, project) / 2**20
+        print(
+            f"{total_nodes:>8} {reference_seconds:>10.3f} {streaming_seconds:>10.3f} "
+            f"{reference_seconds / streaming_seconds:>7.1f}x {reference_peak:>12.1f} {streaming_peak:>11.1f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+import argparse
+import logging
+from pathlib import Path
+import statistics
+import sys
+import time
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.starfish_runner import StarfishRunResult, StarfishRunnerService  # noqa: E402
+from tools.starfish_case_matrix import build_starfish_edge_cases, generate_case_xml  # noqa: E402
+
+
+def timed_run(runner: StarfishRunnerService, xml_files: dict[str, str], timeout: int) -> tuple[float, StarfishRunResult]:
+    started = time.perf_counter()
+    result = runner.run_xml_files(xml_files, timeout=timeout)
+    return time.perf_counter() - started, result
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = argparse.ArgumentParser(description="Compare cold and warm-JVM Starfish latency on the edge cases.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case and mode.")
+    parser.add_argument("--warm-jvms", type=int, default=2, help="Size of the warm JVM pool.")
+    parser.add_argument(
+        "--back-to-back",
+        action="store_true",
+        help="Do not wait for the pool to refill between warm runs; slower refills show up as cold fallbacks.",
+    )
+    parser.add_argument("--timeout", type=int, default=20, help="Per-run timeout in seconds.")
+    args = parser.parse_args()
+
+    cold = StarfishRunnerService(warm_jvms=0)
+    warm = StarfishRunnerService(warm_jvms=args.warm_jvms)
+    try:
+        cold.ensure_available()
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(f"ERROR: {exc}")
+        return 2
+    if warm.jvm_pool is None or not warm.jvm_pool.supported():
+        print("ERROR: the warm JVM pool is not supported on this platform")
+        return 2
+
+    print(f"Using {cold.java_version_line()}")
+    print(f"Using Starfish CLI: {cold.starfish_jar}")
+    if not warm.jvm_pool.wait_ready(timeout=120):
+        print("ERROR: warm JVMs did not start; see the log for the launcher's error output")
+        return 2
+
+    cold_all: list[float] = []
+    warm_all: list[float] = []
+    try:
+        print(f"{'case':<48} {'cold p50 s':>10} {'warm p50 s':>10} {'speedup':>8}")
+        for case in build_starfish_edge_cases():
+            xml_files = generate_case_xml(case)
+            cold_times: list[float] = []
+            warm_times: list[float] = []
+            for _ in range(args.repeat):
+                elapsed, cold_result = timed_run(cold, xml_files, args.timeout)
+                cold_times.append(elapsed)
+                if not args.back_to_back:
+                    warm.jvm_pool.wait_ready(timeout=120)
+                elapsed, warm_result = timed_run(warm, xml_files, args.timeout)
+                warm_times.append(elapsed)
+                if (cold_result.returncode, cold_result.ok) != (warm_result.returncode, warm_result.ok):
+                    print(f"ERROR: {case.name}: warm run differs from cold run", file=sys.stderr)
+                    print(warm_result.output, file=sys.stderr)
+                    return 1
+
+            cold_all.extend(cold_times)
+            warm_all.extend(warm_times)
+            cold_p50 = statistics.median(cold_times)
+            warm_p50 = statistics.median(warm_times)
+            print(f"{case.name:<48} {cold_p50:>10.3f} {warm_p50:>10.3f} {cold_p50 / warm_p50:>7.1f}x")
+
+        stats = warm.jvm_pool.stats()
+        cold_p50 = statistics.median(cold_all)
+        warm_p50 = statistics.median(warm_all)
+        print(f"{'all cases':<48} {cold_p50:>10.3f} {warm_p50:>10.3f} {cold_p50 / warm_p50:>7.1f}x")
+        print(f"Warm runs: {stats['warm_runs']}, cold fallbacks: {stats['fallbacks']}")
+    finally:
+        warm.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import io
+import json
+import logging
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from fastapi import UploadFile  # noqa: E402
+
+from app.models.simulation import SimulationProject  # noqa: E402
+from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from app.services.xml_parser import XMLParserService  # noqa: E402
+from tools.synthetic_projects import build_scaled_project  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+OPERATIONS = ("generate", "parse", "roundtrip")
+
+# Every case starts from this project and scales one axis.
+BASE_PROJECT = {
+    "boundaries": 4,
+    "nodes_per_boundary": 50,
+    "materials": 10,
+    "sources": 4,
+    "interactions": 10,
+}
+
+AXIS_SIZES = {
+    "boundaries": (10, 100, 1000),
+    "nodes_per_boundary": (1_000, 10_000, 100_000),
+    "materials": (10, 100, 1000),
+    "sources": (10, 100, 1000),
+    "interactions": (100, 1_000, 10_000),
+}
+
+
+def case_parameters(axis: str, size: int) -> dict[str, int]:
+    return {**BASE_PROJECT, axis: size}
+
+
+def case_key(result: dict) -> tuple[str, int, str]:
+    return result["axis"], result["size"], result["operation"]
+
+
+def max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_xml_files(xml_files: dict[str, bytes], compact_geometry: bool = False) -> SimulationProject:
+    uploads = {name: UploadFile(file=io.BytesIO(content), filename=name) for name, content in xml_files.items()}
+    return asyncio.run(XMLParserService(compact_geometry=compact_geometry).parse_files(uploads))
+
+
+def run_worker(axis: str, size: int, operation: str, repeat: int, warmup: int, compact_geometry: bool) -> int:
+    """Time one operation on one project size in this process and print the result as JSON."""
+    project = build_scaled_project(**case_parameters(axis, size), compact_geometry=compact_geometry)
+    encoded = {name: content.encode("utf-8") for name, content in XMLGeneratorService().generate_xml_files(project).items()}
+
+    def generate() -> None:
+        XMLGeneratorService().generate_xml_files(project)
+
+    def parse() -> None:
+        parse_xml_files(encoded, compact_geometry)
+
+    def roundtrip() -> None:
+        xml_files = XMLGeneratorService().generate_xml_files(project)
+        parse_xml_files({name: content.encode("utf-8") for name, content in xml_files.items()}, compact_geometry)
+
+    operation_fn = {"generate": generate, "parse": parse, "roundtrip": roundtrip}[operation]
+    for _ in range(warmup):
+        operation_fn()
+
+    baseline_rss = max_rss_mb()
+    durations: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation_fn()
+        durations.append(time.perf_counter() - started)
+    peak_rss = max_rss_mb()
+
+    print(
+        json.dumps(
+            {
+                "axis": axis,
+                "size": size,
+                "operation": operation,
+                "compact_geometry": compact_geometry,
+                "project": case_parameters(axis, size),
+                "xml_mb": round(sum(len(content) for content in encoded.values()) / 2**20, 3),
+                "repeat": repeat,
+                "ops_per_sec": repeat / sum(durations),
+                "p50_seconds": statistics.median(durations),
+                "p99_seconds": percentile(durations, 0.99),
+                "peak_rss_mb": peak_rss,
+                "rss_growth_mb": None if peak_rss is None else peak_rss - baseline_rss,
+            }
+        )
+    )
+    return 0
+
+
+def run_case(axis: str, size: int, operation: str, repeat: int, warmup: int, compact_geometry: bool) -> dict:
+    """Run one case in a fresh interpreter so peak RSS belongs to that case alone."""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "--worker",
+            axis,
+            str(size),
+            operation,
+            "--repeat",
+            str(repeat),
+            "--warmup",
+            str(warmup),
+            *(["--compact-geometry"] if compact_geometry else []),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{axis}={size} {operation} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare_with_baseline(
+    results: list[dict],
+    baseline: dict,
+    max_time_regression: float,
+    max_rss_regression: float,
+    min_delta_seconds: float = 0.0,
+) -> list[str]:
+    """
+    Describe every case whose p50 time or peak RSS grew beyond the allowed ratio.
+
+    Timing differences below ``min_delta_seconds`` are ignored so that jitter
+    on millisecond-sized cases does not count as a regression.
+    """
+    previous = {case_key(result): result for result in baseline.get("results", [])}
+    failures: list[str] = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        label = f"{result['axis']}={result['size']} {result['operation']}"
+        time_ratio = result["p50_seconds"] / old["p50_seconds"]
+        slower_by = result["p50_seconds"] - old["p50_seconds"]
+        if time_ratio > 1.0 + max_time_regression and slower_by > min_delta_seconds:
+            failures.append(
+                f"{label}: p50 {result['p50_seconds'] * 1e3:.1f} ms vs baseline "
+                f"{old['p50_seconds'] * 1e3:.1f} ms ({time_ratio - 1.0:+.0%})"
+            )
+        if result["peak_rss_mb"] and old.get("peak_rss_mb"):
+            rss_ratio = result["peak_rss_mb"] / old["peak_rss_mb"]
+            if rss_ratio > 1.0 + max_rss_regression:
+                failures.append(
+                    f"{label}: peak RSS {result['peak_rss_mb']:.1f} MiB vs baseline "
+                    f"{old['peak_rss_mb']:.1f} MiB ({rss_ratio - 1.0:+.0%})"
+                )
+    return failures
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark XML generation and parsing on synthetic projects scaled along each axis."
+    )
+    parser.add_argument("--axes", nargs="+", choices=sorted(AXIS_SIZES), default=list(AXIS_SIZES), help="Axes to scale.")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS), help="Operations to time.")
+    parser.add_argument("--quick", action="store_true", help="Only the two smallest sizes per axis.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case before timing.")
+    parser.add_argument(
+        "--compact-geometry",
+        action="store_true",
+        help="Use packed boundary coords instead of GeometryNode lists in the project and the parser.",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON (usable as a baseline).")
+    parser.add_argument("--baseline", type=Path, default=None, help="Fail if a case regressed against this JSON file.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed p50 time growth over the baseline (0.25 = 25%%).",
+    )
+    parser.add_argument(
+        "--max-rss-regression",
+        type=float,
+        default=0.25,
+        help="Allowed peak RSS growth over the baseline (0.25 = 25%%).",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=5.0,
+        help="Ignore p50 time growth smaller than this many milliseconds.",
+    )
+    parser.add_argument("--worker", nargs=3, metavar=("AXIS", "SIZE", "OPERATION"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        axis, size, operation = args.worker
+        return run_worker(axis, int(size), operation, args.repeat, args.warmup, args.compact_geometry)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+
+    results: list[dict] = []
+    print(
+        f"{'axis':>18} {'size':>7} {'operation':>9} {'XML MiB':>8} {'ops/s':>8} "
+        f"{'p50 ms':>9} {'p99 ms':>9} {'peak RSS MiB':>13}"
+    )
+    for axis in args.axes:
+        sizes = AXIS_SIZES[axis][:2] if args.quick else AXIS_SIZES[axis]
+        for size in sizes:
+            for operation in args.operations:
+                result = run_case(axis, size, operation, args.repeat, args.warmup, args.compact_geometry)
+                results.append(result)
+                rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}"
+                print(
+                    f"{axis:>18} {size:>7} {operation:>9} {result['xml_mb']:>8.2f} {result['ops_per_sec']:>8.2f} "
+                    f"{result['p50_seconds'] * 1e3:>9.1f} {result['p99_seconds'] * 1e3:>9.1f} {rss:>13}"
+                )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "compact_geometry": args.compact_geometry,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results: {args.output}")
+
+    if baseline is not None:
+        failures = compare_with_baseline(
+            results, baseline, args.max_regression, args.max_rss_regression, args.min_delta_ms / 1e3
+        )
+        if failures:
+            print(f"\nREGRESSION: {len(failures)} case(s) exceed the baseline {args.baseline}:", file=sys.stderr)
+            for failure in failures:
+                print(f"  {failure}", file=sys.stderr)
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,4 @@
 import argparse
-import csv
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -20,8 +19,11 @@ from app.models.simulation import (  # noqa: E402
     SimulationProject,
     Source,
 )
+from app.services.run_events import IMPORTANT_LOG_PREFIXES, is_important_log_line  # noqa: E402
 from app.services.starfish_runner import StarfishRunResult, StarfishRunnerService  # noqa: E402
+from app.services.starfish_stats import STATS_FILENAME, read_stats_tail  # noqa: E402
 from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from app.utils.reverse_lines import tail_lines  # noqa: E402
 
 
 def build_demo_project(
@@ -89,38 +91,9 @@ def default_output_dir() -> Path:
     return REPO_ROOT / "starfish_runs" / f"ezxml_demo_{stamp}"
 
 
-def read_stats(stats_file: Path) -> tuple[list[str], list[dict[str, str]]]:
-    if not stats_file.exists():
-        return [], []
-    with stats_file.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        return list(reader.fieldnames or []), list(reader)
-
-
-def important_log_lines(log_file: Path) -> list[str]:
-    if not log_file.exists():
-        return []
-
-    interesting_prefixes = (
-        "Loading ",
-        "Processing <",
-        "Domain type:",
-        "Added ",
-        "> nodes",
-        "> origin",
-        "> spacing",
-        ">dt:",
-        ">max_it:",
-        "Starting main loop",
-        "it:",
-        "Source Summary:",
-        "ion_beam:",
-        "Done!",
-        "WARNING:",
-        "ERROR:",
-    )
-    lines = log_file.read_text(encoding="utf-8", errors="replace").splitlines()
-    return [line for line in lines if line.strip().startswith(interesting_prefixes)]
+def important_log_lines(log_file: Path, limit: int = 30) -> list[str]:
+    prefixes = IMPORTANT_LOG_PREFIXES + ("ion_beam:",)
+    return tail_lines(log_file, limit, keep=lambda line: is_important_log_line(line, prefixes))
 
 
 def result_summary(
@@ -129,8 +102,8 @@ def result_summary(
     run_result: StarfishRunResult,
 ) -> str:
     files = sorted(path for path in output_dir.iterdir() if path.is_file())
-    headers, rows = read_stats(output_dir / "starfish_stats.csv")
-    last_row = rows[-1] if rows else {}
+    stats = read_stats_tail(output_dir / STATS_FILENAME)
+    last_row = stats.final_row
     log_lines = important_log_lines(output_dir / "starfish.log")
 
     summary: list[str] = [
@@ -156,8 +129,8 @@ def result_summary(
             "",
             "## Statistics",
             "",
-            f"- Stats columns: `{len(headers)}`",
-            f"- Stats rows: `{len(rows)}`",
+            f"- Stats columns: `{len(stats.columns)}`",
+            f"- Stats rows: `{stats.rows}`",
         ]
     )
 
@@ -177,7 +150,7 @@ def result_summary(
 
     if log_lines:
         summary.extend(["", "## Log Highlights", ""])
-        for line in log_lines[-30:]:
+        for line in log_lines:
             summary.append(f"- `{line}`")
 
     if run_result.output:
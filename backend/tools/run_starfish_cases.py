@@ -55,21 +55,37 @@ def main() -> int:
 
     parser = argparse.ArgumentParser(description="Run StarfishCLI edge-case validation projects.")
     parser.add_argument("--timeout", type=int, default=20, help="Per-case timeout in seconds.")
+    parser.add_argument(
+        "--warm-jvms",
+        type=int,
+        default=None,
+        help="Keep this many pre-started JVMs for the cases (default: STARFISH_WARM_JVMS, 0 = cold starts).",
+    )
     args = parser.parse_args()
 
-    runner = StarfishRunnerService()
+    runner = StarfishRunnerService(warm_jvms=args.warm_jvms)
     try:
         runner.ensure_available()
     except (FileNotFoundError, RuntimeError) as exc:
         print(f"ERROR: {exc}")
         return 2
+    try:
+        return run_cases(runner, args.timeout)
+    finally:
+        runner.close()
+
+
+def run_cases(runner: StarfishRunnerService, timeout: int) -> int:
+    if runner.jvm_pool is not None:
+        # Warm up while the Java version is checked; cases fall back to cold starts until JVMs are ready.
+        runner.jvm_pool.start()
 
     print(f"Using {runner.java_version_line()}")
     print(f"Using Starfish CLI: {runner.starfish_jar}")
 
     failures: list[tuple[str, str]] = []
     for case in build_starfish_edge_cases():
-        ok, detail = run_case(case, runner, args.timeout)
+        ok, detail = run_case(case, runner, timeout)
         status = "PASS" if ok else "FAIL"
         print(f"[{status}] {case.name} - {case.description}")
         if detail:
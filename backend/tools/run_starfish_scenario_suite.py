@@ -1,10 +1,14 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import csv
 from dataclasses import dataclass
 from datetime import datetime
+import os
 from pathlib import Path
 import sys
-from typing import Callable
+import threading
+from typing import Callable, Iterator, Optional
 
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
@@ -22,7 +26,16 @@ from app.models.simulation import (  # noqa: E402
     Source,
 )
 from app.services.starfish_runner import StarfishRunResult, StarfishRunnerService  # noqa: E402
+from app.services.starfish_stats import STATS_FILENAME, particle_counts, read_stats_tail, source_terms  # noqa: E402
 from app.services.xml_generator import XMLGeneratorService  # noqa: E402
+from app.utils.reverse_lines import tail_lines  # noqa: E402
+from tools.scenario_results import (  # noqa: E402
+    ResultCache,
+    ResultStore,
+    default_results_db,
+    save_run_output,
+    xml_bundle_hash,
+)
 
 
 @dataclass(frozen=True)
@@ -206,34 +219,8 @@ def build_scenarios() -> list[Scenario]:
     ]
 
 
-def read_stats(stats_file: Path) -> tuple[list[str], list[dict[str, str]]]:
-    if not stats_file.exists():
-        return [], []
-    with stats_file.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        return list(reader.fieldnames or []), list(reader)
-
-
-def final_particle_counts(final_row: dict[str, str]) -> dict[str, int]:
-    counts: dict[str, int] = {}
-    for key, value in final_row.items():
-        if key.startswith("mp."):
-            try:
-                counts[key.removeprefix("mp.")] = int(float(value))
-            except ValueError:
-                counts[key.removeprefix("mp.")] = 0
-    return counts
-
-
-def final_source_terms(final_row: dict[str, str]) -> dict[str, str]:
-    return {key: value for key, value in final_row.items() if key.startswith("source.")}
-
-
 def log_tail(log_file: Path, limit: int = 20) -> list[str]:
-    if not log_file.exists():
-        return []
-    lines = [line for line in log_file.read_text(encoding="utf-8", errors="replace").splitlines() if line.strip()]
-    return lines[-limit:]
+    return tail_lines(log_file, limit, keep=str.strip)
 
 
 def run_scenario(
@@ -241,32 +228,111 @@ def run_scenario(
     suite_dir: Path,
     runner: StarfishRunnerService,
     timeout: int,
+    cache: Optional[ResultCache] = None,
 ) -> dict[str, object]:
     output_dir = suite_dir / scenario.name
     output_dir.mkdir(parents=True, exist_ok=True)
     project = scenario.project_factory()
     xml_files = XMLGeneratorService().generate_xml_files(project)
-    result = runner.run_xml_files(xml_files, timeout=timeout, work_dir=output_dir)
+    xml_hash = xml_bundle_hash(xml_files)
 
-    headers, rows = read_stats(output_dir / "starfish_stats.csv")
-    final_row = rows[-1] if rows else {}
-    particle_counts = final_particle_counts(final_row)
-    source_terms = final_source_terms(final_row)
+    # Unchanged XML, jar and Java version: reuse the earlier run's outputs instead of running Starfish.
+    cache_key = cache.key(xml_hash) if cache is not None else None
+    result = cache.restore(cache_key, output_dir) if cache is not None else None
+    cached = result is not None
+    if result is None:
+        result = runner.run_xml_files(xml_files, timeout=timeout, work_dir=output_dir)
+        save_run_output(output_dir, result)
+
+    # Only the header and the final row are parsed, so long runs summarize quickly.
+    stats = read_stats_tail(output_dir / STATS_FILENAME)
 
     return {
         "scenario": scenario,
         "output_dir": output_dir,
         "result": result,
-        "stats_columns": len(headers),
-        "stats_rows": len(rows),
-        "final_row": final_row,
-        "particle_counts": particle_counts,
-        "source_terms": source_terms,
+        "stats_columns": len(stats.columns),
+        "stats_rows": stats.rows,
+        "final_row": stats.final_row,
+        "particle_counts": particle_counts(stats.final_row),
+        "source_terms": source_terms(stats.final_row),
         "log_tail": log_tail(output_dir / "starfish.log"),
         "xml_files": sorted(xml_files),
+        "xml_hash": xml_hash,
+        "cache_key": cache_key,
+        "cached": cached,
     }
 
 
+def scenario_cores(project: SimulationProject, cpu_count: int) -> int:
+    """Cores one Starfish run occupies: its max_cores, or every core when unset."""
+    return max(1, min(project.settings.max_cores or cpu_count, cpu_count))
+
+
+def default_jobs(core_needs: list[int], cpu_count: int) -> int:
+    """Enough parallel scenarios to fill the machine with the smallest runs, capped by the scenario count."""
+    if not core_needs:
+        return 1
+    return max(1, min(len(core_needs), cpu_count // min(core_needs)))
+
+
+class CoreBudget:
+    """Counts free cores so concurrent scenarios never ask for more cores than the machine has."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self._free = total
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, cores: int) -> Iterator[None]:
+        cores = min(cores, self.total)
+        with self._condition:
+            self._condition.wait_for(lambda: self._free >= cores)
+            self._free -= cores
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._free += cores
+                self._condition.notify_all()
+
+
+def run_scenarios(
+    scenarios: list[Scenario],
+    suite_dir: Path,
+    runner: StarfishRunnerService,
+    timeout: int,
+    jobs: int,
+    cpu_count: int,
+    cache: Optional[ResultCache] = None,
+) -> list[dict[str, object]]:
+    """
+    Run scenarios on up to ``jobs`` threads and return their records in scenario order.
+
+    Each scenario already writes to its own ``suite_dir / name`` directory, so runs
+    share nothing but the core budget, which keeps the sum of their max_cores
+    within ``cpu_count``.
+    """
+    if jobs <= 1:
+        return [run_scenario(scenario, suite_dir, runner, timeout, cache) for scenario in scenarios]
+
+    budget = CoreBudget(cpu_count)
+
+    def run_with_budget(scenario: Scenario) -> dict[str, object]:
+        with budget.reserve(scenario_cores(scenario.project_factory(), cpu_count)):
+            return run_scenario(scenario, suite_dir, runner, timeout, cache)
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="scenario") as pool:
+        futures = [pool.submit(run_with_budget, scenario) for scenario in scenarios]
+        return [future.result() for future in futures]
+
+
+def record_status(record: dict[str, object]) -> str:
+    status = "PASS" if record["result"].ok else "FAIL"
+    return f"{status} (cached)" if record["cached"] else status
+
+
 def write_suite_outputs(suite_dir: Path, records: list[dict[str, object]]) -> None:
     csv_file = suite_dir / "scenario_summary.csv"
     with csv_file.open("w", newline="", encoding="utf-8") as handle:
@@ -280,6 +346,7 @@ def write_suite_outputs(suite_dir: Path, records: list[dict[str, object]]) -> No
                 "elapsed_seconds",
                 "particle_counts",
                 "output_dir",
+                "cached",
             ]
         )
         for record in records:
@@ -294,6 +361,7 @@ def write_suite_outputs(suite_dir: Path, records: list[dict[str, object]]) -> No
                     f"{result.elapsed_seconds:.3f}",
                     "; ".join(f"{name}={count}" for name, count in record["particle_counts"].items()),
                     record["output_dir"],
+                    record["cached"],
                 ]
             )
 
@@ -313,7 +381,7 @@ def write_suite_outputs(suite_dir: Path, records: list[dict[str, object]]) -> No
         scenario = record["scenario"]
         result = record["result"]
         particles = ", ".join(f"{name}={count}" for name, count in record["particle_counts"].items())
-        status = "PASS" if result.ok else "FAIL"
+        status = record_status(record)
         lines.append(
             f"| {scenario.name} | {status} | {record['stats_rows']} | {particles} | `{record['output_dir']}` |"
         )
@@ -329,7 +397,8 @@ def write_suite_outputs(suite_dir: Path, records: list[dict[str, object]]) -> No
                 scenario.description,
                 "",
                 f"- Exit code: `{result.returncode}`",
-                f"- Elapsed seconds: `{result.elapsed_seconds:.3f}`",
+                f"- Elapsed seconds: `{result.elapsed_seconds:.3f}`"
+                + (" (reused from an earlier run with the same XML, jar and Java version)" if record["cached"] else ""),
                 f"- Stats rows: `{record['stats_rows']}`",
                 f"- XML files: `{', '.join(record['xml_files'])}`",
                 f"- Final particles: `{', '.join(f'{name}={count}' for name, count in record['particle_counts'].items())}`",
@@ -350,7 +419,7 @@ def print_records(records: list[dict[str, object]], suite_dir: Path) -> None:
         scenario = record["scenario"]
         result = record["result"]
         particles = ", ".join(f"{name}={count}" for name, count in record["particle_counts"].items())
-        status = "PASS" if result.ok else "FAIL"
+        status = record_status(record)
         print(
             f"[{status}] {scenario.name}: rows={record['stats_rows']}, "
             f"particles={particles}, elapsed={result.elapsed_seconds:.3f}s"
@@ -359,19 +428,69 @@ def print_records(records: list[dict[str, object]], suite_dir: Path) -> None:
     print(f"CSV: {suite_dir / 'scenario_summary.csv'}")
 
 
+def open_result_cache(store: ResultStore, runner: StarfishRunnerService, force: bool) -> Optional[ResultCache]:
+    """Cache of earlier results keyed by XML, jar and Java version; None when Java or the jar is missing."""
+    try:
+        java_version = runner.java_version_line()
+    except (FileNotFoundError, RuntimeError, OSError):
+        return None
+    # With --force every scenario runs, but results are still recorded for later reuse.
+    return ResultCache(store, runner.starfish_jar, java_version, reuse=not force)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Run several varied ezxml-generated Starfish scenarios.")
     parser.add_argument("--output-dir", type=Path, default=None, help="Directory for the scenario suite results.")
     parser.add_argument("--timeout", type=int, default=60, help="Per-scenario Starfish timeout in seconds.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Scenarios to run in parallel (default: as many as fit on the available cores given each max_cores).",
+    )
+    parser.add_argument("--cpus", type=int, default=None, help="Cores available to the suite (default: all).")
+    parser.add_argument(
+        "--results-db",
+        type=Path,
+        default=None,
+        help="SQLite database the results are added to (default: starfish_runs/results.sqlite3).",
+    )
+    parser.add_argument(
+        "--no-results-db",
+        action="store_true",
+        help="Do not record results in the database (this also turns off reusing unchanged results).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every scenario even if its XML, the jar and the Java version match an earlier passing run.",
+    )
     args = parser.parse_args()
 
     suite_dir = (args.output_dir or default_suite_dir()).resolve()
     suite_dir.mkdir(parents=True, exist_ok=True)
     runner = StarfishRunnerService()
 
-    records = [run_scenario(scenario, suite_dir, runner, args.timeout) for scenario in build_scenarios()]
-    write_suite_outputs(suite_dir, records)
-    print_records(records, suite_dir)
+    scenarios = build_scenarios()
+    cpu_count = max(1, args.cpus or os.cpu_count() or 1)
+    core_needs = [scenario_cores(scenario.project_factory(), cpu_count) for scenario in scenarios]
+    jobs = args.jobs if args.jobs is not None else default_jobs(core_needs, cpu_count)
+    print(f"Running {len(scenarios)} scenarios with {jobs} job(s) on {cpu_count} core(s)")
+
+    results_db = None if args.no_results_db else (args.results_db or default_results_db())
+    store = ResultStore(results_db) if results_db is not None else None
+    try:
+        cache = open_result_cache(store, runner, args.force) if store is not None else None
+        records = run_scenarios(scenarios, suite_dir, runner, args.timeout, jobs, cpu_count, cache)
+        write_suite_outputs(suite_dir, records)
+        print_records(records, suite_dir)
+        if store is not None:
+            java_version = cache.java_version if cache is not None else None
+            store.record_suite(suite_dir, records, java_version, str(runner.starfish_jar), jobs)
+            print(f"Results database: {results_db}")
+    finally:
+        if store is not None:
+            store.close()
 
     return 0 if all(record["result"].ok for record in records) else 1
 
@@ -0,0 +1,347 @@
+import argparse
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import json
+from pathlib import Path
+import shutil
+import sqlite3
+import statistics
+import sys
+import threading
+from typing import Iterable, Mapping, Optional
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parent
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.starfish_runner import StarfishRunResult  # noqa: E402
+
+
+# Metrics a regression query can compare; all are columns of scenario_results.
+METRICS = ("elapsed_seconds", "stats_rows")
+
+OUTPUT_TAIL_LINES = 50
+# Full Starfish stdout/stderr saved next to each live run's outputs, so a reused run reports them unchanged.
+STDOUT_LOG = "stdout.log"
+STDERR_LOG = "stderr.log"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suite_runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    suite_dir TEXT NOT NULL,
+    java_version TEXT,
+    starfish_jar TEXT,
+    jobs INTEGER
+);
+CREATE TABLE IF NOT EXISTS scenario_results (
+    id INTEGER PRIMARY KEY,
+    suite_run_id INTEGER NOT NULL REFERENCES suite_runs(id),
+    scenario TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    returncode INTEGER NOT NULL,
+    timed_out INTEGER NOT NULL,
+    elapsed_seconds REAL NOT NULL,
+    stats_rows INTEGER NOT NULL,
+    particle_counts TEXT NOT NULL,
+    source_terms TEXT NOT NULL,
+    xml_hash TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    command TEXT NOT NULL,
+    last_output_line TEXT NOT NULL,
+    output_tail TEXT NOT NULL,
+    cache_key TEXT NOT NULL DEFAULT '',
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS scenario_results_by_scenario ON scenario_results (scenario, id);
+"""
+
+# Columns added after the first schema version, created on older databases when opened.
+ADDED_COLUMNS = {
+    "cache_key": "TEXT NOT NULL DEFAULT ''",
+    "cached": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def default_results_db() -> Path:
+    return REPO_ROOT / "starfish_runs" / "results.sqlite3"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as handle:
+        for block in iter(lambda: handle.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def xml_bundle_hash(xml_files: Mapping[str, str]) -> str:
+    """SHA-256 over the generated XML files, independent of their order."""
+    digest = hashlib.sha256()
+    for filename in sorted(xml_files):
+        for part in (filename, xml_files[filename]):
+            data = part.encode("utf-8")
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def save_run_output(output_dir: Path, result: StarfishRunResult) -> None:
+    """Write a run's full stdout and stderr into its output directory."""
+    (Path(output_dir) / STDOUT_LOG).write_text(result.stdout, encoding="utf-8")
+    (Path(output_dir) / STDERR_LOG).write_text(result.stderr, encoding="utf-8")
+
+
+def load_command(value: str) -> tuple[str, ...]:
+    """A stored command: a JSON list, or a space-joined string in rows written before commands were JSON."""
+    if value.startswith("["):
+        return tuple(json.loads(value))
+    return tuple(value.split(" "))
+
+
+@dataclass(frozen=True)
+class Regression:
+    scenario: str
+    metric: str
+    latest: float
+    baseline: float
+    runs: int
+
+    @property
+    def change(self) -> float:
+        return self.latest / self.baseline - 1.0
+
+
+class ResultStore:
+    """SQLite index of scenario suite results, so runs can be compared across suites."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Parallel scenarios look up cached results from their own threads; the lock serializes access.
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.connection.executescript(SCHEMA)
+        self._add_missing_columns()
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS scenario_results_by_cache_key ON scenario_results (cache_key, id)"
+        )
+
+    def _add_missing_columns(self) -> None:
+        existing = {row["name"] for row in self.connection.execute("PRAGMA table_info(scenario_results)")}
+        with self.connection:
+            for name, definition in ADDED_COLUMNS.items():
+                if name not in existing:
+                    self.connection.execute(f"ALTER TABLE scenario_results ADD COLUMN {name} {definition}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def record_suite(
+        self,
+        suite_dir: Path,
+        records: Iterable[Mapping[str, object]],
+        java_version: Optional[str] = None,
+        starfish_jar: Optional[str] = None,
+        jobs: Optional[int] = None,
+    ) -> int:
+        """Store one suite run and its scenario records; returns the suite run id."""
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO suite_runs (started_at, suite_dir, java_version, starfish_jar, jobs) VALUES (?, ?, ?, ?, ?)",
+                (datetime.now(timezone.utc).isoformat(), str(suite_dir), java_version, starfish_jar, jobs),
+            )
+            suite_run_id = cursor.lastrowid
+            self.connection.executemany(
+                """
+                INSERT INTO scenario_results (
+                    suite_run_id, scenario, ok, returncode, timed_out, elapsed_seconds, stats_rows,
+                    particle_counts, source_terms, xml_hash, output_dir, command, last_output_line, output_tail,
+                    cache_key, cached
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [self._result_row(suite_run_id, record) for record in records],
+            )
+        return suite_run_id
+
+    def latest_reusable(self, cache_key: str) -> Optional[sqlite3.Row]:
+        """The newest passing result with ``cache_key`` whose output directory still exists."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM scenario_results WHERE cache_key = ? AND ok = 1 AND timed_out = 0 ORDER BY id DESC",
+                (cache_key,),
+            ).fetchall()
+        return next((row for row in rows if Path(row["output_dir"]).is_dir()), None)
+
+    def history(self, scenario: str, limit: int = 20) -> list[sqlite3.Row]:
+        """Most recent results of one scenario, newest first."""
+        return self.connection.execute(
+            """
+            SELECT r.*, s.started_at FROM scenario_results r JOIN suite_runs s ON s.id = r.suite_run_id
+            WHERE r.scenario = ? ORDER BY r.id DESC LIMIT ?
+            """,
+            (scenario, limit),
+        ).fetchall()
+
+    def scenarios(self) -> list[str]:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT scenario FROM scenario_results ORDER BY scenario")]
+
+    def regressions(self, metric: str = "elapsed_seconds", threshold: float = 0.2, window: int = 10) -> list[Regression]:
+        """
+        Scenarios whose latest passing run exceeds the median of the previous
+        ``window`` passing runs by more than ``threshold`` (0.2 = 20%).
+        Cached results repeat an earlier run and are not counted.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+
+        regressions: list[Regression] = []
+        for scenario in self.scenarios():
+            values = [
+                row[0]
+                for row in self.connection.execute(
+                    f"SELECT {metric} FROM scenario_results WHERE scenario = ? AND ok = 1 AND cached = 0 "
+                    "ORDER BY id DESC LIMIT ?",
+                    (scenario, window + 1),
+                )
+            ]
+            if len(values) < 2:
+                continue
+            latest, previous = values[0], values[1:]
+            baseline = statistics.median(previous)
+            if baseline > 0 and latest > baseline * (1.0 + threshold):
+                regressions.append(Regression(scenario, metric, latest, baseline, len(previous)))
+        return regressions
+
+    @staticmethod
+    def _result_row(suite_run_id: int, record: Mapping[str, object]) -> tuple:
+        result: StarfishRunResult = record["result"]
+        output_tail = "\n".join(result.output.splitlines()[-OUTPUT_TAIL_LINES:])
+        return (
+            suite_run_id,
+            record["scenario"].name,
+            int(result.ok),
+            result.returncode,
+            int(result.timed_out),
+            result.elapsed_seconds,
+            record["stats_rows"],
+            json.dumps(record["particle_counts"]),
+            json.dumps(record["source_terms"]),
+            record["xml_hash"],
+            str(record["output_dir"]),
+            json.dumps(list(result.command)),
+            result.last_output_line,
+            output_tail,
+            record.get("cache_key") or "",
+            int(bool(record.get("cached"))),
+        )
+
+
+class ResultCache:
+    """
+    Reuses the stored result of a scenario run whose inputs did not change.
+
+    Runs are keyed by the generated XML bundle, the StarfishCLI.jar contents and
+    the Java version. A hit copies the earlier run's output directory (stats,
+    log and XML files, and the stdout/stderr written by ``save_run_output``)
+    instead of running Starfish again, so the restored result carries the
+    original output. Runs recorded without those files are not reused.
+    """
+
+    def __init__(self, store: ResultStore, starfish_jar: Path, java_version: str, reuse: bool = True):
+        self.store = store
+        self.reuse = reuse
+        self.java_version = java_version
+        self._environment = f"{file_sha256(starfish_jar)}|{java_version}"
+
+    def key(self, xml_hash: str) -> str:
+        return hashlib.sha256(f"{xml_hash}|{self._environment}".encode("utf-8")).hexdigest()
+
+    def restore(self, cache_key: str, output_dir: Path) -> Optional[StarfishRunResult]:
+        """Copy a matching earlier run into ``output_dir`` and return its result, or None on a miss."""
+        if not self.reuse:
+            return None
+        row = self.store.latest_reusable(cache_key)
+        if row is None:
+            return None
+
+        source_dir = Path(row["output_dir"])
+        if not all((source_dir / name).is_file() for name in (STDOUT_LOG, STDERR_LOG)):
+            return None
+        if source_dir.resolve() != Path(output_dir).resolve():
+            shutil.copytree(source_dir, output_dir, dirs_exist_ok=True)
+        return StarfishRunResult(
+            returncode=row["returncode"],
+            stdout=(Path(output_dir) / STDOUT_LOG).read_text(encoding="utf-8"),
+            stderr=(Path(output_dir) / STDERR_LOG).read_text(encoding="utf-8"),
+            elapsed_seconds=row["elapsed_seconds"],
+            command=load_command(row["command"]),
+            run_dir=str(output_dir),
+        )
+
+
+def print_history(store: ResultStore, scenario: str, limit: int) -> int:
+    rows = store.history(scenario, limit)
+    if not rows:
+        print(f"No results for scenario {scenario}")
+        return 1
+    print(f"{'recorded':<20} {'status':<6} {'elapsed s':>10} {'rows':>6} {'xml':<12} particles")
+    for row in rows:
+        status = ("PASS" if row["ok"] else "FAIL") + ("*" if row["cached"] else "")
+        particles = ", ".join(f"{name}={count}" for name, count in json.loads(row["particle_counts"]).items())
+        print(
+            f"{row['started_at'][:19]:<20} {status:<6} {row['elapsed_seconds']:>10.3f} "
+            f"{row['stats_rows']:>6} {row['xml_hash'][:12]:<12} {particles}"
+        )
+    if any(row["cached"] for row in rows):
+        print("* reused an earlier run with the same XML, jar and Java version")
+    return 0
+
+
+def print_regressions(store: ResultStore, metric: str, threshold: float, window: int) -> int:
+    regressions = store.regressions(metric, threshold, window)
+    if not regressions:
+        print(f"No {metric} regressions above {threshold:.0%} against the last {window} passing runs.")
+        return 0
+    print(f"{'scenario':<36} {'latest':>10} {'median':>10} {'change':>8} {'runs':>5}")
+    for regression in regressions:
+        print(
+            f"{regression.scenario:<36} {regression.latest:>10.3f} {regression.baseline:>10.3f} "
+            f"{regression.change:>+8.0%} {regression.runs:>5}"
+        )
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query Starfish scenario suite results recorded across runs.")
+    parser.add_argument("--db", type=Path, default=None, help="Results database (default: starfish_runs/results.sqlite3).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    regressions = commands.add_parser("regressions", help="List scenarios whose latest run regressed.")
+    regressions.add_argument("--metric", choices=METRICS, default="elapsed_seconds", help="Metric to compare.")
+    regressions.add_argument("--threshold", type=float, default=0.2, help="Allowed growth over the baseline (0.2 = 20%%).")
+    regressions.add_argument("--window", type=int, default=10, help="Previous passing runs forming the baseline median.")
+
+    history = commands.add_parser("history", help="Show recent results of one scenario.")
+    history.add_argument("scenario", help="Scenario name.")
+    history.add_argument("--limit", type=int, default=20, help="Number of results to show.")
+    args = parser.parse_args()
+
+    db = args.db or default_results_db()
+    if not db.exists():
+        print(f"ERROR: results database not found: {db}")
+        return 2
+
+    with closing(ResultStore(db)) as store:
+        if args.command == "history":
+            return print_history(store, args.scenario, args.limit)
+        return print_regressions(store, args.metric, args.threshold, args.window)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+import math
+
+from app.models.simulation import (
+    Boundary,
+    DomainSettings,
+    GeometryNode,
+    GlobalSettings,
+    Interaction,
+    Material,
+    SimulationProject,
+    Source,
+)
+
+
+def wall_points(count: int, length: float = 0.2, height: float = 0.1, phase: float = 0.0) -> list[tuple[float, float]]:
+    """Return a digitized wavy wall with ``count`` points, similar to CAD-imported boundaries."""
+    if count < 2:
+        count = 2
+    step = length / (count - 1)
+    return [
+        (
+            round(index * step, 6),
+            round(height * (0.5 + 0.25 * math.sin(phase + 12.0 * math.pi * index / count)), 6),
+        )
+        for index in range(count)
+    ]
+
+
+def wall_nodes(count: int, length: float = 0.2, height: float = 0.1, phase: float = 0.0) -> list[GeometryNode]:
+    return [GeometryNode(x=x, y=y) for x, y in wall_points(count, length, height, phase)]
+
+
+def wall_coords(count: int, length: float = 0.2, height: float = 0.1, phase: float = 0.0) -> list[float]:
+    """The same wall as ``wall_nodes`` as flat ``[x0, y0, x1, y1, ...]`` coordinates."""
+    return [value for point in wall_points(count, length, height, phase) for value in point]
+
+
+def scaled_boundaries(count: int, nodes_per_boundary: int, compact_geometry: bool = False) -> list[Boundary]:
+    boundaries = []
+    for index in range(count):
+        solid = index % 2 == 1
+        geometry = (
+            {"coords": wall_coords(nodes_per_boundary, phase=index * 0.37)}
+            if compact_geometry
+            else {"nodes": wall_nodes(nodes_per_boundary, phase=index * 0.37)}
+        )
+        boundaries.append(
+            Boundary(
+                name=f"wall_{index}",
+                type="solid" if solid else "virtual",
+                value="0" if solid else None,
+                temp=300.0 if solid else None,
+                **geometry,
+            )
+        )
+    return boundaries
+
+
+def scaled_materials(count: int) -> list[Material]:
+    materials = [Material(name="wall", type="solid", density=8000)]
+    for index in range(max(count - 1, 0)):
+        charge = index % 3 - 1
+        materials.append(
+            Material(
+                name=f"species_{index}",
+                type="kinetic",
+                molwt=1.0 + index % 200,
+                charge=charge,
+                spwt=1e10,
+                ref_temp=273,
+                diam=4e-10,
+            )
+        )
+    return materials
+
+
+def scaled_sources(count: int, boundary_names: list[str], material_names: list[str]) -> list[Source]:
+    kinetic = [name for name in material_names if name != "wall"] or ["species_0"]
+    boundary_names = boundary_names or [None]
+    sources = []
+    for index in range(count):
+        source_type = ("uniform", "ambient", "volume", "cosine")[index % 4]
+        sources.append(
+            Source(
+                name=f"source_{index}",
+                type=source_type,
+                material=kinetic[index % len(kinetic)],
+                boundary=boundary_names[index % len(boundary_names)],
+                mdot=1e-10 if source_type in {"uniform", "cosine"} else None,
+                density=1e14 if source_type == "ambient" else None,
+                rate=1e28 if source_type == "volume" else None,
+                temperature=300,
+                v_drift=1000,
+            )
+        )
+    return sources
+
+
+def scaled_interactions(count: int, material_names: list[str]) -> list[Interaction]:
+    kinetic = [name for name in material_names if name != "wall"] or ["species_0"]
+    interactions = []
+    for index in range(count):
+        first = kinetic[index % len(kinetic)]
+        second = kinetic[(index * 7 + 1) % len(kinetic)]
+        kind = ("dsmc", "mcc", "surface_hit", "chemistry")[index % 4]
+        if kind == "dsmc":
+            interactions.append(
+                Interaction(name=f"dsmc_{index}", type="dsmc", pair=f"{first},{second}", sigma="bird463", frequency=1)
+            )
+        elif kind == "mcc":
+            interactions.append(
+                Interaction(
+                    name=f"mcc_{index}",
+                    type="mcc",
+                    mcc_model="ionization",
+                    source=first,
+                    target=second,
+                    sigma="const",
+                    sigma_coeffs="1e-20",
+                    ionization_energy=12.1,
+                )
+            )
+        elif kind == "surface_hit":
+            interactions.append(
+                Interaction(name=f"hit_{index}", type="surface_hit", source=first, target="wall", product=first, prob=0.9)
+            )
+        else:
+            interactions.append(
+                Interaction(
+                    name=f"chem_{index}",
+                    type="chemistry",
+                    sources=f"{first},{second}",
+                    products=f"{second},{first}",
+                    rate_type="const",
+                    coeffs="1e-15",
+                )
+            )
+    return interactions
+
+
+def build_scaled_project(
+    boundaries: int = 4,
+    nodes_per_boundary: int = 2,
+    materials: int = 2,
+    sources: int = 1,
+    interactions: int = 0,
+    compact_geometry: bool = False,
+) -> SimulationProject:
+    """
+    Build a synthetic project whose size is controlled independently along each axis.
+
+    With ``compact_geometry`` the boundaries carry packed ``coords`` instead of ``nodes``.
+    """
+    boundary_list = scaled_boundaries(boundaries, nodes_per_boundary, compact_geometry)
+    material_list = scaled_materials(materials)
+    material_names = [material.name for material in material_list]
+    return SimulationProject(
+        settings=GlobalSettings(iterations=100, time_step=1e-6, solver_type="none", max_cores=1),
+        domain=DomainSettings(
+            type="xy",
+            mesh_name="mesh",
+            origin=[0.0, 0.0],
+            spacing=[0.01, 0.01],
+            nodes=[21, 11],
+        ),
+        boundaries=boundary_list,
+        materials=material_list,
+        sources=scaled_sources(sources, [boundary.name for boundary in boundary_list], material_names),
+        interactions=scaled_interactions(interactions, material_names),
+    )
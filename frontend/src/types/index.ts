@@ -12,6 +12,8 @@ export interface Boundary {
   value?: string;
   reverse?: boolean;
   nodes: GeometryNode[];
+  // 紧凑的节点坐标 [x0, y0, x1, y1, ...]，与nodes二选一（解析时指定compact_geometry=true才会返回）
+  coords?: number[] | null;
 
   // Starfish边界属性
   material?: string;